@@ -12,11 +12,15 @@ from backend.app.models.schemas import (
     AssignVendorRequest,
     BroadcastRequest,
     KhataAddRequest,
+    SKUAliasCreate,
     StoreCreate,
     TokenResponse,
     VendorCreate,
 )
+from backend.app.services.alias_normalizer import get_alias_normalizer
 from backend.app.services.notification_service import NotificationService
+from backend.app.services.sender_resolver import get_sender_resolver
+from backend.app.services.sku_index import get_sku_index
 from postgrest.exceptions import APIError
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -136,6 +140,7 @@ async def create_store(request: Request, body: StoreCreate, user: dict = Depends
         logger.info("Create store payload | phone=%s name=%s", payload.get("contact_phone"), payload.get("name"))
         res = db.table("stores").insert(body.model_dump(exclude_none=True)).execute()
         created = res.data[0] if res.data else {}
+        get_sender_resolver().invalidate(payload.get("contact_phone"))
         logger.info("Create store success | created_id=%s", created.get("id"))
         return {"status": "created", "store": created}
     except APIError as e:
@@ -182,6 +187,7 @@ async def create_vendor(request: Request, body: VendorCreate, user: dict = Depen
         logger.info("Create vendor payload | phone=%s name=%s", payload.get("phone"), payload.get("name"))
         res = db.table("vendors").insert(body.model_dump()).execute()
         created = res.data[0] if res.data else {}
+        get_sender_resolver().invalidate(payload.get("phone"))
         logger.info("Create vendor success | created_id=%s", created.get("id"))
         return {"status": "created", "vendor": created}
     except APIError as e:
@@ -279,6 +285,8 @@ async def delete_store(store_id: str, request: Request, user: dict = Depends(get
         if not existing.data:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Store not found")
         db.table("stores").delete().eq("id", store_id).execute()
+        get_sender_resolver().invalidate()
+        get_sku_index().invalidate(store_id)
         logger.info("Delete store success | store_id=%s", store_id)
         return {"status": "deleted", "store_id": store_id}
     except HTTPException:
@@ -323,6 +331,7 @@ async def delete_vendor(vendor_id: str, request: Request, user: dict = Depends(g
         if not existing.data:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vendor not found")
         db.table("vendors").delete().eq("id", vendor_id).execute()
+        get_sender_resolver().invalidate()
         logger.info("Delete vendor success | vendor_id=%s", vendor_id)
         return {"status": "deleted", "vendor_id": vendor_id}
     except HTTPException:
@@ -345,6 +354,7 @@ async def assign_vendor(request: Request, body: AssignVendorRequest, user: dict
             "store_id": body.store_id,
             "vendor_id": body.vendor_id,
         }).execute()
+        get_sender_resolver().invalidate()
         return {"status": "assigned"}
     except APIError as exc:
         err = exc.json() if hasattr(exc, "json") else {}
@@ -355,6 +365,63 @@ async def assign_vendor(request: Request, body: AssignVendorRequest, user: dict
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Assign vendor failed: {exc}")
 
 
+@router.post("/aliases")
+async def create_alias(request: Request, body: SKUAliasCreate, user: dict = Depends(get_current_user)) -> dict:
+    logger.info("Create alias request received | path=%s store_id=%s alias=%s user=%s", request.url.path, body.store_id, body.alias, user.get("sub"))
+    try:
+        db = get_supabase_admin_client()
+        res = db.table("sku_aliases").upsert(
+            {"store_id": body.store_id, "alias": body.alias.strip(), "canonical_name": body.canonical_name.strip()},
+            on_conflict="store_id,alias",
+        ).execute()
+        get_alias_normalizer().invalidate(body.store_id)
+        get_sku_index().invalidate(body.store_id)
+        return {"status": "created", "alias": res.data[0] if res.data else {}}
+    except APIError as exc:
+        err = exc.json() if hasattr(exc, "json") else {}
+        logger.error("Create alias API error: %s", err or str(exc))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Create alias failed")
+    except Exception as exc:
+        logger.exception("Create alias unexpected error: %s", exc)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Create alias failed: {exc}")
+
+
+@router.get("/aliases/{store_id}")
+async def list_aliases(store_id: str, request: Request, user: dict = Depends(get_current_user)) -> dict:
+    try:
+        db = get_supabase_admin_client()
+        res = db.table("sku_aliases").select("*").eq("store_id", store_id).order("alias").execute()
+        return {"store_id": store_id, "aliases": res.data or []}
+    except APIError as exc:
+        err = exc.json() if hasattr(exc, "json") else {}
+        logger.error("List aliases API error: %s", err or str(exc))
+        return {"store_id": store_id, "aliases": []}
+
+
+@router.delete("/aliases/{alias_id}")
+async def delete_alias(alias_id: str, request: Request, user: dict = Depends(get_current_user)) -> dict:
+    logger.info("Delete alias request received | path=%s alias_id=%s user=%s", request.url.path, alias_id, user.get("sub"))
+    try:
+        db = get_supabase_admin_client()
+        existing = db.table("sku_aliases").select("id, store_id").eq("id", alias_id).limit(1).execute()
+        if not existing.data:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alias not found")
+        db.table("sku_aliases").delete().eq("id", alias_id).execute()
+        store_id = existing.data[0]["store_id"]
+        get_alias_normalizer().invalidate(store_id)
+        get_sku_index().invalidate(store_id)
+        return {"status": "deleted", "alias_id": alias_id}
+    except HTTPException:
+        raise
+    except APIError as exc:
+        err = exc.json() if hasattr(exc, "json") else {}
+        logger.error("Delete alias API error: %s", err or str(exc))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Delete alias failed")
+    except Exception as exc:
+        logger.exception("Delete alias unexpected error: %s", exc)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Delete alias failed: {exc}")
+
+
 @router.get("/inventory/{store_id}")
 async def get_store_inventory(store_id: str, request: Request, user: dict = Depends(get_current_user)) -> dict:
     logger.info(
@@ -1,14 +1,54 @@
+import asyncio
+import codecs
+import csv
 import logging
+from typing import AsyncIterator, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from postgrest.exceptions import APIError
+from pydantic import ValidationError
 
+from configs.config import get_settings
 from backend.app.core.security import get_current_admin
 from backend.app.db.supabase import get_supabase_admin_client
-from backend.app.models.schemas import InventoryUpdateRequest
+from backend.app.models.schemas import InventoryBulkRequest, InventoryUpdateRequest
+from backend.app.services.inventory_service import InventoryOrchestrator, increment_stock, rescore_skus
+from backend.app.services.sku_index import get_sku_index
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+async def _stream_csv_rows(request: Request) -> AsyncIterator[list[str]]:
+    """CSV rows decoded line by line as the body streams in."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for row in csv.reader(line.rstrip("\r") for line in lines):
+            yield row
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        for row in csv.reader([buffer.rstrip("\r")]):
+            yield row
+
+
+async def _read_csv_items(request: Request, max_rows: int) -> list[tuple[str, Optional[str]]]:
+    items: list[tuple[str, Optional[str]]] = []
+    first = True
+    async for row in _stream_csv_rows(request):
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if first and row[0].strip().lower() == "sku_name":
+            first = False
+            continue
+        first = False
+        items.append((row[0], row[1] if len(row) > 1 else None))
+        if len(items) > max_rows:
+            raise HTTPException(status_code=413, detail=f"Bulk update is limited to {max_rows} rows")
+    return items
 
 
 @router.post("/update", dependencies=[Depends(get_current_admin)])
@@ -16,27 +56,18 @@ async def update_inventory(body: InventoryUpdateRequest) -> dict:
     try:
         db = get_supabase_admin_client()
 
-        sku_res = (
-            db.table("skus")
-            .select("id")
-            .ilike("name", f"%{body.sku_name}%")
-            .eq("store_id", body.store_id)
-            .execute()
-        )
-        if not sku_res.data:
+        sku_match = get_sku_index().match(body.store_id, body.sku_name)
+        if sku_match is None:
             raise HTTPException(status_code=404, detail=f"SKU '{body.sku_name}' not found in store {body.store_id}")
 
-        sku_id = sku_res.data[0]["id"]
+        sku_id = sku_match.sku_id
 
-        inv_res = db.table("inventory").select("stock_level").eq("sku_id", sku_id).execute()
-        current = float(inv_res.data[0]["stock_level"]) if inv_res.data else 0.0
-        new_stock = current + body.quantity_delta
-
-        db.table("inventory").upsert({
-            "sku_id": sku_id,
-            "stock_level": new_stock,
-            "last_updated": "now()",
-        }).execute()
+        updated = increment_stock(db, body.quantity_delta, sku_id=sku_id)
+        if updated is None:
+            # deleted since the store's SKU index was built
+            get_sku_index().invalidate(body.store_id)
+            raise HTTPException(status_code=404, detail=f"SKU '{body.sku_name}' not found in store {body.store_id}")
+        new_stock = updated["stock_level"]
 
         logger.info("Inventory updated | store_id=%s sku=%s delta=%s new_stock=%s", body.store_id, body.sku_name, body.quantity_delta, new_stock)
         return {"status": "updated", "sku_id": sku_id, "new_stock": new_stock}
@@ -51,6 +82,51 @@ async def update_inventory(body: InventoryUpdateRequest) -> dict:
         raise HTTPException(status_code=500, detail="Inventory update failed")
 
 
+@router.post("/bulk", dependencies=[Depends(get_current_admin)])
+async def bulk_update_inventory(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    store_id: Optional[str] = None,
+) -> dict:
+    """
+    Applies many stock deltas atomically. Send JSON
+    ({"store_id", "items": [{"sku_name", "delta"}]}) or a text/csv body of
+    sku_name,delta rows (header optional) with ?store_id=. Demand
+    re-scoring for the touched SKUs runs once, after the response.
+    """
+    max_rows = settings.INVENTORY_BULK_MAX_ROWS
+    if request.headers.get("content-type", "").startswith("text/csv"):
+        if not store_id:
+            raise HTTPException(status_code=422, detail="store_id query parameter is required for CSV uploads")
+        items = await _read_csv_items(request, max_rows)
+    else:
+        try:
+            body = InventoryBulkRequest.model_validate(await request.json())
+        except ValueError as exc:
+            detail = exc.errors() if isinstance(exc, ValidationError) else "Invalid JSON body"
+            raise HTTPException(status_code=422, detail=detail)
+        if len(body.items) > max_rows:
+            raise HTTPException(status_code=413, detail=f"Bulk update is limited to {max_rows} rows")
+        store_id = body.store_id
+        items = [(item.sku_name, item.delta) for item in body.items]
+
+    try:
+        # one blocking RPC plus SKU resolution; keep it off the event loop
+        result = await asyncio.to_thread(InventoryOrchestrator().bulk_update_stock, store_id, items)
+    except APIError as exc:
+        err = exc.json() if hasattr(exc, "json") else {}
+        logger.error("Bulk inventory update API error: %s", err or str(exc))
+        raise HTTPException(status_code=500, detail="Bulk inventory update failed")
+    except Exception as exc:
+        logger.exception("Bulk inventory update failed: %s", exc)
+        raise HTTPException(status_code=500, detail="Bulk inventory update failed")
+
+    sku_ids = result.pop("sku_ids")
+    if sku_ids:
+        background_tasks.add_task(rescore_skus, sku_ids)
+    return {"status": "updated", "store_id": store_id, **result}
+
+
 @router.get("/{store_id}")
 async def get_inventory(store_id: str) -> dict:
     try:
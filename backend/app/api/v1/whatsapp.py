@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from functools import lru_cache
 
@@ -7,8 +8,13 @@ from configs.config import get_settings
 from backend.app.db.supabase import get_supabase_client
 from backend.app.models.schemas import AIIntentResponse, IntentEnum
 from backend.app.inference.ai_service import AIServiceLayer
+from backend.app.services.dedupe import get_message_deduplicator
 from backend.app.services.inventory_service import InventoryOrchestrator
+from backend.app.services.sender_resolver import get_sender_resolver
+from backend.app.services.sku_index import get_sku_index
 from backend.app.services.whatsapp_service import WhatsAppService
+from backend.app.workers.lanes import LaneScheduler
+from backend.app.workers.webhook_queue import WebhookWorkQueue
 
 router = APIRouter(prefix="/whatsapp", tags=["WhatsApp"])
 logger = logging.getLogger(__name__)
@@ -20,6 +26,11 @@ def _get_ai_service() -> AIServiceLayer:
     return AIServiceLayer()
 
 
+async def close_pipeline_clients() -> None:
+    """Closes the pipeline's loop-bound clients (the SLM Redis cache); run before a task's event loop ends."""
+    await _get_ai_service().slm.aclose()
+
+
 @lru_cache(maxsize=1)
 def _get_inventory_service() -> InventoryOrchestrator:
     return InventoryOrchestrator()
@@ -30,6 +41,39 @@ def _get_whatsapp_service() -> WhatsAppService:
     return WhatsAppService()
 
 
+@lru_cache(maxsize=1)
+def get_webhook_queue() -> WebhookWorkQueue:
+    return WebhookWorkQueue(
+        handler=process_webhook_payload,
+        maxsize=settings.WEBHOOK_QUEUE_MAXSIZE,
+        concurrency=settings.WEBHOOK_WORKER_CONCURRENCY,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_sender_lanes() -> LaneScheduler:
+    return LaneScheduler(
+        num_lanes=settings.WEBHOOK_SENDER_LANES,
+        idle_timeout=settings.WEBHOOK_LANE_IDLE_SECONDS,
+    )
+
+
+def _iter_messages(body: dict) -> list[dict]:
+    """Flattens every message across all entries and changes of a delivery."""
+    messages: list[dict] = []
+    for entry in body.get("entry") or []:
+        for change in (entry or {}).get("changes") or []:
+            value = (change or {}).get("value") or {}
+            messages.extend(m for m in value.get("messages") or [] if isinstance(m, dict))
+    return messages
+
+
+def failed_messages(body: dict, result: dict) -> list[dict]:
+    """Messages of a delivery whose processing ended in an error (for a retry of just those)."""
+    results = result.get("results") if result.get("status") == "batch_processed" else [result]
+    return [m for m, r in zip(_iter_messages(body), results or []) if r.get("status") == "error"]
+
+
 @router.get("/webhook")
 async def verify_webhook(
     hub_mode: str = Query(None, alias="hub.mode"),
@@ -47,27 +91,84 @@ async def verify_webhook(
 
 
 @router.post("/webhook")
-async def whatsapp_webhook(request: Request) -> dict:
-    body = await request.json()
+async def whatsapp_webhook(request: Request, response: Response) -> dict:
+    try:
+        body = await request.json()
+    except ValueError:
+        return {"status": "invalid_payload"}
+    if not isinstance(body, dict) or not isinstance(body.get("entry", []), list):
+        return {"status": "invalid_payload"}
     logger.debug("Webhook received")
+
+    mode = settings.WEBHOOK_PROCESSING_MODE
+    if mode == "sync":
+        return await process_webhook_payload(body)
+
+    # ack-first: acknowledge Meta quickly and process in the background
+    try:
+        if not _iter_messages(body):
+            return {"status": "event_received"}
+    except (AttributeError, TypeError):
+        return {"status": "invalid_payload"}
+
+    if mode == "celery":
+        from backend.app.workers.tasks import process_whatsapp_webhook
+        await asyncio.to_thread(process_whatsapp_webhook.delay, body)
+        return {"status": "accepted"}
+
+    if not await get_webhook_queue().submit(body):
+        response.status_code = 503
+        return {"status": "busy"}
+    return {"status": "accepted"}
+
+
+async def process_webhook_payload(body: dict) -> dict:
+    """
+    Runs the sender/intent/routing pipeline for every message in a delivery.
+    Messages are scheduled on per-sender lanes: different senders run
+    concurrently, while each sender's messages run strictly in order, also
+    across deliveries (the supplier price flow depends on it).
+    """
+    try:
+        messages = _iter_messages(body)
+    except (AttributeError, TypeError):
+        return {"status": "invalid_payload"}
+    if not messages:
+        return {"status": "event_received"}
+
+    lanes = get_sender_lanes()
+    futures = [
+        lanes.submit(message.get("from") or "", lambda m=message: process_message(m))
+        for message in messages
+    ]
+    results = list(await asyncio.gather(*futures))
+    if len(results) == 1:
+        return results[0]
+    logger.info("Webhook batch processed | messages=%d", len(results))
+    return {"status": "batch_processed", "results": results}
+
+
+async def process_message(message: dict) -> dict:
+    """Runs the sender/intent/routing pipeline for a single inbound message."""
     ai_service = _get_ai_service()
     inventory_service = _get_inventory_service()
     whatsapp_service = _get_whatsapp_service()
+    dedupe = get_message_deduplicator()
+    message_id = message.get("id")
+    # set once routing starts writing rows or sending messages; a retry from then on could repeat them
+    committed = False
 
     try:
-        entry = body.get("entry", [{}])[0]
-        change = entry.get("changes", [{}])[0]
-        value = change.get("value", {})
-
-        if "messages" not in value:
-            return {"status": "event_received"}
-
-        message = value.get("messages", [{}])[0]
         from_phone = message.get("from")
         msg_type = message.get("type")
         if not from_phone or not msg_type:
             logger.warning("Webhook payload missing sender/type")
             return {"status": "invalid_payload"}
+
+        # Meta redelivers slow webhooks; skip replays before any inference or DB work
+        if await dedupe.is_duplicate(message_id):
+            logger.info(f"Duplicate delivery ignored: id={message_id} from={from_phone}")
+            return {"status": "duplicate"}
         msg_body = ""
         button_id = None
 
@@ -81,27 +182,13 @@ async def whatsapp_webhook(request: Request) -> dict:
 
         logger.info(f"Incoming message: from={from_phone} type={msg_type} body={msg_body!r}")
 
-        # resolve sender role
+        # resolve sender role (cached phone index, no round trips for known senders)
         db = get_supabase_client()
-        role = "unknown"
-        store_id = None
-        store_data = {}
-        supplier_data = {}
-
-        store_res = db.table("stores").select("*").eq("contact_phone", from_phone).execute()
-        if store_res.data:
-            role = "owner"
-            store_data = store_res.data[0]
-            store_id = store_data["id"]
-        else:
-            supplier_res = db.table("vendors").select("*").eq("phone", from_phone).execute()
-            if supplier_res.data:
-                role = "supplier"
-                supplier_data = supplier_res.data[0]
-                store_id = supplier_data.get("store_id")
-                if store_id:
-                    sr = db.table("stores").select("*").eq("id", store_id).execute()
-                    store_data = sr.data[0] if sr.data else {}
+        sender = await get_sender_resolver().resolve(from_phone)
+        role = sender.role
+        store_id = sender.store_id
+        store_data = sender.store
+        supplier_data = sender.vendor
 
         logger.info(f"Detected role={role} store_id={store_id}")
 
@@ -122,12 +209,13 @@ async def whatsapp_webhook(request: Request) -> dict:
         logger.info(f"AI intent={ai_result.intent} sku={ai_result.sku} conf={ai_result.confidence:.2f}")
 
         # route by role and action
+        committed = True
         response: dict = {}
 
         if role == "owner":
             if ai_result.intent == IntentEnum.REORDER:
-                sku_res = db.table("skus").select("*").ilike("name", f"%{ai_result.sku}%").eq("store_id", store_id).execute()
-                sku_data = sku_res.data[0] if sku_res.data else None
+                sku_match = get_sku_index().match(store_id, ai_result.sku)
+                sku_data = sku_match.sku if sku_match else None
                 cat = sku_data["category_path"] if sku_data else None
 
                 if cat:
@@ -294,10 +382,20 @@ async def whatsapp_webhook(request: Request) -> dict:
             reply = "Received."
             if response.get("status") == "distributor_notified":
                 reply = f"✅ Order sent to {response['supplier']} for approval."
+            elif response.get("status") == "needs_confirmation":
+                reply = (
+                    f"⚠️ Could not read that clearly. Please confirm: "
+                    f"{response['quantity']:g} x {response['sku_name'] or 'item'}? Resend the update to apply it."
+                )
             await whatsapp_service.send_text_message(from_phone, reply)
 
         return {"status": "success"}
 
     except Exception as exc:
         logger.exception(f"Webhook processing error: {exc}")
+        if committed:
+            # reorder inserts, stock increments and sends are not idempotent: keep the id
+            # marked so neither our retry nor Meta's redelivery runs them a second time
+            return {"status": "partial_failure", "detail": str(exc)}
+        await dedupe.forget(message_id)
         return {"status": "error", "detail": str(exc)}
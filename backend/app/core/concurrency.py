@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+from backend.app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight task.
+    Every waiter awaits the same result (or exception). A cancelled waiter
+    does not cancel the shared task, and the key is released as soon as the
+    task finishes, so a failure never poisons later calls.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._release(k, t))
+            metrics.incr(f"{self.name}_singleflight_leaders_total")
+        else:
+            metrics.incr(f"{self.name}_singleflight_shared_total")
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # mark the exception as retrieved even if every waiter was cancelled
+            task.exception()
+
+
+class LimiterTimeoutError(Exception):
+    """Raised when a caller waits too long for a concurrency slot."""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its circuit breaker is open."""
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on in-flight calls to a dependency. Each call that finishes
+    within `latency_target` seconds grows the limit additively (about +1 per
+    full window); a slow or failed call shrinks it multiplicatively.
+    Callers beyond the limit wait up to `queue_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        latency_target: float = 8.0,
+        backoff: float = 0.7,
+        queue_timeout: float = 5.0,
+    ) -> None:
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._cond: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._loop is not loop:
+            self._cond = asyncio.Condition()
+            self._loop = loop
+            self.in_flight = 0
+        return self._cond
+
+    def _publish(self) -> None:
+        metrics.set_gauge(f"{self.name}_limiter_limit", round(self.limit, 2))
+        metrics.set_gauge(f"{self.name}_limiter_in_flight", self.in_flight)
+
+    async def _acquire(self) -> None:
+        cond = self._condition()
+        async with cond:
+            try:
+                await asyncio.wait_for(
+                    cond.wait_for(lambda: self.in_flight < int(self.limit)),
+                    timeout=self.queue_timeout,
+                )
+            except asyncio.TimeoutError:
+                metrics.incr(f"{self.name}_limiter_rejected_total")
+                raise LimiterTimeoutError(f"{self.name}: no slot within {self.queue_timeout}s (limit={int(self.limit)})")
+            self.in_flight += 1
+            self._publish()
+
+    @property
+    def has_capacity(self) -> bool:
+        """Whether a call would get a slot right now, without queueing."""
+        return self.in_flight < int(self.limit)
+
+    async def _release(self, latency: float, ok: bool | None) -> None:
+        # ok=None (cancelled, e.g. the losing half of a hedged call) says nothing about the dependency
+        if ok and latency <= self.latency_target:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        elif ok is not None:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        cond = self._condition()
+        async with cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._publish()
+            cond.notify_all()
+
+    async def run(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        await self._acquire()
+        started = time.perf_counter()
+        ok: bool | None = False
+        try:
+            result = await fn()
+            ok = True
+            return result
+        except asyncio.CancelledError:
+            ok = None
+            raise
+        finally:
+            await self._release(time.perf_counter() - started, ok)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and fails fast for
+    `reset_timeout` seconds; then lets a single half-open probe through.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = "closed"
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open" and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+            self._probe_in_flight = False
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            logger.info("Circuit %s closed", self.name)
+        self.failures = 0
+        self.state = "closed"
+        self._probe_in_flight = False
+        metrics.set_gauge(f"{self.name}_breaker_open", 0)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                metrics.incr(f"{self.name}_breaker_trips_total")
+                logger.warning("Circuit %s opened after %d failure(s)", self.name, self.failures)
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            metrics.set_gauge(f"{self.name}_breaker_open", 1)
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], failure_types: tuple = (Exception,)) -> Any:
+        if not self.allow():
+            metrics.incr(f"{self.name}_breaker_rejected_total")
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        try:
+            result = await fn()
+        except failure_types:
+            self.record_failure()
+            raise
+        except BaseException:
+            # not a dependency failure (e.g. cancellation): free the probe slot only
+            self._probe_in_flight = False
+            raise
+        self.record_success()
+        return result
@@ -0,0 +1,165 @@
+import asyncio
+import importlib.util
+import logging
+import threading
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Optional
+
+import httpx
+
+from configs.config import get_settings
+from backend.app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def _upstream_config(upstream: str) -> dict:
+    """Per-upstream pool limits and timeouts."""
+    if upstream == "ollama":
+        return {
+            "timeout": httpx.Timeout(settings.SLM_TIMEOUT_SECONDS, connect=5.0),
+            "limits": httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=120.0),
+        }
+    if upstream == "whatsapp":
+        return {
+            "timeout": httpx.Timeout(10.0, connect=5.0),
+            "limits": httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0),
+            "http2": settings.WHATSAPP_HTTP2 and importlib.util.find_spec("h2") is not None,
+        }
+    if upstream == "bhashini":
+        return {
+            "timeout": httpx.Timeout(20.0, connect=5.0),
+            "limits": httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0),
+        }
+    if upstream == "dashboard":
+        return {
+            "timeout": httpx.Timeout(10.0, connect=5.0),
+            "limits": httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0),
+            "follow_redirects": True,
+            # shared between admin sessions: never persist response cookies
+            "cookies": CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        }
+    raise ValueError(f"Unknown HTTP upstream: {upstream}")
+
+
+def _count_request(upstream: str):
+    def hook(_request) -> None:
+        metrics.incr(f"http_{upstream}_requests_total")
+    return hook
+
+
+class HTTPClientRegistry:
+    """
+    One pooled keep-alive httpx.AsyncClient per upstream, owned by the app
+    lifespan (closed on shutdown). Clients are bound to the event loop that
+    created them; a new loop (e.g. asyncio.run inside a Celery task) gets
+    fresh clients, and the old loop's clients are closed first so their
+    pooled connections are not leaked.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: set[asyncio.Task] = set()
+
+    def _rebind(self, loop: asyncio.AbstractEventLoop) -> None:
+        stale, self._clients = list(self._clients.values()), {}
+        old, self._loop = self._loop, loop
+        if not stale:
+            return
+        metrics.incr("http_clients_rebound_total", len(stale))
+        if old is not None and old.is_running() and not old.is_closed():
+            # still serving another thread: close them there
+            for client in stale:
+                asyncio.run_coroutine_threadsafe(client.aclose(), old)
+            return
+        task = loop.create_task(self._close_stale(stale))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_stale(clients: list[httpx.AsyncClient]) -> None:
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as exc:
+                # connections of a closed loop cannot shut down cleanly; the client is closed all the same
+                logger.debug("Closing HTTP client of a previous event loop: %s", exc)
+
+    def get(self, upstream: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._rebind(loop)
+        client = self._clients.get(upstream)
+        if client is None or client.is_closed:
+            config = _upstream_config(upstream)
+            if upstream == "whatsapp" and settings.WHATSAPP_HTTP2 and not config["http2"]:
+                logger.warning("WHATSAPP_HTTP2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            client = httpx.AsyncClient(event_hooks={"request": [_count_request(upstream)]}, **config)
+            self._clients[upstream] = client
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+    def pool_stats(self) -> dict:
+        return {name: _pool_stats(client) for name, client in self._clients.items()}
+
+
+class SyncHTTPClientRegistry:
+    """Per-process equivalent for Celery workers (sync httpx.Client per upstream)."""
+
+    def __init__(self) -> None:
+        self._clients: dict[str, httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    def get(self, upstream: str) -> httpx.Client:
+        with self._lock:
+            client = self._clients.get(upstream)
+            if client is None or client.is_closed:
+                config = _upstream_config(upstream)
+                config["http2"] = False
+                client = httpx.Client(event_hooks={"request": [_count_request(upstream)]}, **config)
+                self._clients[upstream] = client
+            return client
+
+    def close(self) -> None:
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            client.close()
+
+
+def _pool_stats(client) -> dict:
+    # httpcore does not expose pool stats publicly; read them defensively
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for c in connections if getattr(c, "is_idle", lambda: False)())
+    return {"connections": len(connections), "idle": idle, "active": len(connections) - idle}
+
+
+_async_registry = HTTPClientRegistry()
+_sync_registry = SyncHTTPClientRegistry()
+
+
+def get_http_client(upstream: str) -> httpx.AsyncClient:
+    return _async_registry.get(upstream)
+
+
+def get_sync_http_client(upstream: str) -> httpx.Client:
+    return _sync_registry.get(upstream)
+
+
+async def close_http_clients() -> None:
+    await _async_registry.aclose()
+
+
+def close_sync_http_clients() -> None:
+    _sync_registry.close()
+
+
+def http_pool_stats() -> dict:
+    return _async_registry.pool_stats()
@@ -13,6 +13,7 @@ from fastapi.templating import Jinja2Templates
 from jose import JWTError, jwt
 
 from configs.config import get_settings
+from backend.app.core.http_clients import get_http_client
 from backend.app.core.security import create_access_token, verify_password
 
 router = APIRouter(prefix="/admin", tags=["Admin Dashboard"])
@@ -87,39 +88,40 @@ async def _safe_api_get(request: Request, token: str, path: str, key: str, defau
     return default
 
 # API helpers
+def _auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}", "Cookie": f"access_token={token}; {COOKIE_NAME}={token}"}
+
+
 async def api_get(request: Request, path: str, token: str) -> dict:
     url = f"{_admin_api_base(request)}/admin/{path}"
-    async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-        resp = await client.get(
-            url,
-            headers={"Authorization": f"Bearer {token}"},
-            cookies={"access_token": token, COOKIE_NAME: token},
-        )
-        resp.raise_for_status()
-        return resp.json()
+    client = get_http_client("dashboard")
+    resp = await client.get(
+        url,
+        headers=_auth_headers(token),
+    )
+    resp.raise_for_status()
+    return resp.json()
 
 async def api_post(request: Request, path: str, token: str, json_data: dict) -> dict:
     url = f"{_admin_api_base(request)}/admin/{path}"
-    async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-        resp = await client.post(
-            url,
-            json=json_data,
-            headers={"Authorization": f"Bearer {token}"},
-            cookies={"access_token": token, COOKIE_NAME: token},
-        )
-        resp.raise_for_status()
-        return resp.json()
+    client = get_http_client("dashboard")
+    resp = await client.post(
+        url,
+        json=json_data,
+        headers=_auth_headers(token),
+    )
+    resp.raise_for_status()
+    return resp.json()
 
 async def api_delete(request: Request, path: str, token: str) -> dict:
     url = f"{_admin_api_base(request)}/admin/{path}"
-    async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-        resp = await client.delete(
-            url,
-            headers={"Authorization": f"Bearer {token}"},
-            cookies={"access_token": token, COOKIE_NAME: token},
-        )
-        resp.raise_for_status()
-        return resp.json()
+    client = get_http_client("dashboard")
+    resp = await client.delete(
+        url,
+        headers=_auth_headers(token),
+    )
+    resp.raise_for_status()
+    return resp.json()
 
 # auth
 
@@ -1,10 +1,23 @@
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from configs.config import get_settings
+from backend.app.core.metrics import metrics
+from backend.app.inference.fast_path import HinglishFastParser
 from backend.app.inference.slm_service import SLMService
 from backend.app.inference.speech_service import SpeechService
 from backend.app.inference.observability import AIObservability
+from backend.app.ml.intent_classifier import LOCAL_CLASSIFIER_REASONING, get_intent_classifier
 from backend.app.models.schemas import AIIntentResponse, IntentEnum
 import logging
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# intents whose entities the webhook router acts on; a confident classifier
+# label for anything else settles the message without the full extractor
+ENTITY_INTENTS = frozenset({IntentEnum.STOCK_UPDATE, IntentEnum.REORDER})
 
 class AIServiceLayer:
     """Production Unified service to handle voice -> intent pipeline."""
@@ -13,7 +26,12 @@ class AIServiceLayer:
         self.slm = SLMService()
         self.speech = SpeechService()
         self.obs = AIObservability()
-        self.confidence_threshold = 0.6
+        self.fast_path = HinglishFastParser()
+        self.confidence_threshold = settings.CASCADE_EXTRACTOR_MIN_CONFIDENCE
+        self.fast_path_threshold = settings.FAST_PATH_MIN_CONFIDENCE
+        self.classifier_threshold = settings.CASCADE_CLASSIFIER_MIN_CONFIDENCE
+        self.intent_classifier = get_intent_classifier()
+        self.local_classifier_threshold = settings.INTENT_CLASSIFIER_MIN_CONFIDENCE
 
     async def _process_unknown(self, text: str, reason: str) -> AIIntentResponse:
         return AIIntentResponse(
@@ -23,6 +41,99 @@ class AIServiceLayer:
             reasoning=reason
         )
 
+    @contextmanager
+    def _stage(self, stage: str):
+        metrics.incr(f"cascade_{stage}_total")
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            metrics.observe(f"cascade_{stage}_seconds", time.perf_counter() - started)
+
+    def _escalate(self, stage: str) -> None:
+        metrics.incr(f"cascade_{stage}_escalated_total")
+        total = metrics.counter(f"cascade_{stage}_total")
+        if total:
+            metrics.set_gauge(
+                f"cascade_{stage}_escalation_rate",
+                round(metrics.counter(f"cascade_{stage}_escalated_total") / total, 4),
+            )
+
+    def _settle_label(self, label: AIIntentResponse, fast: Optional[AIIntentResponse]) -> Optional[AIIntentResponse]:
+        """Final answer for a confident intent label, or None if its entities are still needed."""
+        if label.intent not in ENTITY_INTENTS:
+            return label
+        if fast is not None and fast.intent == label.intent:
+            # the rules already found the entities; the classifier confirms the intent
+            return fast.model_copy(update={"confidence": max(fast.confidence, label.confidence)})
+        return None
+
+    def _classify_locally(self, text: str) -> AIIntentResponse:
+        label, probability = self.intent_classifier.predict(text)
+        try:
+            intent = IntentEnum(label)
+        except ValueError:
+            intent, probability = IntentEnum.UNKNOWN, 0.0
+        return AIIntentResponse(
+            intent=intent,
+            confidence=probability,
+            original_text=text,
+            reasoning=LOCAL_CLASSIFIER_REASONING,
+        )
+
+    async def _extract(self, text: str) -> AIIntentResponse:
+        """
+        Cascade: rule-based fast path, then the in-process n-gram classifier,
+        then the small classifier model, then the full extractor. Each stage
+        settles a message only above its own confidence threshold, otherwise
+        it escalates. The extractor runs only for ENTITY_INTENTS (or when the
+        classifiers are unsure).
+        While the model's circuit is open (or a call fails) the best earlier
+        result, if any, is used instead of waiting on retries.
+        """
+        fast = None
+        if settings.FAST_PATH_ENABLED:
+            with self._stage("fast_path"):
+                fast = self.fast_path.parse_intent(text)
+            if fast is not None and fast.confidence >= self.fast_path_threshold:
+                return fast
+            self._escalate("fast_path")
+
+        label = None
+        if self.intent_classifier is not None:
+            with self._stage("local_classifier"):
+                label = self._classify_locally(text)
+            if label.confidence >= self.local_classifier_threshold:
+                settled = self._settle_label(label, fast)
+                if settled is not None:
+                    return settled
+            else:
+                label = None
+            self._escalate("local_classifier")
+
+        if not self.slm.available:
+            metrics.incr("slm_fallback_total")
+            return fast or await self._process_unknown(text, "Model unavailable (circuit open)")
+
+        # a confident local label already says the entities are needed
+        if settings.AI_CLASSIFIER_MODEL_NAME and label is None:
+            with self._stage("classifier"):
+                label = await self.slm.classify_intent(text)
+            if label.confidence >= self.classifier_threshold:
+                settled = self._settle_label(label, fast)
+                if settled is not None:
+                    return settled
+            self._escalate("classifier")
+
+        with self._stage("extractor"):
+            result = await self.slm.extract_intent_and_entities(text)
+        if fast is not None and result.intent == IntentEnum.UNKNOWN and (result.reasoning or "").startswith("Error"):
+            metrics.incr("slm_fallback_total")
+            return fast
+        if result.confidence < self.confidence_threshold:
+            metrics.incr("cascade_extractor_low_confidence_total")
+        return result
+
     async def process_voice_message(self, audio_url: str) -> AIIntentResponse:
         """High-level pipeline: Audio URL -> Text -> Intent JSON."""
         logger.info(f"Processing voice message from: {audio_url}")
@@ -33,7 +144,7 @@ class AIServiceLayer:
             return await self._process_unknown("", "Transcription failed")
             
         # extract intent
-        result = await self.slm.extract_intent_and_entities(transcription_result.text)
+        result = await self._extract(transcription_result.text)
         
         # write trace logs
         await self.obs.log_decision(
@@ -53,7 +164,7 @@ class AIServiceLayer:
     async def process_text_message(self, text: str) -> AIIntentResponse:
         """High-level pipeline: Text -> Intent JSON."""
         logger.info(f"Processing text message: {text}")
-        result = await self.slm.extract_intent_and_entities(text)
+        result = await self._extract(text)
         
         await self.obs.log_decision(
             store_id="unknown",
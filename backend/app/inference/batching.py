@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from backend.app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[list[Any]], Awaitable[list[Any]]]
+
+
+class MicroBatcher:
+    """
+    Collects items submitted within `max_wait` seconds (or until `max_batch`
+    items are pending) and hands them to `handler` as one list. The handler
+    returns one result per item, in order; an exception fails the whole batch.
+    """
+
+    def __init__(self, name: str, handler: BatchHandler, max_batch: int = 8, max_wait: float = 0.015) -> None:
+        self.name = name
+        self.handler = handler
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self._pending: list[tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        batch = [(item, fut) for item, fut in batch if not fut.cancelled()]
+        if batch:
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch: list[tuple[Any, asyncio.Future]]) -> None:
+        started = time.perf_counter()
+        metrics.observe(f"{self.name}_batch_size", len(batch))
+        try:
+            results = await self.handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"batch handler returned {len(results)} results for {len(batch)} items")
+        except Exception as exc:
+            logger.warning("%s batch of %d failed: %s", self.name, len(batch), exc)
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+        else:
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+        finally:
+            metrics.observe(f"{self.name}_batch_seconds", time.perf_counter() - started)
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from backend.app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class _Endpoint:
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.latencies: deque = deque(maxlen=200)
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+
+class EndpointPool:
+    """
+    Spreads model calls over several Ollama endpoints by least outstanding
+    requests. Passive health checking: an endpoint that fails
+    `failure_threshold` times in a row is ejected for `ejection_seconds`.
+    With hedging on, a second request goes to another endpoint once the
+    first has been running longer than the observed p95; the first
+    response wins and the loser is cancelled. `can_hedge` is asked before
+    the second request goes out (e.g. whether the concurrency limiter has
+    a free slot), so hedging never adds load past the caller's limit.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        failure_types: tuple = (Exception,),
+        failure_threshold: int = 3,
+        ejection_seconds: float = 30.0,
+        hedging: bool = False,
+        min_hedge_samples: int = 20,
+        can_hedge: Callable[[], bool] = lambda: True,
+    ) -> None:
+        if not urls:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        self.endpoints = [_Endpoint(u) for u in urls]
+        self.failure_types = failure_types
+        self.failure_threshold = max(1, failure_threshold)
+        self.ejection_seconds = ejection_seconds
+        self.hedging = hedging
+        self.min_hedge_samples = min_hedge_samples
+        self.can_hedge = can_hedge
+
+    def pick(self, exclude: Iterable[_Endpoint] = ()) -> Optional[_Endpoint]:
+        candidates = [e for e in self.endpoints if e not in exclude]
+        if not candidates:
+            return None
+        healthy = [e for e in candidates if e.healthy]
+        if not healthy:
+            # everything is ejected: try the endpoint that comes back first
+            return min(candidates, key=lambda e: e.ejected_until)
+        least = min(e.outstanding for e in healthy)
+        return random.choice([e for e in healthy if e.outstanding == least])
+
+    def p95(self) -> Optional[float]:
+        samples = sorted(s for e in self.endpoints for s in e.latencies)
+        if len(samples) < self.min_hedge_samples:
+            return None
+        return samples[int(len(samples) * 0.95) - 1]
+
+    async def call(self, fn: Callable[[str], Awaitable[Any]]) -> Any:
+        primary = self.pick()
+        delay = self.p95() if self.hedging and len(self.endpoints) > 1 else None
+        if delay is None:
+            return await self._attempt(primary, fn)
+
+        first = asyncio.ensure_future(self._attempt(primary, fn))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        secondary = self.pick(exclude=[primary])
+        if done or secondary is None or not secondary.healthy:
+            return await first
+        if not self.can_hedge():
+            metrics.incr("slm_hedges_skipped_total")
+            return await first
+
+        metrics.incr("slm_hedged_requests_total")
+        second = asyncio.ensure_future(self._attempt(secondary, fn))
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            metrics.incr("slm_hedge_wins_total")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _attempt(self, endpoint: _Endpoint, fn: Callable[[str], Awaitable[Any]]) -> Any:
+        endpoint.outstanding += 1
+        started = time.perf_counter()
+        try:
+            result = await fn(endpoint.url)
+        except self.failure_types:
+            self._record_failure(endpoint)
+            raise
+        finally:
+            endpoint.outstanding -= 1
+        endpoint.consecutive_failures = 0
+        endpoint.latencies.append(time.perf_counter() - started)
+        return result
+
+    def _record_failure(self, endpoint: _Endpoint) -> None:
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self.failure_threshold and endpoint.healthy:
+            endpoint.ejected_until = time.monotonic() + self.ejection_seconds
+            metrics.incr("slm_endpoint_ejections_total")
+            logger.warning("SLM endpoint ejected for %.0fs: %s", self.ejection_seconds, endpoint.url)
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "url": e.url,
+                "outstanding": e.outstanding,
+                "healthy": e.healthy,
+                "consecutive_failures": e.consecutive_failures,
+            }
+            for e in self.endpoints
+        ]
@@ -0,0 +1,221 @@
+import logging
+import re
+import time
+import unicodedata
+from typing import Callable, Optional
+
+from backend.app.core.metrics import metrics
+from backend.app.inference.text_utils import normalize_message
+from backend.app.services.alias_normalizer import get_alias_normalizer
+from backend.app.models.schemas import (
+    AIIntentResponse,
+    IntentEnum,
+    KhataActionEnum,
+    KhataParsedRecord,
+)
+
+logger = logging.getLogger(__name__)
+
+# prefix of AIIntentResponse.reasoning for decisions made by this parser
+FAST_PATH_REASONING_PREFIX = "fast_path:"
+
+# lexicon
+
+NUMBER_WORDS = {
+    "aadha": 0.5, "adha": 0.5, "half": 0.5, "dedh": 1.5, "dhai": 2.5, "dhaai": 2.5,
+    "ek": 1, "one": 1, "do": 2, "two": 2, "teen": 3, "three": 3, "char": 4, "chaar": 4,
+    "four": 4, "paanch": 5, "panch": 5, "five": 5, "chhe": 6, "che": 6, "six": 6,
+    "saat": 7, "seven": 7, "aath": 8, "eight": 8, "nau": 9, "nine": 9, "das": 10,
+    "ten": 10, "barah": 12, "twelve": 12, "bees": 20, "twenty": 20, "pachas": 50,
+    "pachaas": 50, "fifty": 50, "sau": 100, "hundred": 100,
+}
+
+UNITS = frozenset({
+    "packet", "packets", "pkt", "pkts", "paket", "box", "boxes", "dabba", "dabbe", "kg", "kgs",
+    "kilo", "kilos", "g", "gm", "gms", "gram", "grams", "l", "ltr", "ltrs", "litre", "litres",
+    "liter", "liters", "ml", "dozen", "darjan", "piece", "pieces", "pcs", "pc", "nag", "bottle",
+    "bottles", "bag", "bags", "bori", "carton", "cartons", "tray", "trays", "crate", "crates",
+    "peti", "pouch", "pouches", "unit", "units", "pack", "packs",
+    "पैकेट", "किलो", "लीटर", "डिब्बा", "डिब्बे", "दर्जन", "बोतल",
+})
+
+FILLERS = frozenset({
+    "ka", "ki", "ke", "hai", "he", "ho", "gaya", "gya", "gayi", "gai", "ne", "ko", "the",
+    "of", "please", "pls", "plz", "bhai", "ji", "sir", "aur", "and", "se", "me", "mein",
+    "abhi", "jaldi", "kar", "kr", "karo", "do", "de", "dena", "sirf",
+    # pronouns and time words: "mujhe kal 10 packet milk chahiye"
+    "mujhe", "muje", "mujhko", "hume", "humein", "hamein", "humko", "mera", "meri", "mere",
+    "hamara", "hamare", "aaj", "kal", "parso", "subah", "shaam", "raat", "turant", "phir", "fir", "bhi",
+})
+
+# "10 packet milk nahi aaya" says the opposite of the verb; never settle these by rules
+NEGATIONS = frozenset({"nahi", "nahin", "nhi", "na", "mat", "not", "no", "नहीं", "मत"})
+
+# an item the alias dictionary does not know ("5 rs add") may not be a product at all
+UNKNOWN_ITEM_CONFIDENCE = 0.6
+
+_NUM = r"\d+(?:\.\d+)?"
+
+# (intent, trailing verb phrase) — order matters: the first pattern that matches wins
+_INTENT_VERBS = [
+    (IntentEnum.DELIVERY_CONFIRMATION, r"delivered|deliver\s+(?:kar|kr)\s+diya|deliver\s+ho\s+gaya|supplied|supply\s+(?:kar|kr)\s+diya|pahuncha\s+diya|bhej\s+diya"),
+    (IntentEnum.REORDER, r"reorder|re-order|req|request|order|mangao|mangwao|mangwa\s+do|manga\s+do|chahiye|chaiye|bhejo|bhej\s+do|send"),
+    (IntentEnum.STOCK_UPDATE, r"update|updated|add|added|aaya|aya|aa\s+gaya|aa\s+gya|received|stock\s+(?:me|mein)\s+(?:dalo|daalo|daal\s+do)"),
+]
+_TAIL = r"(?:\s+(?:hai|ho\s+gaya|kar\s+do|kr\s+do|karo|please|pls|plz|ji|bhai))*"
+
+_INTENT_PATTERNS = [
+    (intent, re.compile(rf"^(?P<body>.+?)\s+(?P<verb>{verbs}){_TAIL}$"))
+    for intent, verbs in _INTENT_VERBS
+]
+
+_AMOUNT = rf"(?:rs\.?\s*|₹\s*)?(?P<amount>{_NUM})\s*(?:rs|rupaye|rupay|rupees|rupee|₹)?"
+_NAME = r"(?P<name>[^\W\d_][^\W\d_ .]*(?:\s+[^\W\d_][^\W\d_ .]*){0,2})"
+
+_KHATA_PATTERNS = [
+    (
+        KhataActionEnum.PAYMENT_RECEIVED,
+        re.compile(rf"^{_NAME}\s+ne\s+{_AMOUNT}\s+(?:diya|diye|de\s+diya|jama\s+(?:kiya|kiye|kara|karaya)|jama|paid|pay\s+kiya|chukaya|wapas\s+kiya|lautaya){_TAIL}$"),
+    ),
+    (
+        KhataActionEnum.CREDIT_GIVEN,
+        re.compile(rf"^{_NAME}\s+(?:ko|ke\s+naam|ka|ke)\s+{_AMOUNT}\s+(?:udhaar|udhar|udhari|credit|baki|baaki)(?:\s+(?:diya|de\s+diya|likho|likh\s+do|likh\s+diya|par|pe|me|mein|hai))*$"),
+    ),
+    (
+        KhataActionEnum.CREDIT_GIVEN,
+        re.compile(rf"^{_NAME}\s+{_AMOUNT}\s+(?:udhaar|udhar|credit)(?:\s+(?:diya|likho|likh\s+do|par|pe))*$"),
+    ),
+]
+
+_NAME_STOPWORDS = frozenset({"maine", "mene", "humne", "customer", "total"})
+
+
+def _is_word(token: str) -> bool:
+    # letters plus combining marks, so Devanagari words with matras count as words
+    return all(ch.isalpha() or unicodedata.category(ch).startswith("M") for ch in token)
+
+
+def _to_number(token: str) -> Optional[float]:
+    if re.fullmatch(_NUM, token):
+        return float(token)
+    return NUMBER_WORDS.get(token)
+
+
+class HinglishFastParser:
+    """
+    Deterministic parser for the common shapes of owner/distributor messages.
+    Returns a result only with a confidence score; callers fall back to the
+    SLM when the score is below their threshold or nothing matched.
+    Item words are checked with `known_token` (default: the global alias
+    dictionary); an unknown word keeps the score below the threshold.
+    """
+
+    def __init__(self, known_token: Optional[Callable[[str], bool]] = None) -> None:
+        self._known_token = known_token
+
+    def _is_known(self, token: str) -> bool:
+        if self._known_token is None:
+            self._known_token = get_alias_normalizer().knows_token
+        return self._known_token(token)
+
+    def parse_intent(self, text: str) -> Optional[AIIntentResponse]:
+        started = time.perf_counter()
+        result = self._parse_intent(text)
+        metrics.observe("fast_path_seconds", time.perf_counter() - started)
+        metrics.incr("fast_path_matches_total" if result else "fast_path_no_match_total")
+        return result
+
+    def parse_khata(self, text: str) -> Optional[KhataParsedRecord]:
+        norm = normalize_message(text)
+        for action, pattern in _KHATA_PATTERNS:
+            match = pattern.match(norm)
+            if not match:
+                continue
+            name = match.group("name").strip()
+            if name.split()[0] in _NAME_STOPWORDS:
+                return None
+            amount = float(match.group("amount"))
+            if amount <= 0:
+                return None
+            confidence = 0.95 if len(name.split()) == 1 else 0.9
+            return KhataParsedRecord(
+                customer_name=self._display_name(text, name),
+                amount=amount,
+                action=action,
+                confidence=confidence,
+            )
+        return None
+
+    def _parse_intent(self, text: str) -> Optional[AIIntentResponse]:
+        norm = normalize_message(text)
+        if not norm:
+            return None
+        if not NEGATIONS.isdisjoint(norm.split()):
+            return None
+
+        khata = self.parse_khata(text)
+        if khata is not None:
+            return AIIntentResponse(
+                intent=IntentEnum.KHATA_UPDATE,
+                customer_name=khata.customer_name,
+                quantity=khata.amount,
+                confidence=khata.confidence,
+                original_text=text,
+                reasoning=f"{FAST_PATH_REASONING_PREFIX} khata {khata.action.value}",
+            )
+
+        for intent, pattern in _INTENT_PATTERNS:
+            match = pattern.match(norm)
+            if not match:
+                continue
+            parsed = self._parse_item_body(match.group("body"))
+            if parsed is None:
+                return None
+            sku, quantity, confidence = parsed
+            return AIIntentResponse(
+                intent=intent,
+                sku=sku,
+                quantity=quantity,
+                confidence=confidence,
+                original_text=text,
+                reasoning=f"{FAST_PATH_REASONING_PREFIX} '{match.group('verb')}' -> {intent.value}",
+            )
+        return None
+
+    def _parse_item_body(self, body: str) -> Optional[tuple[str, float, float]]:
+        """Splits '<qty> <unit> <item>' (any order) into (sku, quantity, confidence)."""
+        quantity: Optional[float] = None
+        item_tokens: list[str] = []
+        saw_unit = False
+        for token in body.split():
+            # "do" is far more often "give" than "two" in these messages
+            number = None if token == "do" else _to_number(token)
+            if number is not None:
+                if quantity is not None:
+                    return None  # two quantities: leave it to the model
+                quantity = number
+            elif token in UNITS:
+                saw_unit = True
+            elif token not in FILLERS:
+                item_tokens.append(token)
+
+        if not item_tokens or len(item_tokens) > 3:
+            return None
+        if not all(_is_word(t) for t in item_tokens):
+            return None
+
+        confidence = 0.9 if quantity is not None else 0.75
+        if saw_unit:
+            confidence += 0.05
+        if len(item_tokens) > 2:
+            confidence -= 0.15
+        if not all(self._is_known(t) for t in item_tokens):
+            confidence = min(confidence, UNKNOWN_ITEM_CONFIDENCE)
+        return " ".join(item_tokens), (quantity if quantity is not None else 1.0), round(min(confidence, 0.95), 2)
+
+    @staticmethod
+    def _display_name(original: str, name: str) -> str:
+        """Recovers the name as typed (e.g. 'Ramesh'), falling back to title case."""
+        match = re.search(re.escape(name), original, flags=re.IGNORECASE)
+        typed = match.group(0) if match else name
+        return typed if typed != typed.lower() else typed.title()
@@ -0,0 +1,55 @@
+class JSONObjectScanner:
+    """
+    Incremental scanner over streamed model output. Tracks bracket depth
+    outside of string literals and reports when the first top-level JSON
+    object (or array) is closed, so the caller can stop reading the stream.
+    Any text before the opening bracket (code fences, chatter) is skipped.
+    """
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self.complete = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> bool:
+        """Consumes a chunk; returns True once the top-level value is complete."""
+        if self.complete or not chunk:
+            return self.complete
+
+        start = 0
+        if not self._started:
+            positions = [p for p in (chunk.find("{"), chunk.find("[")) if p != -1]
+            if not positions:
+                return False
+            start = min(positions)
+            self._started = True
+
+        for i in range(start, len(chunk)):
+            ch = chunk[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(chunk[start:i + 1])
+                    self.complete = True
+                    return True
+
+        self._parts.append(chunk[start:])
+        return False
@@ -0,0 +1,167 @@
+import json
+import logging
+import re
+from typing import Any
+
+from backend.app.core.metrics import metrics
+from backend.app.models.schemas import IntentEnum, KhataActionEnum
+
+logger = logging.getLogger(__name__)
+
+# JSON schemas passed to Ollama's structured `format` option (constrained decoding)
+
+INTENT_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intent": {"type": "string", "enum": [i.value for i in IntentEnum]},
+        "sku": {"type": ["string", "null"]},
+        "quantity": {"type": ["number", "null"]},
+        "customer_name": {"type": ["string", "null"]},
+        "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["intent", "confidence"],
+}
+
+INTENT_CLASS_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intent": INTENT_JSON_SCHEMA["properties"]["intent"],
+        "confidence": INTENT_JSON_SCHEMA["properties"]["confidence"],
+    },
+    "required": ["intent", "confidence"],
+}
+
+INTENT_BATCH_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                **INTENT_JSON_SCHEMA,
+                "properties": {"index": {"type": "integer"}, **INTENT_JSON_SCHEMA["properties"]},
+                "required": ["index", *INTENT_JSON_SCHEMA["required"]],
+            },
+        },
+    },
+    "required": ["results"],
+}
+
+KHATA_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "customer_name": {"type": "string"},
+        "amount": {"type": "number"},
+        "action": {"type": "string", "enum": [a.value for a in KhataActionEnum]},
+        "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+    },
+    "required": ["customer_name", "amount", "action", "confidence"],
+}
+
+OUTPUT_SCHEMAS = {
+    "intent": INTENT_JSON_SCHEMA,
+    "intent_class": INTENT_CLASS_JSON_SCHEMA,
+    "intent_batch": INTENT_BATCH_JSON_SCHEMA,
+    "khata": KHATA_JSON_SCHEMA,
+}
+
+
+class ModelOutputError(ValueError):
+    """Raised when model output cannot be turned into JSON, even after repair."""
+
+
+# set on every object on the truncated tail of a repaired output; consumers treat its values as unconfirmed
+REPAIRED_KEY = "_repaired"
+
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*|\s*```\s*$")
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+# a number or literal with nothing after it may itself be cut off ("quantity": 1 of 12)
+_TRAILING_SCALAR_RE = re.compile(r"(?<=[:,\[])\s*[-+.\w]+$")
+
+
+def _repair(text: str) -> str:
+    """
+    Drops a truncated trailing value (a cut-off string like "mil" must not
+    become a SKU name, nor "1" of "12" a quantity), then any dangling key
+    or comma, and closes open brackets.
+    """
+    stack: list[str] = []
+    in_string = False
+    escape = False
+    string_start = 0
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+            string_start = i
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+
+    if in_string:
+        text = text[:string_start]
+    text = _TRAILING_SCALAR_RE.sub("", text.rstrip()).rstrip()
+    # dangling `"key":` or `,` at the cut-off point
+    text = re.sub(r',?\s*"(?:[^"\\]|\\.)*"\s*:\s*$', "", text)
+    text = re.sub(r",\s*$", "", text)
+    if stack and stack[-1] == "}":
+        # a bare key with no colon, e.g. {"intent": "reorder", "sku"
+        text = re.sub(r'([,{])\s*"(?:[^"\\]|\\.)*"$', lambda m: "" if m.group(1) == "," else "{", text)
+    text += "".join(reversed(stack))
+    return _TRAILING_COMMA_RE.sub(r"\1", text)
+
+
+def parse_model_json(raw: str, step: str = "slm") -> Any:
+    """
+    Strict parser for model output: strips code fences and surrounding
+    chatter, parses the first JSON object/array and, when the output was
+    truncated or slightly malformed, repairs it once before giving up.
+    """
+    metrics.incr(f"{step}_parse_total")
+    text = _FENCE_RE.sub("", (raw or "").strip())
+    starts = [p for p in (text.find("{"), text.find("[")) if p != -1]
+    if not starts:
+        _record_failure(raw, step)
+        raise ModelOutputError("no JSON object in model output")
+    text = text[min(starts):]
+
+    decoder = json.JSONDecoder()
+    try:
+        value, _ = decoder.raw_decode(text)
+        return value
+    except json.JSONDecodeError:
+        pass
+
+    try:
+        value, _ = decoder.raw_decode(_repair(text))
+    except json.JSONDecodeError as exc:
+        _record_failure(raw, step)
+        raise ModelOutputError(f"unparseable model output: {exc}") from exc
+    metrics.incr(f"{step}_parse_repaired_total")
+    _mark_repaired(value)
+    return value
+
+
+def _mark_repaired(value: Any) -> None:
+    """Flags the objects along the cut-off tail (the last item of a batch, not the complete ones)."""
+    while isinstance(value, (dict, list)):
+        if isinstance(value, dict):
+            tail = next(reversed(value.values()), None)
+            value[REPAIRED_KEY] = True
+            value = tail
+        else:
+            value = value[-1] if value else None
+
+
+def _record_failure(raw: str, step: str) -> None:
+    metrics.incr(f"{step}_parse_failures_total")
+    # ~4 characters per token; Ollama does not report counts once we stop reading early
+    metrics.incr(f"{step}_wasted_tokens_total", max(1, len(raw or "") // 4))
+    logger.warning("Model output parse failure | step=%s | raw=%r", step, (raw or "")[:200])
@@ -2,15 +2,96 @@ import httpx
 import json
 import logging
 import asyncio
+import re
+import time
 from typing import Optional, Dict, Any
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from configs.config import get_settings
+from backend.app.core.cache import TTLCache
+from backend.app.core.concurrency import AdaptiveConcurrencyLimiter, CircuitBreaker, SingleFlight
+from backend.app.core.http_clients import get_http_client
+from backend.app.core.metrics import metrics
+from backend.app.inference.batching import MicroBatcher
+from backend.app.inference.endpoint_pool import EndpointPool
+from backend.app.inference.json_stream import JSONObjectScanner
+from backend.app.inference.output_parser import OUTPUT_SCHEMAS, REPAIRED_KEY, ModelOutputError, parse_model_json
+from backend.app.inference.text_utils import normalize_message
 from backend.app.models.schemas import AIIntentResponse, IntentEnum
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# confidence ceiling for a decision read from repaired (truncated) output: its
+# last field may be missing and defaulted (quantity -> 1.0), so it is never
+# cached and stock updates from it ask the owner to confirm
+REPAIRED_CONFIDENCE_CAP = 0.3
+REPAIRED_REASONING_PREFIX = "repaired output"
+
+# bump whenever the intent system prompt changes so cached decisions are not reused
+INTENT_PROMPT_VERSION = "v1"
+
+INTENT_SCHEMA_HINT = (
+    "{\n"
+    "  \"intent\": \"stock_update\" | \"reorder\" | \"lost_sale\" | \"khata_update\" | \"delivery_confirmation\",\n"
+    "  \"sku\": \"item name\",\n"
+    "  \"quantity\": number,\n"
+    "  \"customer_name\": \"name if khata\",\n"
+    "  \"confidence\": 0.0-1.0,\n"
+    "  \"reasoning\": \"brief explanation\"\n"
+    "}\n"
+)
+
+INTENT_SYSTEM_PROMPT = (
+    "You are a Kirana Store AI specializing in Hinglish. "
+    "Analyze the user message and return a JSON object sticking to this schema:\n"
+    + INTENT_SCHEMA_HINT +
+    "Example Store Owner: '10 packet milk update' -> {intent: stock_update, sku: milk, ...}\n"
+    "Example Distributor: '50 bread boxes delivered' -> {intent: delivery_confirmation, sku: bread, quantity: 50, ...}"
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "You are a Kirana Store AI specializing in Hinglish. "
+    "You receive several numbered messages. Analyze each one independently and return "
+    "{\"results\": [...]} with exactly one object per message, in order, each with an "
+    "\"index\" field equal to the message number and otherwise sticking to this schema:\n"
+    + INTENT_SCHEMA_HINT +
+    "Example: 1. '10 packet milk update' 2. '50 bread boxes delivered' -> "
+    "{results: [{index: 1, intent: stock_update, sku: milk, ...}, {index: 2, intent: delivery_confirmation, sku: bread, quantity: 50, ...}]}"
+)
+
+CLASSIFIER_SYSTEM_PROMPT = (
+    "You are a Kirana Store AI specializing in Hinglish. "
+    "Classify the message into one intent and return only "
+    "{\"intent\": \"stock_update\" | \"reorder\" | \"lost_sale\" | \"khata_update\" | "
+    "\"delivery_confirmation\" | \"unknown\", \"confidence\": 0.0-1.0}. "
+    "Greetings, questions and chit-chat are \"unknown\"."
+)
+
+# failures that count against the model's health and are worth a retry
+_MODEL_FAILURES = (httpx.RequestError, httpx.HTTPStatusError, asyncio.TimeoutError)
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+def _canonical_number(match: re.Match) -> str:
+    int_part, _, frac = match.group().partition(".")
+    int_part = int_part.lstrip("0") or "0"
+    frac = frac.rstrip("0")
+    return f"{int_part}.{frac}" if frac else int_part
+
+
+def intent_cache_key(text: str, model: str) -> str:
+    """Normalised text (numbers canonicalised, e.g. 010.0 -> 10) plus model and prompt version."""
+    norm = _NUMBER_RE.sub(_canonical_number, normalize_message(text))
+    return f"{model}:{INTENT_PROMPT_VERSION}:{norm}"
+
+
+def is_repaired(response: AIIntentResponse) -> bool:
+    """True when the decision was read from repaired (truncated) model output."""
+    return (response.reasoning or "").startswith(REPAIRED_REASONING_PREFIX)
+
+
 class SLMService:
     """
     Production-grade Small Language Model Service.
@@ -18,74 +99,325 @@ class SLMService:
     """
     
     def __init__(self):
-        self.endpoint = settings.resolved_ai_model_endpoint
+        self._endpoints = EndpointPool(
+            settings.resolved_ai_model_endpoints,
+            failure_types=_MODEL_FAILURES,
+            failure_threshold=settings.SLM_ENDPOINT_FAILURE_THRESHOLD,
+            ejection_seconds=settings.SLM_ENDPOINT_EJECTION_SECONDS,
+            hedging=settings.SLM_HEDGING_ENABLED,
+            can_hedge=lambda: self._limiter.has_capacity,
+        )
         self.model = settings.AI_MODEL_NAME
-        self.default_timeout = 30.0
+        self._intent_cache = TTLCache(
+            maxsize=settings.SLM_CACHE_MAXSIZE,
+            ttl=settings.SLM_CACHE_TTL_SECONDS,
+        )
+        self._redis = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight = SingleFlight("slm")
+        self._limiter = AdaptiveConcurrencyLimiter(
+            "slm",
+            initial_limit=settings.SLM_LIMITER_INITIAL,
+            max_limit=settings.SLM_LIMITER_MAX,
+            latency_target=settings.SLM_LIMITER_LATENCY_TARGET_SECONDS,
+            queue_timeout=settings.SLM_LIMITER_QUEUE_TIMEOUT_SECONDS,
+        )
+        self._breaker = CircuitBreaker(
+            "slm",
+            failure_threshold=settings.SLM_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.SLM_BREAKER_RESET_SECONDS,
+        )
+        self._batcher = (
+            MicroBatcher(
+                "slm",
+                self._extract_batch,
+                max_batch=settings.SLM_BATCH_MAX_SIZE,
+                max_wait=settings.SLM_BATCH_MAX_WAIT_MS / 1000.0,
+            )
+            if settings.SLM_BATCHING_ENABLED
+            else None
+        )
+
+    def _get_redis(self):
+        if not settings.SLM_CACHE_REDIS:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            # async clients are bound to their event loop (one asyncio.run per Celery task)
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(settings.REDIS_URL)
+            self._redis_loop = loop
+        return self._redis
+
+    async def aclose(self) -> None:
+        """Closes the Redis cache client; call before the event loop that created it ends."""
+        client, self._redis, self._redis_loop = self._redis, None, None
+        if client is not None:
+            await client.aclose()
+
+    async def _cache_get(self, key: str) -> Optional[AIIntentResponse]:
+        cached = self._intent_cache.get(key)
+        if cached is not None:
+            metrics.incr("slm_cache_hits_total")
+            return cached
+        client = self._get_redis()
+        if client is not None:
+            try:
+                raw = await client.get(f"znshop:slm:{key}")
+                if raw:
+                    cached = AIIntentResponse.model_validate_json(raw)
+                    self._intent_cache.set(key, cached)
+                    metrics.incr("slm_cache_hits_total")
+                    metrics.incr("slm_cache_redis_hits_total")
+                    return cached
+            except Exception as exc:
+                logger.warning(f"SLM cache Redis read failed: {exc}")
+        metrics.incr("slm_cache_misses_total")
+        return None
+
+    async def _cache_set(self, key: str, response: AIIntentResponse) -> None:
+        # repaired or unsure decisions are not reused; the next identical
+        # message gets a fresh model call instead
+        if is_repaired(response) or response.confidence < settings.STOCK_UPDATE_MIN_CONFIDENCE:
+            metrics.incr("slm_cache_skipped_total")
+            return
+        # the caller returns `response` itself; the cache keeps its own copy
+        self._intent_cache.set(key, response.model_copy())
+        client = self._get_redis()
+        if client is not None:
+            try:
+                await client.set(
+                    f"znshop:slm:{key}",
+                    response.model_dump_json(),
+                    ex=int(settings.SLM_CACHE_TTL_SECONDS),
+                )
+            except Exception as exc:
+                logger.warning(f"SLM cache Redis write failed: {exc}")
+
+    @property
+    def available(self) -> bool:
+        """False while the circuit breaker is open; callers should use a fallback."""
+        return not self._breaker.is_open
+
+    def cache_stats(self) -> dict:
+        return self._intent_cache.stats()
+
+    async def _call_llm(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        temperature: float = 0.1,
+        num_predict: int = 256,
+        schema: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> str:
+        """
+        Async call to the LLM; concurrent identical calls share one request.
+        `schema` names an entry of OUTPUT_SCHEMAS to constrain decoding to;
+        `model` overrides AI_MODEL_NAME (e.g. the cascade's classifier).
+        """
+        model = model or self.model
+        key = (prompt, system_prompt, model, temperature, num_predict, schema)
+        return await self._inflight.do(
+            key, lambda: self._generate(prompt, system_prompt, temperature, num_predict, schema, model)
+        )
 
     @retry(
-        retry=retry_if_exception_type((httpx.RequestError, httpx.HTTPStatusError, asyncio.TimeoutError)),
+        retry=retry_if_exception_type(_MODEL_FAILURES),
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
+        wait=wait_exponential(multiplier=0.5, min=0.5, max=4),
         reraise=True
     )
-    async def _call_llm(self, prompt: str, system_prompt: str = "", temperature: float = 0.1) -> str:
-        """Low-level async call to the LLM with retry logic."""
+    async def _generate(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        temperature: float = 0.1,
+        num_predict: int = 256,
+        schema: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> str:
+        """
+        Low-level async call to the LLM with retry logic. Every attempt goes
+        through the circuit breaker and the adaptive concurrency limiter;
+        CircuitOpenError and LimiterTimeoutError are not retried.
+        """
         payload = {
-            "model": self.model,
+            "model": model or self.model,
             "prompt": prompt,
             "system": system_prompt,
             "stream": False,
-            "format": "json",
+            "format": OUTPUT_SCHEMAS[schema] if schema and settings.SLM_STRUCTURED_OUTPUT else "json",
             "options": {
                 "temperature": temperature,
-                "num_predict": 256,
+                "num_predict": num_predict,
             }
         }
         
-        async with httpx.AsyncClient(timeout=self.default_timeout) as client:
-            logger.info(f"Calling SLM model {self.model}")
-            response = await client.post(self.endpoint, json=payload)
+        # one limiter slot per request sent: a hedged call holds two while both are in flight
+        return await self._breaker.call(
+            lambda: self._endpoints.call(lambda url: self._limiter.run(lambda: self._post(url, payload))),
+            failure_types=_MODEL_FAILURES,
+        )
+
+    async def _post(self, endpoint: str, payload: dict) -> str:
+        client = get_http_client("ollama")
+        logger.info(f"Calling SLM model {payload['model']} at {endpoint}")
+        if settings.SLM_STREAMING:
+            return await self._generate_streaming(client, endpoint, payload)
+        response = await client.post(endpoint, json=payload)
+        response.raise_for_status()
+        result = response.json()
+        return result.get("response", "").strip()
+
+    async def _generate_streaming(self, client: httpx.AsyncClient, endpoint: str, payload: dict) -> str:
+        """
+        Reads Ollama's NDJSON stream and stops as soon as the top-level JSON
+        value closes. Leaving the stream context early closes the connection,
+        which also stops generation on the Ollama side.
+        """
+        payload = {**payload, "stream": True}
+        scanner = JSONObjectScanner()
+        started = time.perf_counter()
+        first_token_at = None
+        async with client.stream("POST", endpoint, json=payload) as response:
             response.raise_for_status()
-            result = response.json()
-            return result.get("response", "").strip()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                metrics.incr("slm_tokens_generated_total")
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    metrics.observe("slm_time_to_first_token_seconds", first_token_at - started)
+                if scanner.feed(chunk.get("response", "")):
+                    metrics.observe("slm_time_to_decision_seconds", time.perf_counter() - started)
+                    if not chunk.get("done"):
+                        metrics.incr("slm_stream_early_stop_total")
+                    break
+                if chunk.get("done"):
+                    break
+        return scanner.text.strip()
+
+    def _to_intent_response(self, data: dict, text: str) -> AIIntentResponse:
+        if "intent" in data:
+            try:
+                data["intent"] = IntentEnum(data["intent"])
+            except ValueError:
+                data["intent"] = IntentEnum.UNKNOWN
+        data.pop("index", None)
+        repaired = data.pop(REPAIRED_KEY, False)
+        response = AIIntentResponse(**data)
+        response.original_text = text
+        if repaired:
+            response.confidence = min(response.confidence, REPAIRED_CONFIDENCE_CAP)
+            response.reasoning = f"{REPAIRED_REASONING_PREFIX}; {response.reasoning or ''}".rstrip("; ")
+        return response
+
+    async def _extract_batch(self, texts: list[str]) -> list[Optional[dict]]:
+        """
+        One numbered multi-message prompt for a micro-batch of texts.
+        Entries that cannot be mapped back, and every entry of a batch whose
+        request failed, come out as None and are retried one by one by the caller.
+        """
+        if len(texts) == 1:
+            return [None]
+        numbered = "\n".join(f"{i}. \"{t}\"" for i, t in enumerate(texts, start=1))
+        prompt = f"Messages:\n{numbered}\nJSON Output:"
+        try:
+            raw_response = await self._call_llm(
+                prompt, BATCH_SYSTEM_PROMPT, num_predict=160 * len(texts), schema="intent_batch"
+            )
+            data = parse_model_json(raw_response, step="slm")
+        except ModelOutputError as exc:
+            logger.warning(f"SLM batch output unparseable, falling back to single calls: {exc}")
+            metrics.incr("slm_batch_fallback_total", len(texts))
+            return [None] * len(texts)
+        except _MODEL_FAILURES as exc:
+            # a long batch prompt is the likeliest to time out; shorter single calls may still succeed
+            logger.warning(f"SLM batch request failed, falling back to single calls: {exc!r}")
+            metrics.incr("slm_batch_fallback_total", len(texts))
+            return [None] * len(texts)
+
+        items = data.get("results") if isinstance(data, dict) else data
+        results: list[Optional[dict]] = [None] * len(texts)
+        for position, item in enumerate(items if isinstance(items, list) else []):
+            if not isinstance(item, dict) or "intent" not in item:
+                # e.g. the last item of a truncated batch
+                continue
+            index = item.get("index", position + 1)
+            if isinstance(index, int) and 1 <= index <= len(texts) and results[index - 1] is None:
+                results[index - 1] = item
+        missing = results.count(None)
+        if missing:
+            metrics.incr("slm_batch_fallback_total", missing)
+        return results
+
+    async def classify_intent(self, text: str) -> AIIntentResponse:
+        """
+        Intent-only call to the small classifier model (AI_CLASSIFIER_MODEL_NAME).
+        Entities are left empty; failures come back as UNKNOWN with zero confidence.
+        """
+        model = settings.AI_CLASSIFIER_MODEL_NAME
+        prompt = f"Message: \"{text}\"\nJSON Output:"
+
+        cache_key = intent_cache_key(text, f"{model}:class") if settings.SLM_CACHE_ENABLED else None
+        if cache_key:
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                return cached.model_copy(update={"original_text": text})
+
+        try:
+            raw_response = await self._call_llm(
+                prompt, CLASSIFIER_SYSTEM_PROMPT, num_predict=32, schema="intent_class", model=model
+            )
+            data = parse_model_json(raw_response, step="slm_classifier")
+            response = self._to_intent_response(
+                {
+                    "intent": data.get("intent"),
+                    "confidence": data.get("confidence", 0.0),
+                    REPAIRED_KEY: data.get(REPAIRED_KEY, False),
+                },
+                text,
+            )
+            if cache_key:
+                await self._cache_set(cache_key, response)
+            return response
+        except Exception as e:
+            logger.error(f"SLM Classification Failed: {e} | Text: {text}")
+            return AIIntentResponse(
+                intent=IntentEnum.UNKNOWN,
+                confidence=0.0,
+                original_text=text,
+                reasoning=f"Error: {str(e)}"
+            )
 
     async def extract_intent_and_entities(self, text: str) -> AIIntentResponse:
         """
         Parses text to extract structured intent and entities using an SLM.
         Includes reasoning and confidence scoring.
         """
-        system_prompt = (
-            "You are a Kirana Store AI specializing in Hinglish. "
-            "Analyze the user message and return a JSON object sticking to this schema:\n"
-            "{\n"
-            "  \"intent\": \"stock_update\" | \"reorder\" | \"lost_sale\" | \"khata_update\" | \"delivery_confirmation\",\n"
-            "  \"sku\": \"item name\",\n"
-            "  \"quantity\": number,\n"
-            "  \"customer_name\": \"name if khata\",\n"
-            "  \"confidence\": 0.0-1.0,\n"
-            "  \"reasoning\": \"brief explanation\"\n"
-            "}\n"
-            "Example Store Owner: '10 packet milk update' -> {intent: stock_update, sku: milk, ...}\n"
-            "Example Distributor: '50 bread boxes delivered' -> {intent: delivery_confirmation, sku: bread, quantity: 50, ...}"
-        )
-        
         prompt = f"Message: \"{text}\"\nJSON Output:"
-        
+
+        cache_key = intent_cache_key(text, self.model) if settings.SLM_CACHE_ENABLED else None
+        if cache_key:
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                return cached.model_copy(update={"original_text": text})
+
         try:
-            raw_response = await self._call_llm(prompt, system_prompt)
-            cleaned = raw_response.strip("`").replace("json", "").strip()
-            data = json.loads(cleaned)
-            
-            if "intent" in data:
-                try:
-                    data["intent"] = IntentEnum(data["intent"])
-                except ValueError:
-                    data["intent"] = IntentEnum.UNKNOWN
-            
-            response = AIIntentResponse(**data)
-            response.original_text = text
+            data = None
+            if self._batcher is not None:
+                data = await self._batcher.submit(text)
+            if data is None:
+                raw_response = await self._call_llm(prompt, INTENT_SYSTEM_PROMPT, schema="intent")
+                data = parse_model_json(raw_response, step="slm")
+
+            response = self._to_intent_response(data, text)
             
             logger.info(f"AI Decision: {response.intent} | Confidence: {response.confidence}")
+            if cache_key:
+                await self._cache_set(cache_key, response)
             return response
 
         except Exception as e:
@@ -1,4 +1,3 @@
-import httpx
 from typing import Optional
 import logging
 from configs.config import get_settings
@@ -44,12 +43,11 @@ class SpeechService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                # real API call goes here
-                # response = await client.post(self.asr_url, json=payload, headers={"Authorization": self.api_key})
-                # response.raise_for_status()
-                # data = response.json()
-                return TranscriptionResult(text="Mocked production transcription", confidence=0.95, language=source_lang)
+            # real API call goes here, on the pooled client from backend.app.core.http_clients
+            # response = await get_http_client("bhashini").post(self.asr_url, json=payload, headers={"Authorization": self.api_key})
+            # response.raise_for_status()
+            # data = response.json()
+            return TranscriptionResult(text="Mocked production transcription", confidence=0.95, language=source_lang)
         except Exception as e:
             logger.error(f"ASR Transcription Error: {e} | URL: {audio_url}")
             return None
@@ -0,0 +1,53 @@
+import re
+import unicodedata
+
+# Devanagari digits -> ASCII so "१०" and "10" compare equal
+_DIGIT_TABLE = str.maketrans("०१२३४५६७८९", "0123456789")
+
+_KEEP_PUNCT = frozenset(".₹/-")
+_VARIATION_SELECTORS = frozenset("\ufe0e\ufe0f")
+_SPACE_RE = re.compile(r"\s+")
+_SENTENCE_DOT_RE = re.compile(r"(?<!\d)\.|\.(?!\d)")
+# thousands separators, Indian grouping included: "1,000" and "1,00,000"
+_DIGIT_GROUP_RE = re.compile(r"(?<=\d),(?=\d)")
+
+
+def _keep(ch: str) -> bool:
+    # letters, combining marks (Devanagari matras) and digits survive; emoji, symbols and punctuation do not
+    if ch in _VARIATION_SELECTORS:
+        return False
+    return unicodedata.category(ch)[0] in "LMN" or ch.isspace() or ch in _KEEP_PUNCT
+
+
+def normalize_message(text: str) -> str:
+    """
+    Canonical form of an inbound chat message: NFKC, case-folded, Devanagari
+    digits mapped to ASCII, emoji/punctuation stripped and whitespace collapsed.
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).casefold().translate(_DIGIT_TABLE)
+    text = _DIGIT_GROUP_RE.sub("", text)
+    text = "".join(ch if _keep(ch) else " " for ch in text)
+    # drop sentence dots but keep decimals like 2.5
+    text = _SENTENCE_DOT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+_PRODUCT_SEPARATORS_RE = re.compile(r"[./₹-]+")
+
+
+def _singular(token: str) -> str:
+    # "breads" -> "bread", "eggs" -> "egg"; leaves "dal", "glass", "chips1" alone
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss") and token.isalpha():
+        return token[:-1]
+    return token
+
+
+def normalize_product_name(text: str) -> str:
+    """
+    Canonical form of a product name for SKU matching: normalize_message,
+    separators (., /, -, ₹) turned into spaces and simple plurals folded.
+    """
+    text = _PRODUCT_SEPARATORS_RE.sub(" ", normalize_message(text))
+    return " ".join(_singular(t) for t in text.split())
@@ -0,0 +1,99 @@
+import re
+import unicodedata
+
+# Devanagari -> Latin, loosely the spelling owners use when typing Hinglish
+_VOWELS = {
+    "अ": "a", "आ": "aa", "इ": "i", "ई": "ee", "उ": "u", "ऊ": "oo", "ऋ": "ri",
+    "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au", "ऑ": "o", "ऍ": "e",
+}
+_MATRAS = {
+    "ा": "aa", "ि": "i", "ी": "ee", "ु": "u", "ू": "oo", "ृ": "ri",
+    "े": "e", "ै": "ai", "ो": "o", "ौ": "au", "ॉ": "o", "ॅ": "e",
+}
+_CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n",
+    "च": "ch", "छ": "chh", "ज": "j", "झ": "jh", "ञ": "n",
+    "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n",
+    "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n",
+    "प": "p", "फ": "ph", "ब": "b", "भ": "bh", "म": "m",
+    "य": "y", "र": "r", "ल": "l", "व": "v",
+    "श": "sh", "ष": "sh", "स": "s", "ह": "h",
+}
+# consonant + nukta (NFKC decomposes the precomposed forms)
+_NUKTA_FORMS = {"क": "q", "ख": "kh", "ग": "g", "ज": "z", "ड": "r", "ढ": "rh", "फ": "f", "य": "y"}
+_SIGNS = {"ं": "n", "ँ": "n", "ः": "h"}
+_VIRAMA = "्"
+_NUKTA = "़"
+
+# spelling variants folded together: doodh/dudh, cheeni/chini, chawal/chaval, atta/aata
+_PHONETIC_RULES = [
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"w"), "v"),
+    (re.compile(r"z"), "j"),
+    (re.compile(r"q"), "k"),
+    (re.compile(r"ee|ii"), "i"),
+    (re.compile(r"oo|uu"), "u"),
+    # doubled letters, which also folds long "aa": daal -> dal, atta/aata -> ata
+    (re.compile(r"(.)\1+"), r"\1"),
+]
+
+
+def _is_devanagari(ch: str) -> bool:
+    return "ऀ" <= ch <= "ॿ"
+
+
+def _transliterate_word(word: str) -> str:
+    out: list[str] = []
+    i, n = 0, len(word)
+    while i < n:
+        ch = word[i]
+        if ch in _CONSONANTS:
+            sound = _CONSONANTS[ch]
+            i += 1
+            if i < n and word[i] == _NUKTA:
+                sound = _NUKTA_FORMS.get(ch, sound)
+                i += 1
+            out.append(sound)
+            if i < n and word[i] in _MATRAS:
+                out.append(_MATRAS[word[i]])
+                i += 1
+            elif i < n and word[i] == _VIRAMA:
+                i += 1
+            elif i < n and (word[i] in _CONSONANTS or word[i] in _SIGNS):
+                # inherent vowel; dropped at the end of the word (schwa deletion)
+                out.append("a")
+        elif ch in _VOWELS:
+            out.append(_VOWELS[ch])
+            i += 1
+        elif ch in _SIGNS:
+            out.append(_SIGNS[ch])
+            i += 1
+        elif ch in _MATRAS:
+            out.append(_MATRAS[ch])
+            i += 1
+        else:
+            if not _is_devanagari(ch):
+                out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def transliterate(text: str) -> str:
+    """Devanagari words to Latin (दूध -> doodh); other text is left as it is."""
+    if not text or not any(_is_devanagari(ch) for ch in text):
+        return text
+    text = unicodedata.normalize("NFKC", text)
+    return " ".join(_transliterate_word(w) if any(_is_devanagari(c) for c in w) else w for w in text.split(" "))
+
+
+def phonetic_key(token: str) -> str:
+    """
+    Folds common Hinglish spelling variants of a Latin word together.
+    Tokens containing digits or non-ASCII letters are returned unchanged.
+    """
+    if not token.isascii() or not token.isalpha():
+        return token
+    key = token.lower()
+    for pattern, replacement in _PHONETIC_RULES:
+        key = pattern.sub(replacement, key)
+    return key
@@ -11,9 +11,14 @@ from slowapi.errors import RateLimitExceeded
 
 from configs.config import get_settings
 from backend.app.core.logging_config import setup_logging
+from backend.app.core.http_clients import close_http_clients, http_pool_stats
+from backend.app.core.metrics import metrics
 from backend.app.api.v1 import whatsapp, compliance
 from backend.app.api.v1 import admin, inventory, alerts, khata
 from backend.app.dashboard.router import router as dashboard_router
+from backend.app.ml.intent_classifier import get_intent_classifier
+from backend.app.services.inventory_service import get_stock_buffer
+from backend.app.services.sender_resolver import get_sender_resolver
 
 setup_logging()
 
@@ -105,9 +110,31 @@ async def _log_routes() -> None:
         "set" if ((settings.REDIS_URL or "") or (os.getenv("REDIS_URL") or "")).strip() else "missing",
         "set" if (((settings.AI_MODEL_ENDPOINT or "") or (settings.OLLAMA_URL or "") or (os.getenv("AI_MODEL_ENDPOINT") or "") or (os.getenv("OLLAMA_URL") or "")).strip()) else "missing",
     )
+    try:
+        get_sender_resolver().warm()
+    except Exception as exc:
+        logger.warning("Sender index warm-up skipped: %s", exc)
+    get_intent_classifier()
+    if settings.WEBHOOK_PROCESSING_MODE == "queue":
+        await whatsapp.get_webhook_queue().start()
     logger.info("Services initialized")
 
 
+@app.on_event("shutdown")
+async def _shutdown() -> None:
+    await whatsapp.get_webhook_queue().stop()
+    await whatsapp.get_sender_lanes().stop()
+    if settings.STOCK_WRITE_BEHIND_ENABLED:
+        await get_stock_buffer().stop()
+    await close_http_clients()
+    logger.info("Shutdown complete")
+
+
 @app.get("/health", tags=["Health"])
 async def health() -> dict:
     return {"status": "ok", "service": "ZnShop API", "version": app.version}
+
+
+@app.get("/metrics", tags=["Health"])
+async def get_metrics() -> dict:
+    return {**metrics.snapshot(), "http_pools": http_pool_stats()}
@@ -0,0 +1,161 @@
+import logging
+import os
+import zlib
+from functools import lru_cache
+from typing import Optional, Sequence
+
+import numpy as np
+
+from configs.config import get_settings
+from backend.app.inference.text_utils import normalize_message
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# reasoning recorded on the classifier's decisions (excluded from its training data)
+LOCAL_CLASSIFIER_REASONING = "intent classifier"
+
+
+def featurize(text: str, n_features: int, ngram_range: tuple[int, int] = (2, 4)) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Hashed character n-grams of the normalised text (padded with spaces so
+    word boundaries count), as sorted unique indices with L2-normalised,
+    sublinear (1 + log tf) weights.
+    """
+    norm = f" {normalize_message(text)} "
+    if not norm.strip():
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    lo, hi = ngram_range
+    hashes = [
+        zlib.crc32(norm[i:i + n].encode("utf-8")) % n_features
+        for n in range(lo, hi + 1)
+        for i in range(len(norm) - n + 1)
+    ]
+    indices, counts = np.unique(np.asarray(hashes, dtype=np.int64), return_counts=True)
+    values = (1.0 + np.log(counts)).astype(np.float32)
+    values /= np.linalg.norm(values)
+    return indices, values
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class CharNgramIntentClassifier:
+    """
+    Multinomial logistic regression over hashed character n-grams. Small
+    enough to keep in process: prediction is a gather-and-sum over the
+    message's n-gram rows of the weight matrix.
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        labels: Sequence[str],
+        ngram_range: tuple[int, int] = (2, 4),
+    ) -> None:
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.labels = list(labels)
+        self.n_features = weights.shape[0]
+        self.ngram_range = (int(ngram_range[0]), int(ngram_range[1]))
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        indices, values = featurize(text, self.n_features, self.ngram_range)
+        logits = values @ self.weights[indices] + self.bias
+        return _softmax(logits)
+
+    def predict(self, text: str) -> tuple[str, float]:
+        """Returns (label, probability) for the most likely intent."""
+        probs = self.predict_proba(text)
+        best = int(np.argmax(probs))
+        return self.labels[best], float(probs[best])
+
+    @classmethod
+    def fit(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        n_features: int = 2 ** 16,
+        ngram_range: tuple[int, int] = (2, 4),
+        epochs: int = 20,
+        learning_rate: float = 0.5,
+        l2: float = 1e-5,
+        batch_size: int = 64,
+        seed: int = 0,
+    ) -> "CharNgramIntentClassifier":
+        """Mini-batch SGD on the softmax cross-entropy with L2 regularisation."""
+        classes = sorted(set(labels))
+        class_index = {c: i for i, c in enumerate(classes)}
+        rows = [featurize(t, n_features, ngram_range) for t in texts]
+        keep = [i for i, (idx, _) in enumerate(rows) if len(idx)]
+        if not keep:
+            raise ValueError("no usable training texts")
+        rows = [rows[i] for i in keep]
+        targets = np.array([class_index[labels[i]] for i in keep], dtype=np.int64)
+
+        weights = np.zeros((n_features, len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            order = rng.permutation(len(rows))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                indices = np.concatenate([rows[i][0] for i in batch])
+                values = np.concatenate([rows[i][1] for i in batch])
+                owner = np.repeat(np.arange(len(batch)), [len(rows[i][0]) for i in batch])
+
+                # X @ W for the sparse batch: scatter-add each n-gram's weight row
+                logits = np.zeros((len(batch), len(classes)), dtype=np.float32)
+                np.add.at(logits, owner, values[:, None] * weights[indices])
+                grad = _softmax(logits + bias)
+                grad[np.arange(len(batch)), targets[batch]] -= 1.0
+                grad /= len(batch)
+
+                # X^T @ grad, again only over the touched rows
+                weight_grad = values[:, None] * grad[owner]
+                if l2:
+                    weights[np.unique(indices)] *= 1.0 - learning_rate * l2
+                np.add.at(weights, indices, -learning_rate * weight_grad)
+                bias -= learning_rate * grad.sum(axis=0)
+        return cls(weights, bias, classes, ngram_range)
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path,
+            weights=self.weights.astype(np.float16),
+            bias=self.bias,
+            labels=np.array(self.labels),
+            ngram_range=np.array(self.ngram_range),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CharNgramIntentClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["weights"],
+                data["bias"],
+                [str(label) for label in data["labels"]],
+                tuple(int(n) for n in data["ngram_range"]),
+            )
+
+
+@lru_cache()
+def get_intent_classifier() -> Optional[CharNgramIntentClassifier]:
+    """The artifact at INTENT_CLASSIFIER_PATH, or None when unset or missing."""
+    path = settings.INTENT_CLASSIFIER_PATH
+    if not path:
+        return None
+    if not os.path.exists(path):
+        logger.warning(f"Intent classifier artifact not found at {path}; local classifier disabled")
+        return None
+    try:
+        classifier = CharNgramIntentClassifier.load(path)
+    except Exception as exc:
+        logger.error(f"Failed to load intent classifier from {path}: {exc}")
+        return None
+    logger.info(f"Intent classifier loaded | labels={classifier.labels} | features={classifier.n_features}")
+    return classifier
@@ -0,0 +1,122 @@
+"""
+Trains the in-process intent classifier from ai_audit_logs.
+
+Run from the project root:
+    python -m backend.app.ml.train_intent_classifier --output backend/data/intent_classifier.npz
+"""
+import argparse
+import logging
+import re
+from collections import Counter
+
+import numpy as np
+
+from backend.app.db.supabase import get_supabase_admin_client
+from backend.app.inference.fast_path import FAST_PATH_REASONING_PREFIX
+from backend.app.inference.text_utils import normalize_message
+from backend.app.ml.experiments.logging_config import (
+    log_experiment_metrics,
+    log_experiment_params,
+    setup_experiment_tracking,
+)
+from backend.app.ml.intent_classifier import LOCAL_CLASSIFIER_REASONING, CharNgramIntentClassifier
+from backend.app.models.schemas import IntentEnum
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(message)s")
+logger = logging.getLogger(__name__)
+
+INTENT_STEPS = ("text_intent_extraction", "voice_intent_extraction")
+
+# `output` is str(model_dump()), so the intent is either a plain string or an enum repr
+_INTENT_RE = re.compile(r"'intent':\s*(?:<IntentEnum\.\w+:\s*)?'(\w+)'")
+
+_VALID_INTENTS = {i.value for i in IntentEnum}
+
+
+def fetch_examples(min_confidence: float, limit: int, page_size: int = 1000) -> list[tuple[str, str]]:
+    """(text, intent) pairs from ai_audit_logs, newest first."""
+    db = get_supabase_admin_client()
+    examples: list[tuple[str, str]] = []
+    offset = 0
+    while len(examples) < limit:
+        res = (
+            db.table("ai_audit_logs")
+            .select("input, output, confidence, reasoning")
+            .in_("step", list(INTENT_STEPS))
+            .gte("confidence", min_confidence)
+            .order("timestamp", desc=True)
+            .range(offset, offset + page_size - 1)
+            .execute()
+        )
+        rows = res.data or []
+        for row in rows:
+            reasoning = row.get("reasoning") or ""
+            # only model decisions are labels: the classifier's own and the
+            # fast-path parser's would just teach it to copy their rules
+            if (
+                reasoning.startswith("Error")
+                or reasoning.startswith(FAST_PATH_REASONING_PREFIX)
+                or reasoning == LOCAL_CLASSIFIER_REASONING
+            ):
+                continue
+            match = _INTENT_RE.search(row.get("output") or "")
+            if match and match.group(1) in _VALID_INTENTS and row.get("input"):
+                examples.append((row["input"], match.group(1)))
+        if len(rows) < page_size:
+            break
+        offset += page_size
+    return examples[:limit]
+
+
+def deduplicate(examples: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """One example per normalised text, labelled with its most common intent."""
+    votes: dict[str, Counter] = {}
+    texts: dict[str, str] = {}
+    for text, intent in examples:
+        key = normalize_message(text)
+        if not key:
+            continue
+        votes.setdefault(key, Counter())[intent] += 1
+        texts.setdefault(key, text)
+    return [(texts[key], counter.most_common(1)[0][0]) for key, counter in votes.items()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="backend/data/intent_classifier.npz")
+    parser.add_argument("--min-confidence", type=float, default=0.7)
+    parser.add_argument("--limit", type=int, default=50000)
+    parser.add_argument("--features", type=int, default=2 ** 16)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--holdout", type=float, default=0.1)
+    args = parser.parse_args()
+
+    examples = deduplicate(fetch_examples(args.min_confidence, args.limit))
+    if len(examples) < 20:
+        raise SystemExit(f"Only {len(examples)} usable examples in ai_audit_logs; not training")
+    logger.info(f"Training on {len(examples)} examples | {Counter(i for _, i in examples)}")
+
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(examples))
+    n_holdout = int(len(examples) * args.holdout)
+    holdout = [examples[i] for i in order[:n_holdout]]
+    train = [examples[i] for i in order[n_holdout:]]
+
+    setup_experiment_tracking("intent_classifier")
+    log_experiment_params({"examples": len(train), "features": args.features, "epochs": args.epochs})
+
+    classifier = CharNgramIntentClassifier.fit(
+        [t for t, _ in train], [i for _, i in train], n_features=args.features, epochs=args.epochs
+    )
+    if holdout:
+        correct = sum(classifier.predict(text)[0] == intent for text, intent in holdout)
+        accuracy = correct / len(holdout)
+        logger.info(f"Holdout accuracy: {accuracy:.3f} on {len(holdout)} examples")
+        log_experiment_metrics({"holdout_accuracy": accuracy})
+
+    classifier.save(args.output)
+    logger.info(f"Saved intent classifier to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
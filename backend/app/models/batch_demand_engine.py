@@ -0,0 +1,193 @@
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+import numpy as np
+
+from configs.config import get_settings
+from backend.app.core.metrics import metrics
+from backend.app.db.supabase import get_supabase_admin_client
+from backend.app.models.demand_engine import (
+    HIGH_DEMAND_THRESHOLD,
+    LOST_SALES_SATURATION,
+    SEASONALITY_BASELINE,
+    VELOCITY_SATURATION,
+    VELOCITY_WINDOW_DAYS,
+    W_LOST,
+    W_SEASON,
+    W_VELOCITY,
+    lost_sales_key,
+    remember_signal,
+    should_record_signal,
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def _parse_ts(value: Optional[str]) -> float:
+    """ISO timestamp -> epoch seconds; unparseable values count as now (no decay), like the per-SKU engine."""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (ValueError, TypeError, AttributeError):
+        return time.time()
+
+
+def compute_demand_scores(
+    sales: np.ndarray,
+    lost_qty: np.ndarray,
+    lost_age_days: np.ndarray,
+    seasonality: np.ndarray,
+    half_life_days: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorised DemandSensingEngine formula over aligned per-SKU arrays.
+    Returns (scores, velocity, decayed lost quantity).
+    """
+    velocity = np.minimum(sales / VELOCITY_SATURATION, 1.0)
+    lost = lost_qty * np.exp(-math.log(2) * np.maximum(lost_age_days, 0.0) / half_life_days)
+    lost_norm = np.minimum(lost / LOST_SALES_SATURATION, 1.0)
+    scores = np.round(np.minimum(velocity * W_VELOCITY + lost_norm * W_LOST + seasonality * W_SEASON, 5.0), 2)
+    return scores, velocity, lost
+
+
+class BatchDemandEngine:
+    """
+    Scores every SKU of a store at once: the SKU list, per-SKU sales
+    counts (sku_sales_counts rpc) and the store's lost-sales accumulators
+    are fetched with a few paged bulk queries, scores are computed with
+    NumPy over aligned arrays and the signals that pass the write policy
+    (should_record_signal) go back with one bulk insert per
+    `insert_chunk` rows. Same formula and constants as
+    DemandSensingEngine, so a store scores identically either way.
+    """
+
+    def __init__(
+        self,
+        half_life_days: Optional[float] = None,
+        page_size: int = 1000,
+        insert_chunk: int = 5000,
+    ) -> None:
+        self._db = None
+        self.half_life_days = half_life_days or settings.LOST_SALES_HALF_LIFE_DAYS
+        self.page_size = page_size
+        self.insert_chunk = insert_chunk
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = get_supabase_admin_client()
+        return self._db
+
+    def _fetch_all(self, query: Callable[[], object]) -> list[dict]:
+        """All rows of a query, paged with range() (PostgREST caps rows per response)."""
+        rows: list[dict] = []
+        offset = 0
+        while True:
+            page = query().range(offset, offset + self.page_size - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows
+            offset += self.page_size
+
+    def _load_inputs(
+        self, store_id: str, now: float
+    ) -> tuple[list[dict], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        skus = self._fetch_all(
+            lambda: self.db.table("skus").select("id, name").eq("store_id", store_id).order("id")
+        )
+        # same window as SalesVelocityCounters: today and the previous VELOCITY_WINDOW_DAYS - 1 days
+        since = datetime.fromtimestamp(now, timezone.utc) - timedelta(days=VELOCITY_WINDOW_DAYS - 1)
+        counts = {
+            row["sku_id"]: row["sales"]
+            for row in self._fetch_all(
+                lambda: self.db.rpc("sku_sales_counts", {"p_store_id": store_id, "p_since": since.isoformat()})
+            )
+        }
+        previous = {
+            row["sku_id"]: float(row["demand_score"])
+            for row in self._fetch_all(lambda: self.db.rpc("latest_demand_scores", {"p_store_id": store_id}))
+        }
+        accumulators = {
+            row["sku_key"]: row
+            for row in self._fetch_all(
+                lambda: self.db.table("lost_sales_accumulators")
+                .select("sku_key, decayed_qty, updated_at")
+                .eq("store_id", store_id)
+                .order("sku_key")
+            )
+        }
+
+        n = len(skus)
+        sales = np.zeros(n)
+        lost_qty = np.zeros(n)
+        lost_age_days = np.zeros(n)
+        last_scores = np.full(n, np.nan)
+        for i, sku in enumerate(skus):
+            sales[i] = counts.get(sku["id"], 0)
+            last_scores[i] = previous.get(sku["id"], np.nan)
+            acc = accumulators.get(lost_sales_key(store_id, sku["name"]))
+            if acc is not None:
+                lost_qty[i] = float(acc["decayed_qty"])
+                lost_age_days[i] = (now - _parse_ts(acc["updated_at"])) / 86400.0
+        return skus, sales, lost_qty, lost_age_days, last_scores
+
+    def score_store(self, store_id: str, threshold: float = HIGH_DEMAND_THRESHOLD) -> dict:
+        """Scores and records every SKU of the store; returns counts and the high-demand sku_ids."""
+        started = time.perf_counter()
+        now = time.time()
+        skus, sales, lost_qty, lost_age_days, last_scores = self._load_inputs(store_id, now)
+        if not skus:
+            return {"store_id": store_id, "skus": 0, "written": 0, "high_demand": []}
+
+        seasonality = np.full(len(skus), SEASONALITY_BASELINE)
+        scores, velocity, lost = compute_demand_scores(sales, lost_qty, lost_age_days, seasonality, self.half_life_days)
+
+        changed = np.flatnonzero(should_record_signal(last_scores, scores, settings.DEMAND_SIGNAL_EPSILON, threshold))
+        calculated_at = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        signals = [
+            {
+                "sku_id": skus[i]["id"],
+                "demand_score": float(scores[i]),
+                "velocity": float(velocity[i]),
+                "external_factors": {
+                    "lost_score_decayed": float(lost[i]),
+                    "seasonality": float(seasonality[i]),
+                    "calculated_at": calculated_at,
+                },
+            }
+            for i in changed
+        ]
+        for start in range(0, len(signals), self.insert_chunk):
+            self.db.table("demand_signals").insert(signals[start:start + self.insert_chunk]).execute()
+        for signal in signals:
+            remember_signal(signal["sku_id"], signal["demand_score"])
+
+        high_demand = []
+        for i in np.flatnonzero(scores > threshold):
+            high_demand.append(skus[i]["id"])
+            logger.warning(f"HIGH_DEMAND | sku_id={skus[i]['id']} score={scores[i]}")
+
+        elapsed = time.perf_counter() - started
+        metrics.observe("demand_batch_store_seconds", elapsed)
+        metrics.incr("demand_batch_skus_scored_total", len(skus))
+        metrics.incr("demand_signals_written_total", len(signals))
+        metrics.incr("demand_signals_suppressed_total", len(skus) - len(signals))
+        logger.info(
+            f"Demand batch | store_id={store_id} skus={len(skus)} written={len(signals)} "
+            f"high_demand={len(high_demand)} in {elapsed:.2f}s"
+        )
+        return {"store_id": store_id, "skus": len(skus), "written": len(signals), "high_demand": high_demand}
+
+    def score_all_stores(self, threshold: float = HIGH_DEMAND_THRESHOLD) -> int:
+        """Scores every store; returns the number of high-demand SKUs. One failing store does not stop the rest."""
+        stores = self._fetch_all(lambda: self.db.table("stores").select("id").order("id"))
+        triggered = 0
+        for store in stores:
+            try:
+                triggered += len(self.score_store(store["id"], threshold)["high_demand"])
+            except Exception as exc:
+                logger.error(f"Demand batch failed for store {store['id']}: {exc}")
+        return triggered
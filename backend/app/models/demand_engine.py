@@ -1,10 +1,59 @@
 from backend.app.db.supabase import get_supabase_admin_client
 import logging
-from datetime import datetime, timedelta, timezone
-from typing import Dict, Any
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
 import math
 
+import numpy as np
+
+from configs.config import get_settings
+from backend.app.core.cache import TTLCache
+from backend.app.core.metrics import metrics
+from backend.app.inference.text_utils import normalize_product_name
+from backend.app.services.alias_normalizer import get_alias_normalizer
+from backend.app.services.velocity_counters import get_velocity_counters
+
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# score = velocity * W_VELOCITY + lost * W_LOST + seasonality * W_SEASON (shared with BatchDemandEngine)
+W_VELOCITY, W_LOST, W_SEASON = 0.4, 0.4, 0.2
+VELOCITY_WINDOW_DAYS = 7
+VELOCITY_SATURATION = 20.0     # sales in the window that count as full velocity
+LOST_SALES_SATURATION = 10.0   # decayed lost quantity that counts as full lost demand
+SEASONALITY_BASELINE = 0.2
+HIGH_DEMAND_THRESHOLD = 2.5
+
+# last recorded demand_score per sku_id, so the write policy rarely needs a query;
+# only this process's writes update it, so entries expire after DEMAND_SIGNAL_CACHE_TTL_SECONDS
+_last_scores = TTLCache(maxsize=100_000, ttl=settings.DEMAND_SIGNAL_CACHE_TTL_SECONDS)
+
+
+def should_record_signal(previous, score, epsilon: float, threshold: float):
+    """
+    Write policy for demand_signals: record when there is no previous
+    signal (NaN), the score moved by more than `epsilon`, or it crossed
+    `threshold` in either direction. Works on floats or aligned arrays.
+    """
+    previous = np.asarray(previous, dtype=float)
+    score = np.asarray(score, dtype=float)
+    return (
+        np.isnan(previous)
+        | (np.abs(score - previous) > epsilon + 1e-9)
+        | ((previous > threshold) != (score > threshold))
+    )
+
+
+def remember_signal(sku_id: str, score: float) -> None:
+    _last_scores.set(sku_id, score)
+
+
+def lost_sales_key(store_id: str, sku_name: str) -> str:
+    """
+    Accumulator key of a product name: the generic product it names, so a
+    lost sale of "doodh" and the SKU "Amul Milk 500ml" share the row "milk".
+    """
+    return get_alias_normalizer().product_key(sku_name, store_id) or normalize_product_name(sku_name)
 
 
 class DemandSensingEngine:
@@ -13,8 +62,9 @@ class DemandSensingEngine:
     DemandScore = (SalesVelocity * 0.4) + (DecayedLostSales * 0.4) + (Seasonality * 0.2)
     """
 
-    def __init__(self) -> None:
+    def __init__(self, half_life_days: Optional[float] = None) -> None:
         self._db = None
+        self.half_life_days = half_life_days or settings.LOST_SALES_HALF_LIFE_DAYS
 
     @property
     def db(self):
@@ -22,53 +72,94 @@ class DemandSensingEngine:
             self._db = get_supabase_admin_client()
         return self._db
 
-    def _calculate_time_decay(self, timestamp_str: str, half_life_days: int = 7) -> float:
+    def _calculate_time_decay(self, timestamp_str: str, half_life_days: float = 7) -> float:
         """Applies exponential time decay to a signal."""
         try:
             dt = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
             now = datetime.now(timezone.utc)
-            age_days = (now - dt).total_seconds() / 86400.0
-            return math.exp(-0.693 * age_days / half_life_days)
-        except (ValueError, TypeError):
+            age_days = max((now - dt).total_seconds(), 0.0) / 86400.0
+            return math.exp(-math.log(2) * age_days / half_life_days)
+        except (ValueError, TypeError, AttributeError):
             return 1.0
 
-    def _sales_velocity(self, sku_id: str) -> float:
-        """Counts transactions involving this SKU in the last 7 days, normalised to [0, 1]."""
-        since = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
-        res = (
-            self.db.table("transactions")
-            .select("id", count="exact")
-            .eq("sku_id", sku_id)
-            .gte("created_at", since)
+    def record_lost_sale(self, store_id: str, sku_name: str, qty: float) -> float:
+        """
+        Logs a lost sale and folds it into the product's decayed accumulator
+        in one record_lost_sale call. Returns the accumulator's new value.
+        """
+        res = self.db.rpc("record_lost_sale", {
+            "p_store_id": store_id,
+            "p_sku_name": sku_name,
+            "p_sku_key": lost_sales_key(store_id, sku_name),
+            "p_qty": qty,
+            "p_half_life_days": self.half_life_days,
+        }).execute()
+        metrics.incr("lost_sales_recorded_total")
+        return float(res.data or 0.0)
+
+    def _lost_sales_score(self, sku_id: str) -> float:
+        """The SKU's decayed lost-sale quantity as of now: two single-row lookups, whatever the history."""
+        sku_rows = self.db.table("skus").select("store_id, name").eq("id", sku_id).limit(1).execute().data
+        if not sku_rows:
+            return 0.0
+        sku = sku_rows[0]
+        acc_rows = (
+            self.db.table("lost_sales_accumulators")
+            .select("decayed_qty, updated_at")
+            .eq("store_id", sku["store_id"])
+            .eq("sku_key", lost_sales_key(sku["store_id"], sku["name"]))
+            .limit(1)
             .execute()
+            .data
         )
-        count = res.count or 0
-        return min(count / 20.0, 1.0)
+        if not acc_rows:
+            return 0.0
+        acc = acc_rows[0]
+        return float(acc["decayed_qty"]) * self._calculate_time_decay(acc["updated_at"], self.half_life_days)
 
-    async def calculate_demand_score(self, sku_id: str) -> float:
-        velocity = self._sales_velocity(sku_id)
+    def _sales_velocity(self, sku_id: str) -> float:
+        """Sales of this SKU in the last 7 days from the rolling daily counters, normalised to [0, 1]."""
+        return min(get_velocity_counters().count(sku_id) / VELOCITY_SATURATION, 1.0)
 
-        lost_sales_res = (
-            self.db.table("lost_sales")
-            .select("detected_at, requested_qty")
-            .eq("sku_name", sku_id)
+    def _last_recorded_score(self, sku_id: str) -> Optional[float]:
+        score = _last_scores.get(sku_id)
+        if score is not None:
+            return score
+        rows = (
+            self.db.table("demand_signals")
+            .select("demand_score")
+            .eq("sku_id", sku_id)
+            .order("created_at", desc=True)
+            .limit(1)
             .execute()
+            .data
         )
+        if not rows:
+            return None
+        score = float(rows[0]["demand_score"])
+        remember_signal(sku_id, score)
+        return score
 
-        lost_score = 0.0
-        for entry in lost_sales_res.data:
-            decay = self._calculate_time_decay(entry["detected_at"])
-            lost_score += float(entry["requested_qty"]) * decay
-        lost_score_norm = min(lost_score / 10.0, 1.0)
+    async def calculate_demand_score(self, sku_id: str, threshold: float = HIGH_DEMAND_THRESHOLD) -> float:
+        velocity = self._sales_velocity(sku_id)
+
+        lost_score = self._lost_sales_score(sku_id)
+        lost_score_norm = min(lost_score / LOST_SALES_SATURATION, 1.0)
 
-        seasonality_impact = 0.2
+        seasonality_impact = SEASONALITY_BASELINE
 
-        W_VELOCITY, W_LOST, W_SEASON = 0.4, 0.4, 0.2
         demand_score = round(
             min((velocity * W_VELOCITY) + (lost_score_norm * W_LOST) + (seasonality_impact * W_SEASON), 5.0),
             2,
         )
 
+        previous = self._last_recorded_score(sku_id)
+        if not should_record_signal(
+            math.nan if previous is None else previous, demand_score, settings.DEMAND_SIGNAL_EPSILON, threshold
+        ):
+            metrics.incr("demand_signals_suppressed_total")
+            return demand_score
+
         self.db.table("demand_signals").insert({
             "sku_id": sku_id,
             "demand_score": demand_score,
@@ -79,11 +170,13 @@ class DemandSensingEngine:
                 "calculated_at": datetime.now(timezone.utc).isoformat(),
             },
         }).execute()
+        remember_signal(sku_id, demand_score)
+        metrics.incr("demand_signals_written_total")
 
         return demand_score
 
-    async def check_threshold_and_alert(self, sku_id: str, threshold: float = 2.5) -> bool:
-        score = await self.calculate_demand_score(sku_id)
+    async def check_threshold_and_alert(self, sku_id: str, threshold: float = HIGH_DEMAND_THRESHOLD) -> bool:
+        score = await self.calculate_demand_score(sku_id, threshold)
         if score > threshold:
             logger.warning(f"HIGH_DEMAND | sku_id={sku_id} score={score}")
             return True
@@ -76,10 +76,26 @@ class AssignVendorRequest(BaseModel):
 
 # inventory
 
+class SKUAliasCreate(BaseModel):
+    store_id: str
+    alias: str = Field(..., min_length=1, description="What owners write, e.g. 'doodh' or 'दूध'")
+    canonical_name: str = Field(..., min_length=1, description="Product name it stands for, e.g. 'milk'")
+
+
 class InventoryUpdateRequest(BaseModel):
     store_id: str
     sku_name: str
-    quantity_delta: float = Field(..., description="Positive to add stock, negative to subtract")
+    quantity_delta: float = Field(..., allow_inf_nan=False, description="Positive to add stock, negative to subtract")
+
+
+class InventoryBulkItem(BaseModel):
+    sku_name: str
+    delta: float = Field(..., allow_inf_nan=False, description="Positive to add stock, negative to subtract")
+
+
+class InventoryBulkRequest(BaseModel):
+    store_id: str
+    items: list[InventoryBulkItem]
 
 
 # khata
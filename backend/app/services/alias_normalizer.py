@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+from configs.config import get_settings
+from backend.app.core.cache import TTLCache
+from backend.app.core.metrics import metrics
+from backend.app.db.supabase import get_supabase_admin_client
+from backend.app.inference.text_utils import normalize_product_name
+from backend.app.inference.transliteration import phonetic_key, transliterate
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# longest alias phrase, in words ("gehu ka atta")
+_MAX_PHRASE = 3
+
+
+def _key(phrase: str) -> str:
+    """Lookup key of a phrase: product-normalised, transliterated, phonetically folded."""
+    return " ".join(phonetic_key(t) for t in transliterate(normalize_product_name(phrase)).split())
+
+
+def compile_aliases(aliases: dict[str, list[str]]) -> dict[str, str]:
+    """{canonical: [variants]} -> {variant key: canonical key}; the canonical maps to itself."""
+    table: dict[str, str] = {}
+    for canonical, variants in aliases.items():
+        target = _key(canonical)
+        if not target:
+            continue
+        for phrase in [canonical, *variants]:
+            key = _key(phrase)
+            if key:
+                table[key] = target
+    return table
+
+
+class AliasNormalizer:
+    """
+    Maps product names in any script or spelling to one canonical form:
+    Devanagari is transliterated, spelling variants are folded
+    (doodh/dudh -> dudh) and alias phrases are replaced by their canonical
+    name (doodh/दूध -> milk). The global dictionary is a JSON file that is
+    recompiled when its mtime changes; each store's own aliases come from
+    the sku_aliases table and are cached per store.
+    """
+
+    def __init__(self, path: str, store_ttl: float = 300.0, reload_check_seconds: float = 30.0) -> None:
+        self._db = None
+        self.path = path
+        self.reload_check_seconds = reload_check_seconds
+        self.version = 0
+        self._global: dict[str, str] = {}
+        self._global_tokens: frozenset[str] = frozenset()
+        self._global_products: frozenset[str] = frozenset()
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._store_tables = TTLCache(maxsize=1000, ttl=store_ttl)
+        self._maybe_reload(force=True)
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = get_supabase_admin_client()
+        return self._db
+
+    def _maybe_reload(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_check_seconds:
+            return
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                if force:
+                    logger.warning("Alias dictionary not found at %s; using store aliases only", self.path)
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path, encoding="utf-8") as fh:
+                    table = compile_aliases(json.load(fh))
+            except (OSError, ValueError) as exc:
+                logger.error("Alias dictionary reload failed, keeping previous tables: %s", exc)
+                return
+            self._global, self._mtime = table, mtime
+            self._global_tokens = frozenset(w for phrase in [*table, *table.values()] for w in phrase.split())
+            self._global_products = frozenset(table.values())
+            self.version += 1
+            metrics.incr("alias_dictionary_reloads_total")
+            logger.info("Alias dictionary compiled | entries=%d version=%d", len(table), self.version)
+
+    def _store_table(self, store_id: str) -> dict[str, str]:
+        table = self._store_tables.get(store_id)
+        if table is not None:
+            return table
+        try:
+            rows = (
+                self.db.table("sku_aliases")
+                .select("alias, canonical_name")
+                .eq("store_id", store_id)
+                .execute()
+                .data or []
+            )
+        except Exception as exc:
+            logger.warning("Store aliases unavailable for %s: %s", store_id, exc)
+            rows = []
+        aliases: dict[str, list[str]] = {}
+        for row in rows:
+            aliases.setdefault(row["canonical_name"], []).append(row["alias"])
+        table = compile_aliases(aliases)
+        self._store_tables.set(store_id, table)
+        return table
+
+    def canonicalize(self, text: str, store_id: Optional[str] = None) -> str:
+        """Canonical form of a product name; store aliases win over the global dictionary."""
+        self._maybe_reload()
+        tokens = _key(text).split()
+        if not tokens:
+            return ""
+        store_table = self._store_table(store_id) if store_id else {}
+        out: list[str] = []
+        i = 0
+        while i < len(tokens):
+            for size in range(min(_MAX_PHRASE, len(tokens) - i), 0, -1):
+                phrase = " ".join(tokens[i:i + size])
+                canonical = store_table.get(phrase) or self._global.get(phrase)
+                if canonical:
+                    out.append(canonical)
+                    i += size
+                    break
+            else:
+                out.append(tokens[i])
+                i += 1
+        return " ".join(out)
+
+    def product_key(self, text: str, store_id: Optional[str] = None) -> str:
+        """
+        The generic product a name is about: the longest canonical product
+        phrase in its canonical form, rightmost on a tie ("Amul Milk 500ml"
+        -> milk, "doodh" -> milk, "Tata Toor Dal" -> toor dal). Names with
+        no known product keep their whole canonical form.
+        """
+        canonical = self.canonicalize(text, store_id)
+        tokens = canonical.split()
+        products = set(self._store_table(store_id).values()) if store_id else set()
+        for size in range(min(_MAX_PHRASE, len(tokens)), 0, -1):
+            for i in range(len(tokens) - size, -1, -1):
+                phrase = " ".join(tokens[i:i + size])
+                if phrase in products or phrase in self._global_products:
+                    return phrase
+        return canonical
+
+    def knows_token(self, token: str) -> bool:
+        """Whether a single word is part of any product name or alias in the global dictionary."""
+        self._maybe_reload()
+        key = _key(token)
+        return bool(key) and key in self._global_tokens
+
+    def invalidate(self, store_id: Optional[str] = None) -> None:
+        """Drops one store's compiled aliases, or every store's when none is given."""
+        if store_id:
+            self._store_tables.pop(store_id)
+        else:
+            self._store_tables.clear()
+
+
+@lru_cache(maxsize=1)
+def get_alias_normalizer() -> AliasNormalizer:
+    return AliasNormalizer(
+        settings.PRODUCT_ALIASES_PATH,
+        store_ttl=settings.SKU_INDEX_TTL_SECONDS,
+        reload_check_seconds=settings.ALIAS_RELOAD_CHECK_SECONDS,
+    )
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+from configs.config import get_settings
+from backend.app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class MessageDeduplicator:
+    """
+    Idempotency guard keyed on the WhatsApp message id (messages[].id).
+    A bounded in-memory window (oldest ids evicted first) catches retries
+    hitting the same process; an optional Redis set (SET NX EX) shares the
+    guard across workers/hosts.
+    """
+
+    KEY_PREFIX = "znshop:wa:msg:"
+
+    def __init__(
+        self,
+        capacity: int = 10000,
+        ttl_seconds: int = 86400,
+        redis_url: Optional[str] = None,
+    ) -> None:
+        self.capacity = max(1, capacity)
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        # insertion-ordered, so the oldest id is evicted and forget() leaves no stale entry behind
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_redis(self):
+        if not self.redis_url:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            # async clients are bound to their event loop (one asyncio.run per Celery task)
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self.redis_url)
+            self._redis_loop = loop
+        return self._redis
+
+    def _remember(self, message_id: str) -> bool:
+        """Records the id locally; returns False if it was already present."""
+        with self._lock:
+            if message_id in self._seen:
+                return False
+            self._seen[message_id] = None
+            if len(self._seen) > self.capacity:
+                self._seen.popitem(last=False)
+            return True
+
+    async def is_duplicate(self, message_id: Optional[str]) -> bool:
+        """Returns True for a replayed message id; otherwise marks it as seen."""
+        if not message_id:
+            return False
+        if not self._remember(message_id):
+            metrics.incr("webhook_duplicates_total")
+            return True
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                created = await client.set(self.KEY_PREFIX + message_id, 1, nx=True, ex=self.ttl_seconds)
+                if not created:
+                    metrics.incr("webhook_duplicates_total")
+                    return True
+            except Exception as exc:
+                logger.warning("Dedupe Redis check failed; using in-memory guard only: %s", exc)
+        return False
+
+    async def forget(self, message_id: Optional[str]) -> None:
+        """Un-marks an id so Meta's next retry is processed (used when processing fails)."""
+        if not message_id:
+            return
+        with self._lock:
+            self._seen.pop(message_id, None)
+        client = self._get_redis()
+        if client is not None:
+            try:
+                await client.delete(self.KEY_PREFIX + message_id)
+            except Exception as exc:
+                logger.warning("Dedupe Redis forget failed: %s", exc)
+
+
+@lru_cache(maxsize=1)
+def get_message_deduplicator() -> MessageDeduplicator:
+    return MessageDeduplicator(
+        capacity=settings.WEBHOOK_DEDUPE_CAPACITY,
+        ttl_seconds=settings.WEBHOOK_DEDUPE_TTL_SECONDS,
+        redis_url=settings.REDIS_URL if settings.WEBHOOK_DEDUPE_REDIS else None,
+    )
@@ -1,11 +1,79 @@
 import logging
-from typing import Optional
+import math
+from functools import lru_cache
+from typing import Any, Iterable, Optional
 
+from configs.config import get_settings
+from backend.app.core.metrics import metrics
 from backend.app.db.supabase import get_supabase_admin_client
+from backend.app.inference.slm_service import is_repaired
 from backend.app.models.schemas import AIIntentResponse
 from backend.app.models.demand_engine import DemandSensingEngine
+from backend.app.services.sku_index import get_sku_index
+from backend.app.services.stock_buffer import StockDeltaBuffer
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def increment_stock(
+    db,
+    delta: float,
+    sku_id: Optional[str] = None,
+    store_id: Optional[str] = None,
+    sku_name: Optional[str] = None,
+) -> Optional[dict]:
+    """
+    Atomically adds `delta` to a SKU's stock via the increment_stock SQL
+    function (one round trip, safe under concurrent updates). Pass sku_id,
+    or store_id + sku_name to resolve by exact name in the same call.
+    Returns {"sku_id", "stock_level"}, or None if the name did not resolve.
+    """
+    params = {"p_delta": delta}
+    if sku_id:
+        params["p_sku_id"] = sku_id
+    else:
+        params.update({"p_store_id": store_id, "p_sku_name": sku_name})
+    res = db.rpc("increment_stock", params).execute()
+    rows = res.data or []
+    if isinstance(rows, dict):
+        rows = [rows]
+    if not rows:
+        return None
+    return {"sku_id": rows[0]["sku_id"], "stock_level": float(rows[0]["stock_level"])}
+
+
+def increment_stock_bulk(db, deltas: dict, batch_id: Optional[str] = None) -> dict:
+    """
+    Applies {sku_id: delta} in one atomic increment_stock_bulk call and
+    returns {sku_id: new stock_level}. A batch_id that was already applied
+    is a no-op and returns {}.
+    """
+    if not deltas:
+        return {}
+    params = {"p_deltas": [{"sku_id": sku_id, "delta": delta} for sku_id, delta in deltas.items()]}
+    if batch_id:
+        params["p_batch_id"] = batch_id
+    res = db.rpc("increment_stock_bulk", params).execute()
+    return {row["sku_id"]: float(row["stock_level"]) for row in res.data or []}
+
+
+async def rescore_skus(sku_ids: list) -> None:
+    """One demand re-scoring pass over SKUs whose stock changed in a batch."""
+    engine = DemandSensingEngine()
+    for sku_id in sku_ids:
+        await engine.check_threshold_and_alert(sku_id)
+
+
+@lru_cache(maxsize=1)
+def get_stock_buffer() -> StockDeltaBuffer:
+    return StockDeltaBuffer(
+        apply=lambda deltas, batch_id: increment_stock_bulk(get_supabase_admin_client(), deltas, batch_id),
+        on_flush=rescore_skus,
+        flush_interval=settings.STOCK_FLUSH_INTERVAL_MS / 1000.0,
+        max_pending=settings.STOCK_FLUSH_MAX_PENDING,
+        redis_url=settings.REDIS_URL if settings.STOCK_JOURNAL_REDIS else None,
+    )
 
 
 class InventoryOrchestrator:
@@ -28,46 +96,46 @@ class InventoryOrchestrator:
         return self._demand_engine
 
     async def _resolve_sku_id(self, sku_name: str, store_id: str) -> Optional[str]:
-        """Deterministic SKU matching: exact match first, then fuzzy."""
-        if not sku_name:
-            return None
-
-        sku_res = self.db.table("skus").select("id").eq("name", sku_name).eq("store_id", store_id).execute()
-        if sku_res.data:
-            return sku_res.data[0]["id"]
-
-        sku_res = self.db.table("skus").select("id").ilike("name", f"%{sku_name}%").eq("store_id", store_id).execute()
-        if sku_res.data:
-            return sku_res.data[0]["id"]
-
-        return None
+        """Deterministic SKU matching: exact normalised name first, then the best ranked match."""
+        match = get_sku_index().match(store_id, sku_name)
+        return match.sku_id if match else None
 
     async def update_stock(self, ai_result: AIIntentResponse, store_id: str) -> dict:
-        """Updates inventory levels based on structured AI output."""
+        """
+        Updates inventory levels based on structured AI output. With
+        STOCK_WRITE_BEHIND_ENABLED the delta is buffered and written (and
+        the SKU rescored) by the next flush instead of immediately.
+        """
         sku_name = ai_result.sku
         qty = ai_result.quantity or 1.0
+        if is_repaired(ai_result):
+            # a truncated reply may have lost the quantity (defaulted to 1.0); ask the owner instead
+            logger.info("Stock update for '%s' not applied: repaired model output", sku_name)
+            metrics.incr("stock_updates_needs_confirmation_total")
+            return {"status": "needs_confirmation", "sku_name": sku_name, "quantity": qty}
         try:
             sku_id = await self._resolve_sku_id(sku_name, store_id)
 
             if not sku_id:
                 logger.info("SKU '%s' not found for store %s; logging lost sale.", sku_name, store_id)
-                self.db.table("lost_sales").insert({
-                    "store_id": store_id,
-                    "sku_name": sku_name,
-                    "requested_qty": qty,
-                    "detected_at": "now()",
-                }).execute()
+                self.demand_engine.record_lost_sale(store_id, sku_name, qty)
                 return {"status": "not_found", "sku_name": sku_name, "detail": "SKU not found; logged as lost sale"}
 
-            inv_res = self.db.table("inventory").select("stock_level").eq("sku_id", sku_id).execute()
-            current_stock = float(inv_res.data[0]["stock_level"]) if inv_res.data else 0.0
-            new_stock = current_stock + qty
-
-            self.db.table("inventory").upsert({
-                "sku_id": sku_id,
-                "stock_level": new_stock,
-                "last_updated": "now()",
-            }).execute()
+            if settings.STOCK_WRITE_BEHIND_ENABLED:
+                await get_stock_buffer().add(sku_id, qty)
+                return {
+                    "status": "buffered",
+                    "sku_id": sku_id,
+                    "delta": qty,
+                    "confidence": ai_result.confidence,
+                }
+
+            updated = increment_stock(self.db, qty, sku_id=sku_id)
+            if updated is None:
+                # deleted since the store's SKU index was built
+                get_sku_index().invalidate(store_id)
+                return {"status": "not_found", "sku_id": sku_id, "sku_name": sku_name, "detail": "SKU no longer exists"}
+            new_stock = updated["stock_level"]
 
             alert_triggered = await self.demand_engine.check_threshold_and_alert(sku_id)
 
@@ -82,3 +150,51 @@ class InventoryOrchestrator:
             logger.exception("Inventory orchestrator update failed: %s", exc)
             return {"status": "error", "detail": str(exc)}
 
+    def bulk_update_stock(self, store_id: str, rows: Iterable[tuple[str, Any]]) -> dict:
+        """
+        Applies many (sku_name, delta) rows in one atomic increment_stock_bulk
+        call. Each distinct name is resolved once against the store's SKU
+        index (a single query when the index is cold). Returns per-row
+        results and the updated sku_ids; re-scoring is left to the caller.
+        """
+        index = get_sku_index()
+        resolved: dict[str, Optional[str]] = {}
+        results: list[dict] = []
+        deltas: dict[str, float] = {}
+        for row_no, (sku_name, raw_delta) in enumerate(rows, start=1):
+            sku_name = (sku_name or "").strip()
+            result = {"row": row_no, "sku_name": sku_name}
+            results.append(result)
+            try:
+                delta = float(raw_delta)
+            except (TypeError, ValueError):
+                delta = math.nan
+            if not math.isfinite(delta):
+                # float() also accepts "nan" and "inf", which would poison the stock level
+                result.update(status="invalid", detail=f"Invalid delta: {raw_delta!r}")
+                continue
+            if not sku_name:
+                result.update(status="invalid", detail="Missing sku_name")
+                continue
+            result["delta"] = delta
+            if sku_name not in resolved:
+                match = index.match(store_id, sku_name)
+                resolved[sku_name] = match.sku_id if match else None
+            sku_id = resolved[sku_name]
+            if sku_id is None:
+                result["status"] = "not_found"
+                continue
+            result["sku_id"] = sku_id
+            deltas[sku_id] = deltas.get(sku_id, 0.0) + delta
+
+        new_levels = increment_stock_bulk(self.db, deltas)
+        for result in results:
+            if "sku_id" in result:
+                result.update(status="updated", new_stock=new_levels.get(result["sku_id"]))
+
+        summary = {"rows": len(results), "updated": 0, "not_found": 0, "invalid": 0}
+        for result in results:
+            summary[result["status"]] += 1
+        logger.info("Bulk inventory update | store_id=%s %s skus=%d", store_id, summary, len(deltas))
+        return {"summary": summary, "results": results, "sku_ids": list(deltas)}
+
@@ -1,12 +1,16 @@
-import json
 import logging
 from datetime import datetime
 
+from configs.config import get_settings
 from backend.app.db.supabase import get_supabase_admin_client
 from backend.app.models.schemas import KhataParsedRecord, KhataActionEnum
+from backend.app.inference.fast_path import HinglishFastParser
+from backend.app.inference.output_parser import parse_model_json
+from backend.app.inference.transliteration import phonetic_key, transliterate
 from backend.app.inference.slm_service import SLMService
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 class KhataService:
@@ -15,6 +19,7 @@ class KhataService:
     def __init__(self):
         self._db = None
         self.slm = SLMService()
+        self.fast_path = HinglishFastParser()
 
     @property
     def db(self):
@@ -22,6 +27,42 @@ class KhataService:
             self._db = get_supabase_admin_client()
         return self._db
 
+    def _find_customer_id(self, name: str, store_id: str):
+        """
+        Customer lookup on the transliterated name ("रमेश" -> "ramesh"); if
+        that misses, compares spelling-folded names across the store's
+        customers so "Raamesh" still finds "Ramesh". A name that fits more
+        than one customer (two "Ramesh"es, or "Ramesh" for "Ramesh Kumar"
+        and "Ramesh Gupta") resolves to None rather than to either of them.
+        """
+        latin = transliterate(name or "").strip()
+        if not latin:
+            return None
+        cust_res = self.db.table("customers").select("id, name").ilike("name", f"%{latin}%").eq("store_id", store_id).execute()
+        if cust_res.data:
+            if len(cust_res.data) == 1:
+                return cust_res.data[0]["id"]
+            exact = [c["id"] for c in cust_res.data if (c.get("name") or "").strip().lower() == latin.lower()]
+            return self._unique(name, exact)
+
+        wanted = " ".join(phonetic_key(t) for t in latin.lower().split())
+        customers = self.db.table("customers").select("id, name").eq("store_id", store_id).execute().data or []
+        folded = {
+            c["id"]: " ".join(phonetic_key(t) for t in transliterate(c.get("name") or "").lower().split())
+            for c in customers
+        }
+        full = [cid for cid, f in folded.items() if f == wanted]
+        if full:
+            return self._unique(name, full)
+        return self._unique(name, [cid for cid, f in folded.items() if f.split()[:1] == wanted.split()])
+
+    @staticmethod
+    def _unique(name: str, ids: list):
+        if len(ids) > 1:
+            logger.warning(f"Khata customer '{name}' is ambiguous ({len(ids)} matches); not applied")
+            return None
+        return ids[0] if ids else None
+
     async def parse_khata_record(self, text: str, store_id: str):
         """
         Parses a ledger update from text/voice with structured validation.
@@ -36,23 +77,23 @@ class KhataService:
         )
         prompt = f"Ledger entry: \"{text}\"\nJSON Output:"
         
-        try:
-            raw_response = await self.slm._call_llm(prompt, system_prompt)
-            data = json.loads(raw_response.strip("`").replace("json", "").strip())
-            parsed = KhataParsedRecord(**data)
-        except Exception as e:
-            logger.error(f"Khata Parsing Failed: {e}")
-            # return a clean parse error
-            return {"error": "Failed to parse ledger entry"}
+        parsed = self.fast_path.parse_khata(text) if settings.FAST_PATH_ENABLED else None
+        if parsed is None or parsed.confidence < settings.FAST_PATH_MIN_CONFIDENCE:
+            try:
+                raw_response = await self.slm._call_llm(prompt, system_prompt, schema="khata")
+                data = parse_model_json(raw_response, step="khata")
+                parsed = KhataParsedRecord(**data)
+            except Exception as e:
+                logger.error(f"Khata Parsing Failed: {e}")
+                # return a clean parse error
+                return {"error": "Failed to parse ledger entry"}
         
         # find customer
-        cust_res = self.db.table("customers").select("id").ilike("name", f"%{parsed.customer_name}%").eq("store_id", store_id).execute()
-        
-        if not cust_res.data:
+        customer_id = self._find_customer_id(parsed.customer_name, store_id)
+
+        if not customer_id:
             # keep MVP strict: customer must exist
             return {"error": f"Customer '{parsed.customer_name}' not found"}
-            
-        customer_id = cust_res.data[0]["id"]
 
         # update ledger balance
         ledger_res = self.db.table("khata_ledger").select("balance").eq("customer_id", customer_id).execute()
@@ -0,0 +1,114 @@
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+
+from configs.config import get_settings
+from backend.app.core.cache import TTLCache
+from backend.app.core.metrics import metrics
+from backend.app.db.supabase import get_supabase_admin_client
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class SenderIdentity:
+    role: str  # owner | supplier | unknown
+    store: dict = field(default_factory=dict)
+    vendor: dict = field(default_factory=dict)
+
+    @property
+    def store_id(self) -> Optional[str]:
+        if self.role == "owner":
+            return self.store.get("id")
+        if self.role == "supplier":
+            return self.vendor.get("store_id")
+        return None
+
+
+class SenderResolver:
+    """
+    Resolves a WhatsApp phone number to (role, store row, vendor row).
+    Results live in an LRU+TTL index that is warmed on startup and
+    invalidated by the admin store/vendor routes, so known senders cost no
+    database round trips. Unknown senders are cached with a shorter TTL.
+    Invalidation is per process; the TTL bounds staleness across workers.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 600.0, negative_ttl: float = 60.0) -> None:
+        self._db = None
+        self.negative_ttl = negative_ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = get_supabase_admin_client()
+        return self._db
+
+    async def resolve(self, phone: str) -> SenderIdentity:
+        cached = self._cache.get(phone)
+        if cached is not None:
+            metrics.incr("sender_cache_hits_total")
+            return cached
+        metrics.incr("sender_cache_misses_total")
+
+        identity = self._lookup(phone)
+        self._cache.set(phone, identity, ttl=None if identity.role != "unknown" else self.negative_ttl)
+        return identity
+
+    def _lookup(self, phone: str) -> SenderIdentity:
+        store_res = self.db.table("stores").select("*").eq("contact_phone", phone).execute()
+        if store_res.data:
+            return SenderIdentity(role="owner", store=store_res.data[0])
+
+        supplier_res = self.db.table("vendors").select("*").eq("phone", phone).execute()
+        if supplier_res.data:
+            vendor = supplier_res.data[0]
+            store = {}
+            if vendor.get("store_id"):
+                sr = self.db.table("stores").select("*").eq("id", vendor["store_id"]).execute()
+                store = sr.data[0] if sr.data else {}
+            return SenderIdentity(role="supplier", store=store, vendor=vendor)
+
+        return SenderIdentity(role="unknown")
+
+    def warm(self) -> int:
+        """Loads every store owner and vendor into the index with two queries."""
+        stores = self.db.table("stores").select("*").execute().data or []
+        vendors = self.db.table("vendors").select("*").execute().data or []
+        stores_by_id = {s["id"]: s for s in stores if s.get("id")}
+
+        loaded = 0
+        for vendor in vendors:
+            if vendor.get("phone"):
+                store = stores_by_id.get(vendor.get("store_id"), {})
+                self._cache.set(vendor["phone"], SenderIdentity(role="supplier", store=store, vendor=vendor))
+                loaded += 1
+        # owners win over suppliers when a phone is registered as both
+        for store in stores:
+            if store.get("contact_phone"):
+                self._cache.set(store["contact_phone"], SenderIdentity(role="owner", store=store))
+                loaded += 1
+        logger.info("Sender index warmed | entries=%d", loaded)
+        return loaded
+
+    def invalidate(self, phone: Optional[str] = None) -> None:
+        """Drops one phone, or the whole index when no phone is given."""
+        if phone:
+            self._cache.pop(phone)
+        else:
+            self._cache.clear()
+        metrics.incr("sender_cache_invalidations_total")
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+@lru_cache(maxsize=1)
+def get_sender_resolver() -> SenderResolver:
+    return SenderResolver(
+        maxsize=settings.SENDER_CACHE_MAXSIZE,
+        ttl=settings.SENDER_CACHE_TTL_SECONDS,
+    )
@@ -0,0 +1,217 @@
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Optional
+
+from configs.config import get_settings
+from backend.app.core.cache import TTLCache
+from backend.app.core.metrics import metrics
+from backend.app.db.supabase import get_supabase_admin_client
+from backend.app.inference.text_utils import normalize_product_name
+from backend.app.services.alias_normalizer import get_alias_normalizer
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# candidates re-ranked by edit distance after the trigram/token prefilter
+_MAX_CANDIDATES = 20
+
+
+@dataclass(frozen=True)
+class SKUMatch:
+    sku_id: str
+    name: str
+    score: float
+    sku: dict = field(default_factory=dict, compare=False)
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance, two-row dynamic programme."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def _similarity(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+    return 1.0 - edit_distance(a, b) / max(len(a), len(b))
+
+
+class StoreSKUIndex:
+    """
+    Immutable match index over one store's SKUs: normalised names, token
+    and trigram postings. Lookups prefilter by postings and rank the
+    survivors by token containment and edit-distance similarity. SKU names
+    and queries go through the same `normalize` function.
+    """
+
+    def __init__(
+        self,
+        rows: list[dict],
+        normalize: Callable[[str], str] = normalize_product_name,
+        alias_version: int = 0,
+    ) -> None:
+        self.loaded_at = time.monotonic()
+        self.alias_version = alias_version
+        self.normalize = normalize
+        self.rows = [r for r in rows if r.get("id") and r.get("name")]
+        self.names = [normalize(r["name"]) for r in self.rows]
+        self.tokens = [set(n.split()) for n in self.names]
+        self.exact: dict[str, int] = {}
+        self.token_postings: dict[str, set[int]] = {}
+        self.trigram_postings: dict[str, set[int]] = {}
+        for i, name in enumerate(self.names):
+            self.exact.setdefault(name, i)
+            for token in self.tokens[i]:
+                self.token_postings.setdefault(token, set()).add(i)
+            for gram in _trigrams(name):
+                self.trigram_postings.setdefault(gram, set()).add(i)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _match(self, i: int, score: float) -> SKUMatch:
+        row = self.rows[i]
+        return SKUMatch(sku_id=row["id"], name=row["name"], score=round(score, 4), sku=row)
+
+    def _score(self, query: str, query_tokens: set[str], i: int) -> float:
+        name, tokens = self.names[i], self.tokens[i]
+        best = _similarity(query, name)
+        if query_tokens and query_tokens <= tokens:
+            # "milk" in "amul milk": strong, and stronger the more of the name it covers
+            best = max(best, 0.8 + 0.15 * len(query_tokens) / len(tokens))
+        elif len(query) >= 3 and query in name:
+            best = max(best, 0.7 + 0.2 * len(query) / len(name))
+        else:
+            # per-token typo tolerance ("suger" vs "sugar")
+            matched = [max((_similarity(q, t) for t in tokens), default=0.0) for q in query_tokens]
+            if matched:
+                best = max(best, 0.9 * sum(matched) / len(matched))
+        return best
+
+    def search(self, name: str, limit: int = 5) -> list[SKUMatch]:
+        query = self.normalize(name)
+        if not query:
+            return []
+        exact = self.exact.get(query)
+        if exact is not None:
+            return [self._match(exact, 1.0)]
+
+        query_tokens = set(query.split())
+        votes: Counter = Counter()
+        for token in query_tokens:
+            for i in self.token_postings.get(token, ()):
+                votes[i] += 3
+        for gram in _trigrams(query):
+            for i in self.trigram_postings.get(gram, ()):
+                votes[i] += 1
+        candidates = [i for i, _ in votes.most_common(_MAX_CANDIDATES)]
+
+        ranked = sorted(
+            ((self._score(query, query_tokens, i), i) for i in candidates),
+            key=lambda item: (-item[0], len(self.names[item[1]]), self.names[item[1]]),
+        )
+        return [self._match(i, score) for score, i in ranked[:limit]]
+
+    def best(self, name: str, min_score: float) -> Optional[SKUMatch]:
+        matches = self.search(name, limit=1)
+        if matches and matches[0].score >= min_score:
+            return matches[0]
+        return None
+
+
+class SKUIndex:
+    """
+    Per-store StoreSKUIndex instances, loaded with one query on first use
+    and kept for SKU_INDEX_TTL_SECONDS (or until the alias dictionary is
+    recompiled). Names are canonicalised by the AliasNormalizer, so
+    "doodh", "दूध" and "milk" find the same SKU. A miss on an index older than
+    SKU_INDEX_MISS_RELOAD_SECONDS reloads it once, so SKUs added directly
+    in the database are picked up without waiting for the TTL.
+    """
+
+    def __init__(
+        self,
+        max_stores: int = 1000,
+        ttl: float = 300.0,
+        miss_reload_seconds: float = 30.0,
+        min_score: float = 0.6,
+    ) -> None:
+        self._db = None
+        self._stores = TTLCache(maxsize=max_stores, ttl=ttl)
+        self.miss_reload_seconds = miss_reload_seconds
+        self.min_score = min_score
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = get_supabase_admin_client()
+        return self._db
+
+    def _load(self, store_id: str) -> StoreSKUIndex:
+        rows = self.db.table("skus").select("id, name, category_path").eq("store_id", store_id).execute().data or []
+        aliases = get_alias_normalizer()
+        index = StoreSKUIndex(
+            rows,
+            normalize=lambda name: aliases.canonicalize(name, store_id),
+            alias_version=aliases.version,
+        )
+        self._stores.set(store_id, index)
+        metrics.incr("sku_index_loads_total")
+        logger.info("SKU index loaded | store_id=%s skus=%d", store_id, len(index))
+        return index
+
+    def for_store(self, store_id: str) -> StoreSKUIndex:
+        index = self._stores.get(store_id)
+        if index is None or index.alias_version != get_alias_normalizer().version:
+            return self._load(store_id)
+        return index
+
+    def match(self, store_id: str, name: str, min_score: Optional[float] = None) -> Optional[SKUMatch]:
+        """Best SKU for `name` in the store, or None below the score threshold."""
+        if not name or not store_id:
+            return None
+        min_score = self.min_score if min_score is None else min_score
+        started = time.perf_counter()
+        index = self.for_store(store_id)
+        found = index.best(name, min_score)
+        if found is None and time.monotonic() - index.loaded_at >= self.miss_reload_seconds:
+            found = self._load(store_id).best(name, min_score)
+        metrics.observe("sku_match_seconds", time.perf_counter() - started)
+        metrics.incr("sku_match_hits_total" if found else "sku_match_misses_total")
+        return found
+
+    def invalidate(self, store_id: Optional[str] = None) -> None:
+        """Drops one store's index, or every index when no store is given."""
+        if store_id:
+            self._stores.pop(store_id)
+        else:
+            self._stores.clear()
+        metrics.incr("sku_index_invalidations_total")
+
+    def stats(self) -> dict:
+        return self._stores.stats()
+
+
+@lru_cache(maxsize=1)
+def get_sku_index() -> SKUIndex:
+    return SKUIndex(
+        max_stores=settings.SKU_INDEX_MAX_STORES,
+        ttl=settings.SKU_INDEX_TTL_SECONDS,
+        miss_reload_seconds=settings.SKU_INDEX_MISS_RELOAD_SECONDS,
+        min_score=settings.SKU_MATCH_MIN_SCORE,
+    )
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from backend.app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# (deltas by sku_id, batch id or None) -> new stock levels by sku_id; called in a worker thread
+ApplyFn = Callable[[dict, Optional[str]], dict]
+FlushHook = Callable[[list], Awaitable[None]]
+
+
+class StockDeltaBuffer:
+    """
+    Write-behind buffer for inventory deltas. add() sums deltas per sku_id;
+    a background flusher applies them as one bulk atomic update every
+    `flush_interval` seconds (sooner once `max_pending` SKUs are waiting)
+    and then calls `on_flush` once with the SKUs it wrote.
+
+    Without Redis, deltas waiting in memory are lost if the process dies.
+    With a Redis URL every delta is journaled (HINCRBYFLOAT) before add()
+    returns. A flush renames the journal to a batch key and applies it
+    under that batch id, which the database records, so a batch replayed
+    after a crash is applied once. Batch keys older than
+    `stale_batch_seconds` (left by a worker that died mid-flush) are looked
+    for once per `stale_batch_seconds` and replayed.
+    """
+
+    JOURNAL_KEY = "znshop:stock:journal"
+    BATCH_PREFIX = "znshop:stock:batch:"
+
+    def __init__(
+        self,
+        apply: ApplyFn,
+        on_flush: Optional[FlushHook] = None,
+        flush_interval: float = 1.0,
+        max_pending: int = 500,
+        redis_url: Optional[str] = None,
+        stale_batch_seconds: float = 60.0,
+    ) -> None:
+        self.apply = apply
+        self.on_flush = on_flush
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, max_pending)
+        self.redis_url = redis_url
+        self.stale_batch_seconds = stale_batch_seconds
+        self._pending: dict[str, float] = {}
+        self._redis = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._unapplied: list[str] = []
+        self._next_recovery_at = 0.0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _get_redis(self):
+        if self._redis is None and self.redis_url:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self.redis_url)
+        return self._redis
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # new event loop (e.g. asyncio.run in a Celery task): rebind loop-owned state
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = None
+            self._redis = None
+
+    def _ensure_running(self) -> None:
+        self._bind_loop()
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._run(), name="stock-delta-flusher")
+
+    async def add(self, sku_id: str, delta: float) -> None:
+        self._ensure_running()
+        client = self._get_redis()
+        if client is not None:
+            await client.hincrbyfloat(self.JOURNAL_KEY, sku_id, delta)
+        self._pending[sku_id] = self._pending.get(sku_id, 0.0) + delta
+        metrics.incr("stock_buffer_deltas_total")
+        metrics.set_gauge("stock_buffer_pending_skus", len(self._pending))
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as exc:
+                logger.exception("Stock buffer flush failed; will retry: %s", exc)
+
+    async def flush(self) -> list[str]:
+        """Applies everything buffered so far; returns the flushed sku_ids."""
+        self._bind_loop()
+        async with self._flush_lock:
+            if self._get_redis() is not None:
+                flushed = await self._flush_journal()
+            else:
+                flushed = await self._flush_memory()
+        metrics.set_gauge("stock_buffer_pending_skus", len(self._pending))
+        if flushed and self.on_flush is not None:
+            try:
+                await self.on_flush(flushed)
+            except Exception as exc:
+                logger.error("Stock buffer post-flush hook failed: %s", exc)
+        return flushed
+
+    async def _apply(self, deltas: dict, batch_id: Optional[str]) -> None:
+        started = time.perf_counter()
+        await asyncio.to_thread(self.apply, deltas, batch_id)
+        metrics.observe("stock_buffer_flush_seconds", time.perf_counter() - started)
+        metrics.observe("stock_buffer_flush_skus", len(deltas))
+        metrics.incr("stock_buffer_flushes_total")
+
+    async def _flush_memory(self) -> list[str]:
+        deltas, self._pending = self._pending, {}
+        deltas = {sku: d for sku, d in deltas.items() if d}
+        if not deltas:
+            return []
+        try:
+            await self._apply(deltas, None)
+        except Exception:
+            # put the deltas back (merged with anything added meanwhile) for the next flush
+            for sku, d in deltas.items():
+                self._pending[sku] = self._pending.get(sku, 0.0) + d
+            raise
+        return list(deltas)
+
+    async def _flush_journal(self) -> list[str]:
+        client = self._get_redis()
+        # not just at startup: a batch orphaned after (or shortly before) our
+        # last scan is only old enough to replay on a later one
+        now = time.monotonic()
+        if now >= self._next_recovery_at:
+            await self._recover_stale_batches(client)
+            self._next_recovery_at = now + self.stale_batch_seconds
+
+        batch_key = f"{self.BATCH_PREFIX}{int(time.time() * 1000)}:{uuid.uuid4().hex}"
+        self._pending = {}
+        try:
+            # RENAME is atomic: deltas journaled after this land in a fresh journal
+            await client.rename(self.JOURNAL_KEY, batch_key)
+            self._unapplied.append(batch_key)
+        except Exception as exc:
+            # empty journal (or another worker flushed it first)
+            if "no such key" not in str(exc).lower():
+                raise
+
+        flushed: list[str] = []
+        for key in list(self._unapplied):
+            flushed.extend(await self._apply_batch(client, key))
+            self._unapplied.remove(key)
+        return flushed
+
+    async def _apply_batch(self, client, batch_key: str) -> list[str]:
+        raw = await client.hgetall(batch_key)
+        deltas = {}
+        for sku, value in raw.items():
+            sku = sku.decode() if isinstance(sku, bytes) else sku
+            value = float(value)
+            if value:
+                deltas[sku] = value
+        if deltas:
+            await self._apply(deltas, batch_key[len(self.BATCH_PREFIX):])
+        await client.delete(batch_key)
+        return list(deltas)
+
+    async def _recover_stale_batches(self, client) -> None:
+        """Re-applies batch keys left behind by a process that died mid-flush."""
+        cutoff_ms = (time.time() - self.stale_batch_seconds) * 1000
+        async for key in client.scan_iter(match=f"{self.BATCH_PREFIX}*"):
+            key = key.decode() if isinstance(key, bytes) else key
+            try:
+                created_ms = int(key[len(self.BATCH_PREFIX):].split(":", 1)[0])
+            except ValueError:
+                continue
+            if created_ms < cutoff_ms and key not in self._unapplied:
+                logger.warning("Replaying stale stock batch %s", key)
+                metrics.incr("stock_buffer_recovered_batches_total")
+                self._unapplied.append(key)
+
+    async def stop(self) -> None:
+        """Stops the flusher and writes out whatever is still buffered."""
+        self._bind_loop()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
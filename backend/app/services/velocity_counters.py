@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Optional
+
+import numpy as np
+
+from configs.config import get_settings
+from backend.app.core.metrics import metrics
+from backend.app.db.supabase import get_supabase_admin_client
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_EPOCH = date(1970, 1, 1)
+
+# (sku_id, first day of the window) -> {day: sales}
+DailyLoader = Callable[[str, date], dict]
+
+
+def _epoch_day(now: float) -> int:
+    return int(now // 86400)
+
+
+class SalesVelocityCounters:
+    """
+    Rolling per-SKU sales counts in daily buckets. Each SKU owns one row of
+    two (n, window_days) int32 arrays: the count in each bucket and the
+    epoch day it belongs to (bucket = day % window_days), so the window
+    count is an O(window_days) masked sum with no query. A SKU's row is
+    (re)filled from sku_sales_daily, which a trigger keeps up to date as
+    transactions change, on first use and after `resync_seconds`. At most
+    `max_skus` rows are kept; the least recently counted SKU gives up its
+    row to a new one and is reloaded if it comes back.
+    """
+
+    def __init__(
+        self,
+        loader: DailyLoader,
+        window_days: int = 7,
+        resync_seconds: float = 300.0,
+        capacity: int = 1024,
+        max_skus: int = 100_000,
+    ) -> None:
+        self.loader = loader
+        self.window_days = window_days
+        self.resync_seconds = resync_seconds
+        self.max_skus = max(1, max_skus)
+        capacity = min(capacity, self.max_skus)
+        self._rows: "OrderedDict[str, int]" = OrderedDict()
+        self._counts = np.zeros((capacity, window_days), dtype=np.int32)
+        self._days = np.full((capacity, window_days), -1, dtype=np.int32)
+        self._synced_at = np.zeros(capacity, dtype=np.float64)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _row(self, sku_id: str) -> int:
+        row = self._rows.get(sku_id)
+        if row is not None:
+            self._rows.move_to_end(sku_id)
+            return row
+        if len(self._rows) >= self.max_skus:
+            _, row = self._rows.popitem(last=False)
+            metrics.incr("velocity_counter_evictions_total")
+        else:
+            row = len(self._rows)
+            if row == len(self._counts):
+                # grow by doubling up to max_skus (8 bytes per SKU-day)
+                extra = min(len(self._counts), self.max_skus - len(self._counts))
+                self._counts = np.concatenate([self._counts, np.zeros((extra, self.window_days), dtype=np.int32)])
+                self._days = np.concatenate([self._days, np.full((extra, self.window_days), -1, dtype=np.int32)])
+                self._synced_at = np.concatenate([self._synced_at, np.zeros(extra)])
+        self._rows[sku_id] = row
+        return row
+
+    def _fill(self, sku_id: str, daily: dict, now: float) -> int:
+        row = self._row(sku_id)
+        today = _epoch_day(now)
+        self._counts[row] = 0
+        self._days[row] = -1
+        for day, sales in daily.items():
+            if isinstance(day, date):
+                day = (day - _EPOCH).days
+            if today - self.window_days < day <= today:
+                slot = day % self.window_days
+                self._counts[row, slot] = sales
+                self._days[row, slot] = day
+        self._synced_at[row] = now
+        return row
+
+    def _window_sum(self, row: int, now: float) -> int:
+        days = self._days[row]
+        return int(self._counts[row][days > _epoch_day(now) - self.window_days].sum())
+
+    def load(self, sku_id: str, daily: dict, now: Optional[float] = None) -> None:
+        """Replaces a SKU's buckets with {date or epoch day: sales}; days outside the window are ignored."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._fill(sku_id, daily, now)
+
+    def count(self, sku_id: str, now: Optional[float] = None) -> int:
+        """Sales in the last `window_days` days (today included)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._rows.get(sku_id)
+            if row is not None and now - self._synced_at[row] < self.resync_seconds:
+                self._rows.move_to_end(sku_id)
+                return self._window_sum(row, now)
+        since = datetime.fromtimestamp(now, timezone.utc).date() - timedelta(days=self.window_days - 1)
+        daily = self.loader(sku_id, since)
+        metrics.incr("velocity_counter_syncs_total")
+        with self._lock:
+            # filled and summed under one lock so a concurrent eviction cannot take the row in between
+            return self._window_sum(self._fill(sku_id, daily, now), now)
+
+
+def _load_daily_sales(sku_id: str, since: date) -> dict:
+    rows = (
+        get_supabase_admin_client()
+        .table("sku_sales_daily")
+        .select("day, sales")
+        .eq("sku_id", sku_id)
+        .gte("day", since.isoformat())
+        .execute()
+        .data or []
+    )
+    return {date.fromisoformat(r["day"]): int(r["sales"]) for r in rows}
+
+
+@lru_cache(maxsize=1)
+def get_velocity_counters() -> SalesVelocityCounters:
+    from backend.app.models.demand_engine import VELOCITY_WINDOW_DAYS
+
+    return SalesVelocityCounters(
+        _load_daily_sales,
+        window_days=VELOCITY_WINDOW_DAYS,
+        resync_seconds=settings.VELOCITY_RESYNC_SECONDS,
+        max_skus=settings.VELOCITY_COUNTER_MAX_SKUS,
+    )
@@ -1,6 +1,6 @@
-import httpx
 import logging
 from configs.config import get_settings
+from backend.app.core.http_clients import get_http_client
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -35,11 +35,11 @@ class WhatsAppService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(self.base_url, json=payload, headers=headers)
-                response.raise_for_status()
-                logger.info(f"WhatsApp message sent to {to}")
-                return True
+            client = get_http_client("whatsapp")
+            response = await client.post(self.base_url, json=payload, headers=headers)
+            response.raise_for_status()
+            logger.info(f"WhatsApp message sent to {to}")
+            return True
         except Exception as e:
             logger.error(f"Failed to send WhatsApp message: {e}")
             return False
@@ -62,10 +62,10 @@ class WhatsAppService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(self.base_url, json=payload, headers=headers)
-                response.raise_for_status()
-                return True
+            client = get_http_client("whatsapp")
+            response = await client.post(self.base_url, json=payload, headers=headers)
+            response.raise_for_status()
+            return True
         except Exception as e:
             logger.error(f"Failed to send WhatsApp template: {e}")
             return False
@@ -106,11 +106,11 @@ class WhatsAppService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(self.base_url, json=payload, headers=headers)
-                response.raise_for_status()
-                logger.info(f"Interactive buttons sent to {to}")
-                return True
+            client = get_http_client("whatsapp")
+            response = await client.post(self.base_url, json=payload, headers=headers)
+            response.raise_for_status()
+            logger.info(f"Interactive buttons sent to {to}")
+            return True
         except Exception as e:
             logger.error(f"Failed to send interactive buttons: {e}")
             return False
@@ -1,5 +1,7 @@
 from celery import Celery
+from celery.signals import worker_process_shutdown
 from configs.config import get_settings
+from backend.app.core.http_clients import close_sync_http_clients
 from backend.app.core.logging_config import setup_logging
 
 settings = get_settings()
@@ -20,4 +22,15 @@ celery_app.conf.update(
     enable_utc=True,
     worker_prefetch_multiplier=1,
     task_acks_late=True,
+    beat_schedule={
+        "compact-demand-signals": {
+            "task": "backend.app.workers.tasks.compact_demand_signals",
+            "schedule": 3600.0,
+        },
+    },
 )
+
+
+@worker_process_shutdown.connect
+def _close_http_clients(**_kwargs) -> None:
+    close_sync_http_clients()
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Optional
+
+from backend.app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[Any]]
+
+
+class _Lane:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+
+
+class LaneScheduler:
+    """
+    Hashes a key (the sender phone) onto one of N async lanes.
+    Jobs in the same lane run strictly in submission order; different lanes
+    run in parallel. A lane's worker exits after `idle_timeout` seconds
+    without work and is recreated on the next submit.
+    """
+
+    def __init__(self, num_lanes: int = 16, idle_timeout: float = 60.0) -> None:
+        self.num_lanes = max(1, num_lanes)
+        self.idle_timeout = idle_timeout
+        self._lanes: dict[int, _Lane] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def active_lanes(self) -> int:
+        return len(self._lanes)
+
+    def lane_for(self, key: str) -> int:
+        return zlib.crc32(key.encode("utf-8")) % self.num_lanes
+
+    def submit(self, key: str, job: Job) -> asyncio.Future:
+        """Schedules `job` on the lane owning `key` and returns a future for its result."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # lanes are bound to the loop that created them (e.g. one asyncio.run per Celery task)
+            self._lanes = {}
+            self._loop = loop
+
+        index = self.lane_for(key)
+        lane = self._lanes.get(index)
+        if lane is None:
+            lane = self._lanes[index] = _Lane(index)
+            lane.task = loop.create_task(self._run_lane(lane), name=f"sender-lane-{index}")
+            metrics.set_gauge("webhook_lanes_active", len(self._lanes))
+
+        future = loop.create_future()
+        lane.queue.put_nowait((job, future, time.perf_counter()))
+        return future
+
+    async def run(self, key: str, job: Job) -> Any:
+        return await self.submit(key, job)
+
+    async def stop(self) -> None:
+        lanes, self._lanes = list(self._lanes.values()), {}
+        for lane in lanes:
+            if lane.task is not None:
+                lane.task.cancel()
+        await asyncio.gather(*(l.task for l in lanes if l.task is not None), return_exceptions=True)
+        metrics.set_gauge("webhook_lanes_active", 0)
+
+    async def _next_item(self, lane: _Lane):
+        getter = asyncio.ensure_future(lane.queue.get())
+        done, _ = await asyncio.wait({getter}, timeout=self.idle_timeout)
+        if done:
+            return getter.result()
+        getter.cancel()
+        try:
+            return await getter
+        except asyncio.CancelledError:
+            return None
+
+    async def _run_lane(self, lane: _Lane) -> None:
+        while True:
+            item = await self._next_item(lane)
+            if item is None:
+                if lane.queue.empty():
+                    # idle lane: reclaim it, a new one is created on the next submit
+                    if self._lanes.get(lane.index) is lane:
+                        del self._lanes[lane.index]
+                        metrics.set_gauge("webhook_lanes_active", len(self._lanes))
+                    return
+                continue
+
+            job, future, enqueued_at = item
+            if future.cancelled():
+                continue
+            metrics.observe("webhook_lane_wait_seconds", time.perf_counter() - enqueued_at)
+            try:
+                result = await job()
+            except Exception as exc:
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(result)
@@ -2,6 +2,7 @@ import logging
 from datetime import datetime, timedelta
 
 from backend.app.workers.celery_app import celery_app
+from backend.app.core.http_clients import get_sync_http_client
 from backend.app.db.supabase import get_supabase_admin_client
 
 logger = logging.getLogger(__name__)
@@ -10,7 +11,6 @@ logger = logging.getLogger(__name__)
 @celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
 def send_whatsapp_nudge(self, customer_id: str, message_template: str) -> dict:
     """Background job to send a WhatsApp nudge to a customer."""
-    import httpx
     from configs.config import get_settings
 
     settings = get_settings()
@@ -43,7 +43,7 @@ def send_whatsapp_nudge(self, customer_id: str, message_template: str) -> dict:
             "text": {"body": message_template},
         }
 
-        response = httpx.post(url, json=payload, headers=headers, timeout=10.0)
+        response = get_sync_http_client("whatsapp").post(url, json=payload, headers=headers)
         response.raise_for_status()
         logger.info(f"Nudge sent to customer {customer_id} ({phone})")
         return {"status": "sent", "customer_id": customer_id}
@@ -81,19 +81,59 @@ def check_khata_cycles() -> int:
 
 @celery_app.task
 def check_demand_alerts() -> int:
-    """Periodic task: recalculate demand scores for all active SKUs."""
-    import asyncio
-    from backend.app.models.demand_engine import DemandSensingEngine
-
-    db = get_supabase_admin_client()
-    engine = DemandSensingEngine()
+    """Periodic task: recalculate demand scores for all SKUs, one vectorised batch per store."""
+    from backend.app.models.batch_demand_engine import BatchDemandEngine
 
-    sku_res = db.table("skus").select("id").execute()
-    triggered = 0
-    for sku in sku_res.data:
-        result = asyncio.run(engine.check_threshold_and_alert(sku["id"]))
-        if result:
-            triggered += 1
+    triggered = BatchDemandEngine().score_all_stores()
 
     logger.info(f"check_demand_alerts: {triggered} high-demand SKU(s) detected")
     return triggered
+
+
+@celery_app.task
+def compact_demand_signals() -> int:
+    """Periodic task: keep only the latest demand signal per SKU per hour for older signals."""
+    from configs.config import get_settings
+
+    settings = get_settings()
+    db = get_supabase_admin_client()
+    # the function resumes from its stored watermark, so no lookback window is passed
+    res = db.rpc("compact_demand_signals", {
+        "p_older_than_hours": settings.DEMAND_SIGNAL_COMPACT_AFTER_HOURS,
+    }).execute()
+    deleted = int(res.data or 0)
+    logger.info(f"compact_demand_signals: removed {deleted} superseded signal(s)")
+    return deleted
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=5)
+def process_whatsapp_webhook(self, body: dict) -> dict:
+    """Background job for ack-first webhook processing (WEBHOOK_PROCESSING_MODE=celery)."""
+    import asyncio
+    from backend.app.api.v1.whatsapp import close_pipeline_clients, failed_messages, process_webhook_payload
+    from configs.config import get_settings
+    from backend.app.core.http_clients import close_http_clients
+    from backend.app.services.inventory_service import get_stock_buffer
+
+    settings = get_settings()
+
+    async def _run() -> dict:
+        try:
+            return await process_webhook_payload(body)
+        finally:
+            # the stock flusher and async clients are bound to this task's event loop
+            if settings.STOCK_WRITE_BEHIND_ENABLED:
+                await get_stock_buffer().stop()
+            await close_http_clients()
+            await close_pipeline_clients()
+
+    result = asyncio.run(_run())
+    # process_message catches its own errors and un-marks a message as seen only if it
+    # failed before any side effect, so only those are retried; the ones that went through
+    # (or failed part-way, status partial_failure) are not replayed
+    failed = failed_messages(body, result)
+    if failed:
+        logger.error(f"Webhook task: {len(failed)} message(s) failed; retrying them")
+        retry_body = {"entry": [{"changes": [{"value": {"messages": failed}}]}]}
+        raise self.retry(args=(retry_body,), exc=RuntimeError(f"{len(failed)} webhook message(s) failed"))
+    return result
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from backend.app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+WebhookHandler = Callable[[dict], Awaitable[Any]]
+
+
+class WebhookWorkQueue:
+    """
+    Bounded in-process work queue for ack-first webhook processing.
+    The HTTP handler enqueues and returns immediately; a fixed pool of
+    worker coroutines drains the queue in the background.
+    """
+
+    def __init__(
+        self,
+        handler: WebhookHandler,
+        maxsize: int = 1000,
+        concurrency: int = 4,
+        put_timeout: float = 0.05,
+    ) -> None:
+        self.handler = handler
+        self.maxsize = maxsize
+        self.concurrency = max(1, concurrency)
+        self.put_timeout = put_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"webhook-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info("Webhook queue started | workers=%d maxsize=%d", self.concurrency, self.maxsize)
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Webhook queue drain timed out | pending=%d", self.depth)
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("Webhook queue stopped")
+
+    async def submit(self, body: dict) -> bool:
+        """Enqueues a payload. Returns False when the queue stays full (backpressure)."""
+        if not self.running:
+            await self.start()
+        item = (time.perf_counter(), body)
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(item), timeout=self.put_timeout)
+            except asyncio.TimeoutError:
+                metrics.incr("webhook_queue_rejected_total")
+                logger.warning("Webhook queue full; rejecting delivery | depth=%d", self.depth)
+                return False
+        metrics.incr("webhook_queue_enqueued_total")
+        metrics.set_gauge("webhook_queue_depth", self.depth)
+        return True
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            enqueued_at, body = await self._queue.get()
+            started = time.perf_counter()
+            metrics.observe("webhook_queue_wait_seconds", started - enqueued_at)
+            metrics.set_gauge("webhook_queue_depth", self.depth)
+            try:
+                await self.handler(body)
+                metrics.incr("webhook_queue_processed_total")
+            except Exception as exc:
+                metrics.incr("webhook_queue_failed_total")
+                logger.exception("Webhook worker %d failed: %s", worker_id, exc)
+            finally:
+                metrics.observe("webhook_processing_seconds", time.perf_counter() - started)
+                self._queue.task_done()
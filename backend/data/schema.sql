@@ -48,6 +48,16 @@ CREATE TABLE IF NOT EXISTS skus (
     UNIQUE (store_id, name)
 );
 
+-- store-specific product aliases ("doodh" -> "milk"), on top of backend/data/product_aliases.json
+CREATE TABLE IF NOT EXISTS sku_aliases (
+    id              UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    store_id        UUID NOT NULL REFERENCES stores(id) ON DELETE CASCADE,
+    alias           TEXT NOT NULL,
+    canonical_name  TEXT NOT NULL,
+    created_at      TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE (store_id, alias)
+);
+
 CREATE TABLE IF NOT EXISTS inventory (
     sku_id          UUID PRIMARY KEY REFERENCES skus(id) ON DELETE CASCADE,
     stock_level     NUMERIC NOT NULL DEFAULT 0,
@@ -62,6 +72,17 @@ CREATE TABLE IF NOT EXISTS lost_sales (
     detected_at     TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Exponentially decayed lost-sale quantity per store and product, kept
+-- up to date by record_lost_sale(). decayed_qty is the value as of
+-- updated_at; readers decay it to the current time.
+CREATE TABLE IF NOT EXISTS lost_sales_accumulators (
+    store_id        UUID NOT NULL REFERENCES stores(id) ON DELETE CASCADE,
+    sku_key         TEXT NOT NULL,  -- generic product of the name (AliasNormalizer.product_key)
+    decayed_qty     DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (store_id, sku_key)
+);
+
 -- ============================================================
 -- CUSTOMERS & KHATA
 -- ============================================================
@@ -88,10 +109,28 @@ CREATE TABLE IF NOT EXISTS transactions (
     id              UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     customer_id     UUID NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
     store_id        UUID NOT NULL REFERENCES stores(id),
+    sku_id          UUID REFERENCES skus(id) ON DELETE SET NULL,  -- counted for sales velocity
     total_amount    NUMERIC NOT NULL,
     created_at      TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- databases created before sku_id was added
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS sku_id UUID REFERENCES skus(id) ON DELETE SET NULL;
+CREATE INDEX IF NOT EXISTS idx_transactions_store_created ON transactions (store_id, created_at);
+
+-- Sales per SKU per UTC day, maintained by trg_transactions_sku_sales_daily
+-- as transactions are inserted, re-attributed or deleted. Read for sales velocity instead of
+-- counting transactions.
+CREATE TABLE IF NOT EXISTS sku_sales_daily (
+    sku_id      UUID NOT NULL REFERENCES skus(id) ON DELETE CASCADE,
+    store_id    UUID NOT NULL REFERENCES stores(id) ON DELETE CASCADE,
+    day         DATE NOT NULL,
+    sales       INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (sku_id, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sku_sales_daily_store_day ON sku_sales_daily (store_id, day);
+
 -- ============================================================
 -- REORDER WORKFLOW
 -- ============================================================
@@ -122,6 +161,9 @@ CREATE TABLE IF NOT EXISTS demand_signals (
     created_at      TIMESTAMPTZ DEFAULT NOW()
 );
 
+CREATE INDEX IF NOT EXISTS idx_demand_signals_sku_created ON demand_signals (sku_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_demand_signals_created ON demand_signals (created_at DESC);
+
 -- ============================================================
 -- AI OBSERVABILITY
 -- ============================================================
@@ -150,6 +192,241 @@ CREATE TABLE IF NOT EXISTS audit_logs (
     created_at  TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- ============================================================
+-- FUNCTIONS (called from the backend through rpc())
+-- ============================================================
+
+-- Atomic stock increment: one statement, no read-modify-write race.
+-- Pass p_sku_id, or p_store_id + p_sku_name to resolve the SKU by
+-- case-insensitive name in the same call. Returns no row when the
+-- name does not resolve.
+CREATE OR REPLACE FUNCTION increment_stock(
+    p_delta     NUMERIC,
+    p_sku_id    UUID DEFAULT NULL,
+    p_store_id  UUID DEFAULT NULL,
+    p_sku_name  TEXT DEFAULT NULL
+)
+RETURNS TABLE (sku_id UUID, stock_level NUMERIC)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_sku_id UUID := p_sku_id;
+BEGIN
+    IF v_sku_id IS NULL THEN
+        SELECT s.id INTO v_sku_id
+        FROM skus s
+        WHERE s.store_id = p_store_id AND lower(s.name) = lower(trim(p_sku_name))
+        LIMIT 1;
+        IF v_sku_id IS NULL THEN
+            RETURN;
+        END IF;
+    END IF;
+
+    RETURN QUERY
+    INSERT INTO inventory AS i (sku_id, stock_level, last_updated)
+    VALUES (v_sku_id, p_delta, NOW())
+    ON CONFLICT (sku_id) DO UPDATE
+        SET stock_level = i.stock_level + EXCLUDED.stock_level,
+            last_updated = NOW()
+    RETURNING i.sku_id, i.stock_level;
+END;
+$$;
+
+-- Batch ids already applied by increment_stock_bulk (makes replays idempotent).
+CREATE TABLE IF NOT EXISTS applied_stock_batches (
+    batch_id    TEXT PRIMARY KEY,
+    applied_at  TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Bulk atomic increment: p_deltas is a JSON array of {"sku_id", "delta"}.
+-- Deltas for the same SKU are summed; all rows commit together. With
+-- p_batch_id set, a batch that was already applied returns no rows and
+-- changes nothing.
+CREATE OR REPLACE FUNCTION increment_stock_bulk(
+    p_deltas    JSONB,
+    p_batch_id  TEXT DEFAULT NULL
+)
+RETURNS TABLE (sku_id UUID, stock_level NUMERIC)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+    IF p_batch_id IS NOT NULL THEN
+        INSERT INTO applied_stock_batches (batch_id) VALUES (p_batch_id) ON CONFLICT DO NOTHING;
+        IF NOT FOUND THEN
+            RETURN;
+        END IF;
+    END IF;
+
+    RETURN QUERY
+    INSERT INTO inventory AS i (sku_id, stock_level, last_updated)
+    SELECT (d->>'sku_id')::UUID, SUM((d->>'delta')::NUMERIC), NOW()
+    FROM jsonb_array_elements(p_deltas) AS d
+    GROUP BY 1
+    ORDER BY 1  -- fixed lock order across concurrent batches
+    ON CONFLICT (sku_id) DO UPDATE
+        SET stock_level = i.stock_level + EXCLUDED.stock_level,
+            last_updated = NOW()
+    RETURNING i.sku_id, i.stock_level;
+END;
+$$;
+
+-- Logs a lost sale and folds it into the store/product accumulator in
+-- closed form: value * exp(-ln 2 * dt / half_life) + qty. Cost does not
+-- grow with history. Returns the new decayed value.
+CREATE OR REPLACE FUNCTION record_lost_sale(
+    p_store_id          UUID,
+    p_sku_name          TEXT,
+    p_sku_key           TEXT,
+    p_qty               NUMERIC,
+    p_half_life_days    DOUBLE PRECISION DEFAULT 7
+)
+RETURNS DOUBLE PRECISION
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_value DOUBLE PRECISION;
+BEGIN
+    INSERT INTO lost_sales (store_id, sku_name, requested_qty)
+    VALUES (p_store_id, p_sku_name, p_qty);
+
+    INSERT INTO lost_sales_accumulators AS a (store_id, sku_key, decayed_qty, updated_at)
+    VALUES (p_store_id, p_sku_key, p_qty, NOW())
+    ON CONFLICT (store_id, sku_key) DO UPDATE
+        SET decayed_qty = a.decayed_qty
+                * exp(-ln(2) * GREATEST(EXTRACT(EPOCH FROM NOW() - a.updated_at), 0) / (p_half_life_days * 86400))
+                + EXCLUDED.decayed_qty,
+            updated_at = NOW()
+    RETURNING a.decayed_qty INTO v_value;
+    RETURN v_value;
+END;
+$$;
+
+-- An UPDATE of sku_id/created_at moves the sale: it is counted as the
+-- DELETE of the old row plus the INSERT of the new one.
+CREATE OR REPLACE FUNCTION bump_sku_sales_daily()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.sku_id IS NOT NULL THEN
+        UPDATE sku_sales_daily
+        SET sales = GREATEST(sales - 1, 0)
+        WHERE sku_id = OLD.sku_id
+          AND day = (COALESCE(OLD.created_at, NOW()) AT TIME ZONE 'UTC')::DATE;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.sku_id IS NOT NULL THEN
+        INSERT INTO sku_sales_daily AS d (sku_id, store_id, day, sales)
+        VALUES (NEW.sku_id, NEW.store_id, (COALESCE(NEW.created_at, NOW()) AT TIME ZONE 'UTC')::DATE, 1)
+        ON CONFLICT (sku_id, day) DO UPDATE SET sales = d.sales + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_transactions_sku_sales_daily ON transactions;
+CREATE TRIGGER trg_transactions_sku_sales_daily
+    AFTER INSERT OR UPDATE OF sku_id, created_at OR DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION bump_sku_sales_daily();
+
+-- one-off backfill from transactions recorded before sku_sales_daily existed
+INSERT INTO sku_sales_daily (sku_id, store_id, day, sales)
+SELECT t.sku_id, t.store_id, (t.created_at AT TIME ZONE 'UTC')::DATE, COUNT(*)
+FROM transactions t
+WHERE t.sku_id IS NOT NULL
+GROUP BY 1, 2, 3
+ON CONFLICT (sku_id, day) DO NOTHING;
+
+-- Sales per SKU of one store since p_since, summed from the daily
+-- buckets so batch demand scoring needs one round trip instead of one
+-- per SKU.
+CREATE OR REPLACE FUNCTION sku_sales_counts(
+    p_store_id  UUID,
+    p_since     TIMESTAMPTZ
+)
+RETURNS TABLE (sku_id UUID, sales BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT d.sku_id, SUM(d.sales)::BIGINT
+    FROM sku_sales_daily d
+    WHERE d.store_id = p_store_id
+      AND d.day >= (p_since AT TIME ZONE 'UTC')::DATE
+    GROUP BY d.sku_id
+    ORDER BY d.sku_id;  -- stable order for paging with range()
+$$;
+
+-- Latest demand_score per SKU of one store, compared against by the
+-- batch engine's write policy.
+CREATE OR REPLACE FUNCTION latest_demand_scores(p_store_id UUID)
+RETURNS TABLE (sku_id UUID, demand_score NUMERIC)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT DISTINCT ON (ds.sku_id) ds.sku_id, ds.demand_score
+    FROM demand_signals ds
+    JOIN skus s ON s.id = ds.sku_id
+    WHERE s.store_id = p_store_id
+    ORDER BY ds.sku_id, ds.created_at DESC;
+$$;
+
+-- High-water marks of periodic maintenance jobs (e.g. how far demand
+-- signal compaction has got), so each run only scans what is new.
+CREATE TABLE IF NOT EXISTS maintenance_watermarks (
+    job         TEXT PRIMARY KEY,
+    done_until  TIMESTAMPTZ NOT NULL
+);
+
+-- Keeps only the latest demand signal per SKU per hour among signals
+-- older than p_older_than_hours. Scans from the hour of the previous
+-- run's cutoff (everything on the first run) and records the new cutoff
+-- in maintenance_watermarks. Returns the number of rows deleted.
+DROP FUNCTION IF EXISTS compact_demand_signals(INTEGER, INTEGER);
+CREATE OR REPLACE FUNCTION compact_demand_signals(p_older_than_hours INTEGER DEFAULT 24)
+RETURNS BIGINT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_cutoff  TIMESTAMPTZ := NOW() - make_interval(hours => p_older_than_hours);
+    v_since   TIMESTAMPTZ;
+    v_deleted BIGINT;
+BEGIN
+    -- make sure the watermark row exists so FOR UPDATE has something to lock,
+    -- even on the first run; -infinity means nothing has been compacted yet
+    INSERT INTO maintenance_watermarks (job, done_until)
+    VALUES ('compact_demand_signals', '-infinity')
+    ON CONFLICT (job) DO NOTHING;
+
+    -- serialises concurrent runs; the hour the last cutoff fell in was only partly compacted
+    SELECT date_trunc('hour', done_until) INTO v_since
+    FROM maintenance_watermarks
+    WHERE job = 'compact_demand_signals'
+    FOR UPDATE;
+
+    WITH ranked AS (
+        SELECT ds.id,
+               ROW_NUMBER() OVER (
+                   PARTITION BY ds.sku_id, date_trunc('hour', ds.created_at)
+                   ORDER BY ds.created_at DESC, ds.id DESC
+               ) AS rn
+        FROM demand_signals ds
+        WHERE ds.created_at < v_cutoff
+          AND ds.created_at >= v_since
+    )
+    DELETE FROM demand_signals d
+    USING ranked r
+    WHERE d.id = r.id AND r.rn > 1;
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+
+    UPDATE maintenance_watermarks
+    SET done_until = GREATEST(done_until, v_cutoff)
+    WHERE job = 'compact_demand_signals';
+    RETURN v_deleted;
+END;
+$$;
+
 -- ============================================================
 -- SECURITY (RLS)
 -- ============================================================
@@ -161,12 +438,17 @@ ALTER TABLE stores DISABLE ROW LEVEL SECURITY;
 ALTER TABLE vendors DISABLE ROW LEVEL SECURITY;
 ALTER TABLE store_vendors DISABLE ROW LEVEL SECURITY;
 ALTER TABLE skus DISABLE ROW LEVEL SECURITY;
+ALTER TABLE sku_aliases DISABLE ROW LEVEL SECURITY;
 ALTER TABLE inventory DISABLE ROW LEVEL SECURITY;
 ALTER TABLE lost_sales DISABLE ROW LEVEL SECURITY;
+ALTER TABLE lost_sales_accumulators DISABLE ROW LEVEL SECURITY;
 ALTER TABLE customers DISABLE ROW LEVEL SECURITY;
 ALTER TABLE khata_ledger DISABLE ROW LEVEL SECURITY;
 ALTER TABLE transactions DISABLE ROW LEVEL SECURITY;
+ALTER TABLE sku_sales_daily DISABLE ROW LEVEL SECURITY;
 ALTER TABLE reorder_requests DISABLE ROW LEVEL SECURITY;
 ALTER TABLE demand_signals DISABLE ROW LEVEL SECURITY;
+ALTER TABLE maintenance_watermarks DISABLE ROW LEVEL SECURITY;
 ALTER TABLE ai_audit_logs DISABLE ROW LEVEL SECURITY;
 ALTER TABLE audit_logs DISABLE ROW LEVEL SECURITY;
+ALTER TABLE applied_stock_batches DISABLE ROW LEVEL SECURITY;
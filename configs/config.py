@@ -1,4 +1,6 @@
 from functools import lru_cache
+from typing import Literal
+
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -22,7 +24,38 @@ class Settings(BaseSettings):
     OLLAMA_URL: str = "http://localhost:11434"
     AI_MODEL_ENDPOINT: str | None = None
     AI_MODEL_NAME: str = "mistral"
+    SLM_TIMEOUT_SECONDS: float = 30.0
     BHASHINI_API_KEY: str = ""
+    FAST_PATH_ENABLED: bool = True
+    FAST_PATH_MIN_CONFIDENCE: float = 0.85
+    SLM_CACHE_ENABLED: bool = True
+    SLM_CACHE_MAXSIZE: int = 5000
+    SLM_CACHE_TTL_SECONDS: float = 86400.0
+    SLM_CACHE_REDIS: bool = False
+    SLM_STREAMING: bool = True
+    # pass a JSON schema as Ollama's `format` (constrained decoding, Ollama >= 0.5)
+    SLM_STRUCTURED_OUTPUT: bool = True
+    SLM_LIMITER_INITIAL: int = 4
+    SLM_LIMITER_MAX: int = 32
+    SLM_LIMITER_LATENCY_TARGET_SECONDS: float = 8.0
+    SLM_LIMITER_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    SLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    SLM_BREAKER_RESET_SECONDS: float = 30.0
+    SLM_ENDPOINT_FAILURE_THRESHOLD: int = 3
+    SLM_ENDPOINT_EJECTION_SECONDS: float = 30.0
+    SLM_HEDGING_ENABLED: bool = False
+    SLM_BATCHING_ENABLED: bool = False
+    SLM_BATCH_MAX_SIZE: int = 8
+    SLM_BATCH_MAX_WAIT_MS: float = 15.0
+    # cascade: small intent classifier before the full extractor ("" disables it)
+    AI_CLASSIFIER_MODEL_NAME: str = ""
+    CASCADE_CLASSIFIER_MIN_CONFIDENCE: float = 0.8
+    CASCADE_EXTRACTOR_MIN_CONFIDENCE: float = 0.6
+    # below this a stock_update intent is not applied (repaired model output is capped under it)
+    STOCK_UPDATE_MIN_CONFIDENCE: float = 0.5
+    # in-process char n-gram classifier (python -m backend.app.ml.train_intent_classifier)
+    INTENT_CLASSIFIER_PATH: str = ""
+    INTENT_CLASSIFIER_MIN_CONFIDENCE: float = 0.9
 
     # workers
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -31,6 +64,50 @@ class Settings(BaseSettings):
     WHATSAPP_VERIFY_TOKEN: str = "znshop_verify"
     WHATSAPP_ACCESS_TOKEN: str = ""
     WHATSAPP_PHONE_NUMBER_ID: str = ""
+    WHATSAPP_HTTP2: bool = True
+
+    # webhook processing
+    WEBHOOK_PROCESSING_MODE: Literal["sync", "queue", "celery"] = "sync"
+    WEBHOOK_QUEUE_MAXSIZE: int = 1000
+    WEBHOOK_WORKER_CONCURRENCY: int = 4
+    WEBHOOK_SENDER_LANES: int = 16
+    WEBHOOK_LANE_IDLE_SECONDS: float = 60.0
+
+    # webhook dedupe (message ids already processed)
+    WEBHOOK_DEDUPE_CAPACITY: int = 10000
+    WEBHOOK_DEDUPE_TTL_SECONDS: int = 86400
+    WEBHOOK_DEDUPE_REDIS: bool = False
+
+    # sender resolution cache
+    SENDER_CACHE_MAXSIZE: int = 10000
+    SENDER_CACHE_TTL_SECONDS: float = 600.0
+
+    # SKU matching
+    SKU_INDEX_MAX_STORES: int = 1000
+    SKU_INDEX_TTL_SECONDS: float = 300.0
+    SKU_INDEX_MISS_RELOAD_SECONDS: float = 30.0
+    SKU_MATCH_MIN_SCORE: float = 0.6
+    # global Hinglish/Devanagari alias dictionary, recompiled when the file changes
+    PRODUCT_ALIASES_PATH: str = "backend/data/product_aliases.json"
+    ALIAS_RELOAD_CHECK_SECONDS: float = 30.0
+
+    # inventory writes
+    # write-behind inventory deltas (summed per SKU, flushed in bulk)
+    STOCK_WRITE_BEHIND_ENABLED: bool = False
+    STOCK_FLUSH_INTERVAL_MS: float = 1000.0
+    STOCK_FLUSH_MAX_PENDING: int = 500
+    STOCK_JOURNAL_REDIS: bool = False
+    INVENTORY_BULK_MAX_ROWS: int = 5000
+
+    # demand sensing
+    LOST_SALES_HALF_LIFE_DAYS: float = 7.0
+    VELOCITY_RESYNC_SECONDS: float = 300.0
+    VELOCITY_COUNTER_MAX_SKUS: int = 100_000
+    # demand_signals write policy and compaction
+    DEMAND_SIGNAL_EPSILON: float = 0.05
+    DEMAND_SIGNAL_COMPACT_AFTER_HOURS: int = 24
+    # per-process cache of each SKU's last written score; short, as other workers write too
+    DEMAND_SIGNAL_CACHE_TTL_SECONDS: float = 60.0
 
     # admin
     JWT_SECRET: str = "change-me-in-production"
@@ -56,9 +133,15 @@ class Settings(BaseSettings):
     def signing_key(self) -> str:
         return self.JWT_SECRET or self.SECRET_KEY or "change-me-in-production"
 
+    @property
+    def resolved_ai_model_endpoints(self) -> list[str]:
+        """AI_MODEL_ENDPOINT may list several Ollama generate URLs, comma-separated."""
+        endpoints = [e.strip() for e in (self.AI_MODEL_ENDPOINT or "").split(",") if e.strip()]
+        return endpoints or [f"{self.OLLAMA_URL.rstrip('/')}/api/generate"]
+
     @property
     def resolved_ai_model_endpoint(self) -> str:
-        return self.AI_MODEL_ENDPOINT or f"{self.OLLAMA_URL.rstrip('/')}/api/generate"
+        return self.resolved_ai_model_endpoints[0]
 
     @field_validator("CORS_ORIGINS", mode="before")
     @classmethod
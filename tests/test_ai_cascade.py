@@ -0,0 +1,52 @@
+"""
+Unit tests for the cascaded intent routing in AIServiceLayer.
+Run from project root:  pytest tests/test_ai_cascade.py -v
+"""
+import asyncio
+
+import pytest
+
+from backend.app.inference import ai_service as ai_module
+from backend.app.inference.ai_service import AIServiceLayer
+from backend.app.models.schemas import AIIntentResponse, IntentEnum
+
+
+class FakeSLM:
+    available = True
+
+    def __init__(self, label: AIIntentResponse):
+        self.label = label
+        self.extractor_calls = 0
+
+    async def classify_intent(self, text):
+        return self.label.model_copy(update={"original_text": text})
+
+    async def extract_intent_and_entities(self, text):
+        self.extractor_calls += 1
+        return AIIntentResponse(intent=IntentEnum.REORDER, sku="atta", quantity=2, confidence=0.9, original_text=text)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(ai_module.settings, "AI_CLASSIFIER_MODEL_NAME", "tiny")
+    return AIServiceLayer()
+
+
+def test_confident_non_entity_label_skips_extractor(service):
+    service.slm = FakeSLM(AIIntentResponse(intent=IntentEnum.UNKNOWN, confidence=0.95))
+    result = asyncio.run(service._extract("kya haal hai bhai"))
+    assert result.intent == IntentEnum.UNKNOWN
+    assert service.slm.extractor_calls == 0
+
+
+def test_entity_label_escalates_to_extractor(service):
+    service.slm = FakeSLM(AIIntentResponse(intent=IntentEnum.REORDER, confidence=0.95))
+    result = asyncio.run(service._extract("thoda atta bhej dena"))
+    assert result.sku == "atta"
+    assert service.slm.extractor_calls == 1
+
+
+def test_unsure_label_escalates_to_extractor(service):
+    service.slm = FakeSLM(AIIntentResponse(intent=IntentEnum.UNKNOWN, confidence=0.3))
+    asyncio.run(service._extract("atta ka kya scene hai"))
+    assert service.slm.extractor_calls == 1
@@ -0,0 +1,68 @@
+"""
+Unit tests for transliteration and alias normalisation of product names.
+Run from project root:  pytest tests/test_aliases.py -v
+"""
+import json
+import os
+
+import pytest
+
+from backend.app.inference.transliteration import phonetic_key, transliterate
+from backend.app.services.alias_normalizer import AliasNormalizer
+from backend.app.services.sku_index import StoreSKUIndex
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "backend", "data", "product_aliases.json")
+
+
+@pytest.fixture(scope="module")
+def aliases():
+    return AliasNormalizer(DATA_PATH)
+
+
+def test_transliterate_devanagari():
+    assert transliterate("दूध") == "doodh"
+    assert transliterate("शक्कर 2 kg") == "shakkar 2 kg"
+    assert transliterate("milk") == "milk"
+
+
+def test_phonetic_key_folds_spelling_variants():
+    assert phonetic_key("doodh") == phonetic_key("dudh")
+    assert phonetic_key("cheeni") == phonetic_key("chini")
+    assert phonetic_key("chawal") == phonetic_key("chaval")
+    assert phonetic_key("500ml") == "500ml"
+
+
+@pytest.mark.parametrize("variant", ["doodh", "Dudh", "दूध", "milk"])
+def test_variants_share_a_canonical_form(aliases, variant):
+    assert aliases.canonicalize(variant) == aliases.canonicalize("milk")
+
+
+def test_multi_word_alias(aliases):
+    assert aliases.canonicalize("arhar dal") == aliases.canonicalize("toor dal")
+
+
+def test_sku_index_matches_aliases(aliases):
+    rows = [{"id": "1", "name": "Amul Milk 500ml"}, {"id": "2", "name": "Cheeni 1kg"}]
+    index = StoreSKUIndex(rows, normalize=aliases.canonicalize)
+    assert index.best("दूध", min_score=0.6).sku_id == "1"
+    assert index.best("sugar", min_score=0.6).sku_id == "2"
+
+
+def test_dictionary_hot_reload(tmp_path):
+    path = tmp_path / "aliases.json"
+    path.write_text(json.dumps({"milk": ["doodh"]}), encoding="utf-8")
+    normalizer = AliasNormalizer(str(path), reload_check_seconds=0)
+    assert normalizer.canonicalize("kanda") == "kanda"
+
+    path.write_text(json.dumps({"milk": ["doodh"], "onion": ["kanda"]}), encoding="utf-8")
+    os.utime(path, (os.path.getmtime(path) + 5, os.path.getmtime(path) + 5))
+    assert normalizer.canonicalize("kanda") == "onion"
+    assert normalizer.version == 2
+
+
+@pytest.mark.parametrize(
+    "name,product",
+    [("doodh", "milk"), ("Amul Milk 500ml", "milk"), ("Tata Arhar Dal 1kg", "toor dal"), ("Parle G", "parle g")],
+)
+def test_product_key_names_the_generic_product(aliases, name, product):
+    assert aliases.product_key(name) == aliases.canonicalize(product)
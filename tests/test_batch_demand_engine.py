@@ -0,0 +1,147 @@
+"""
+Unit tests for vectorised batch demand scoring.
+Run from project root:  pytest tests/test_batch_demand_engine.py -v
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import backend.app.models.batch_demand_engine as batch_module
+import backend.app.models.demand_engine as demand_module
+from backend.app.inference.text_utils import normalize_product_name
+from backend.app.models.batch_demand_engine import BatchDemandEngine, compute_demand_scores
+from backend.app.services.alias_normalizer import AliasNormalizer
+
+ALIASES_PATH = os.path.join(os.path.dirname(__file__), "..", "backend", "data", "product_aliases.json")
+
+
+class FakeQuery:
+    def __init__(self, db, name, rows):
+        self.db, self.name, self.rows = db, name, rows
+        self.filters = {}
+
+    def select(self, *_):
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def order(self, *_):
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def insert(self, rows):
+        self.db.inserts.append((self.name, rows))
+        return self
+
+    def execute(self):
+        self.db.requests.append(self.name)
+        rows = [r for r in self.rows if all(r.get(k) == v for k, v in self.filters.items())]
+        start, end = getattr(self, "bounds", (0, len(rows)))
+        return SimpleNamespace(data=rows[start:end + 1])
+
+
+class FakeDB:
+    def __init__(self, tables, rpcs):
+        self.tables, self.rpcs = tables, rpcs
+        self.requests, self.inserts = [], []
+
+    def table(self, name):
+        return FakeQuery(self, name, self.tables.get(name, []))
+
+    def rpc(self, name, params):
+        return FakeQuery(self, name, self.rpcs.get(name, []))
+
+
+@pytest.fixture(autouse=True)
+def plain_keys(monkeypatch):
+    aliases = SimpleNamespace(product_key=lambda name, store_id=None: normalize_product_name(name))
+    monkeypatch.setattr(demand_module, "get_alias_normalizer", lambda: aliases)
+    monkeypatch.setattr(batch_module.settings, "DEMAND_SIGNAL_EPSILON", 0.05, raising=False)
+
+
+def test_compute_demand_scores_matches_per_sku_formula():
+    scores, velocity, lost = compute_demand_scores(
+        sales=np.array([0.0, 10.0, 40.0]),
+        lost_qty=np.array([0.0, 10.0, 20.0]),
+        lost_age_days=np.array([0.0, 7.0, 0.0]),
+        seasonality=np.full(3, 0.2),
+        half_life_days=7,
+    )
+    assert velocity.tolist() == [0.0, 0.5, 1.0]
+    assert lost == pytest.approx([0.0, 5.0, 20.0])
+    # 0.4 * velocity + 0.4 * min(lost / 10, 1) + 0.2 * 0.2
+    assert scores.tolist() == [0.04, 0.44, 0.84]
+
+
+def test_score_store_pages_inputs_and_bulk_inserts_signals():
+    now = datetime.now(timezone.utc)
+    skus = [{"id": f"sku-{i}", "store_id": "store-1", "name": f"Item {i}"} for i in range(5)]
+    db = FakeDB(
+        {
+            "skus": skus,
+            "lost_sales_accumulators": [
+                {"store_id": "store-1", "sku_key": "item 3", "decayed_qty": 20.0,
+                 "updated_at": (now - timedelta(days=7)).isoformat()},
+            ],
+        },
+        rpcs={
+            "sku_sales_counts": [{"sku_id": "sku-1", "sales": 20}],
+            # sku-0 unchanged (suppressed), sku-2 moved by 0.01 (suppressed), sku-4 moved enough
+            "latest_demand_scores": [
+                {"sku_id": "sku-0", "demand_score": 0.04},
+                {"sku_id": "sku-2", "demand_score": 0.05},
+                {"sku_id": "sku-4", "demand_score": 0.5},
+            ],
+        },
+    )
+    engine = BatchDemandEngine(half_life_days=7, page_size=2, insert_chunk=10)
+    engine._db = db
+
+    result = engine.score_store("store-1", threshold=0.4)
+
+    assert result == {"store_id": "store-1", "skus": 5, "written": 3, "high_demand": ["sku-1", "sku-3"]}
+    assert db.requests.count("skus") == 3  # 5 rows in pages of 2
+    assert len(db.inserts) == 1
+    signals = {s["sku_id"]: s for s in db.inserts[0][1]}
+    assert sorted(signals) == ["sku-1", "sku-3", "sku-4"]
+    assert signals["sku-1"]["demand_score"] == 0.44
+    assert signals["sku-3"]["external_factors"]["lost_score_decayed"] == pytest.approx(10.0, rel=1e-3)
+    assert signals["sku-4"]["demand_score"] == 0.04
+
+
+def test_lost_sale_of_an_alias_joins_the_branded_sku(monkeypatch):
+    aliases = AliasNormalizer(ALIASES_PATH)
+    aliases._store_tables.set("store-1", {})
+    monkeypatch.setattr(demand_module, "get_alias_normalizer", lambda: aliases)
+
+    # the key record_lost_sale writes for an unmatched "दूध"
+    key = demand_module.lost_sales_key("store-1", "दूध")
+
+    db = FakeDB(
+        {
+            "skus": [
+                {"id": "sku-milk", "store_id": "store-1", "name": "Amul Milk 500ml"},
+                {"id": "sku-salt", "store_id": "store-1", "name": "Tata Salt"},
+            ],
+            "lost_sales_accumulators": [
+                {"store_id": "store-1", "sku_key": key, "decayed_qty": 10.0,
+                 "updated_at": datetime.now(timezone.utc).isoformat()},
+            ],
+        },
+        rpcs={},
+    )
+    batch = BatchDemandEngine(half_life_days=7)
+    batch._db = db
+    batch.score_store("store-1", threshold=0.4)
+
+    signals = {s["sku_id"]: s for s in db.inserts[0][1]}
+    assert signals["sku-milk"]["external_factors"]["lost_score_decayed"] == pytest.approx(10.0, rel=1e-3)
+    assert signals["sku-salt"]["external_factors"]["lost_score_decayed"] == 0.0
@@ -0,0 +1,87 @@
+"""
+Unit tests for the async concurrency helpers (single-flight, circuit breaker, adaptive limiter).
+Run from project root:  pytest tests/test_concurrency.py -v
+"""
+import asyncio
+
+from backend.app.core.concurrency import AdaptiveConcurrencyLimiter, CircuitBreaker, CircuitOpenError, SingleFlight
+
+
+def test_singleflight_shares_one_call_and_releases_on_error():
+    calls = []
+
+    async def slow(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        if value == "bad":
+            raise ValueError("bad")
+        return value
+
+    async def run() -> None:
+        flight = SingleFlight("test")
+        results = await asyncio.gather(*(flight.do("k", lambda: slow("ok")) for _ in range(5)))
+        assert results == ["ok"] * 5
+        assert calls == ["ok"]
+
+        outcomes = await asyncio.gather(
+            *(flight.do("e", lambda: slow("bad")) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(o, ValueError) for o in outcomes)
+        assert len(flight) == 0
+        assert await flight.do("e", lambda: slow("retry")) == "retry"
+
+    asyncio.run(run())
+
+
+def test_singleflight_waiter_cancellation_keeps_shared_call():
+    async def run() -> None:
+        flight = SingleFlight("test")
+        first = asyncio.ensure_future(flight.do("k", lambda: asyncio.sleep(0.02, result=1)))
+        second = asyncio.ensure_future(flight.do("k", lambda: asyncio.sleep(0.02, result=2)))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == 1
+
+    asyncio.run(run())
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    async def fail():
+        raise ConnectionError("down")
+
+    async def ok():
+        return "up"
+
+    async def run() -> None:
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+        for _ in range(2):
+            try:
+                await breaker.call(fail)
+            except ConnectionError:
+                pass
+        assert breaker.is_open
+        try:
+            await breaker.call(ok)
+        except CircuitOpenError:
+            pass
+        else:
+            raise AssertionError("expected CircuitOpenError")
+        await asyncio.sleep(0.06)
+        assert await breaker.call(ok) == "up"
+        assert breaker.state == "closed"
+
+    asyncio.run(run())
+
+
+def test_adaptive_limiter_grows_and_backs_off():
+    async def run() -> None:
+        limiter = AdaptiveConcurrencyLimiter("test", initial_limit=2, max_limit=4, latency_target=0.05)
+        for _ in range(10):
+            await limiter.run(lambda: asyncio.sleep(0))
+        assert limiter.limit > 2
+        grown = limiter.limit
+        await limiter.run(lambda: asyncio.sleep(0.06))
+        assert limiter.limit < grown
+        assert limiter.in_flight == 0
+
+    asyncio.run(run())
@@ -0,0 +1,62 @@
+"""
+Unit tests for webhook message deduplication.
+Run from project root:  pytest tests/test_dedupe.py -v
+"""
+import asyncio
+
+from backend.app.services.dedupe import MessageDeduplicator
+
+
+class FakeRedis:
+    """Shared key space; one client instance per event loop, like redis.asyncio."""
+
+    keys: set = set()
+    clients: list = []
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        FakeRedis.clients.append(self)
+
+    async def set(self, key, value, nx=False, ex=None):
+        assert asyncio.get_running_loop() is self.loop, "client used on a different event loop"
+        if nx and key in self.keys:
+            return None
+        self.keys.add(key)
+        return True
+
+    async def delete(self, key):
+        assert asyncio.get_running_loop() is self.loop, "client used on a different event loop"
+        self.keys.discard(key)
+
+
+def test_forget_does_not_leave_a_stale_entry_that_evicts_the_live_id():
+    async def run():
+        dedupe = MessageDeduplicator(capacity=2)
+        assert not await dedupe.is_duplicate("a")
+        await dedupe.forget("a")
+        assert not await dedupe.is_duplicate("a")  # Meta's retry is processed again
+        assert not await dedupe.is_duplicate("b")
+        # with a stale copy of "a" in the ring, adding "c" used to evict the live "a"
+        assert await dedupe.is_duplicate("a")
+        assert not await dedupe.is_duplicate("c")
+        assert await dedupe.is_duplicate("c")
+        assert not await dedupe.is_duplicate("a")  # oldest id ("a") evicted at capacity 2
+
+    asyncio.run(run())
+
+
+def test_redis_guard_survives_one_event_loop_per_task(monkeypatch):
+    FakeRedis.keys, FakeRedis.clients = set(), []
+    monkeypatch.setattr("redis.asyncio.from_url", lambda url: FakeRedis())
+    # separate processes: the in-memory guard of one worker does not see the other's ids
+    worker_a = MessageDeduplicator(redis_url="redis://fake")
+    worker_b = MessageDeduplicator(redis_url="redis://fake")
+
+    assert asyncio.run(worker_a.is_duplicate("m1")) is False
+    # next Celery task on the same worker: a new loop, so a new client
+    assert asyncio.run(worker_a.is_duplicate("m2")) is False
+    assert asyncio.run(worker_b.is_duplicate("m1")) is True
+    assert len(FakeRedis.clients) == 3
+
+    asyncio.run(worker_a.forget("m2"))
+    assert asyncio.run(worker_b.is_duplicate("m2")) is False
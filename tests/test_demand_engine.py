@@ -0,0 +1,139 @@
+"""
+Unit tests for demand scoring (decayed lost-sales accumulator).
+Run from project root:  pytest tests/test_demand_engine.py -v
+"""
+import asyncio
+import math
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import backend.app.models.demand_engine as demand_module
+from backend.app.inference.text_utils import normalize_product_name
+from backend.app.models.demand_engine import DemandSensingEngine, should_record_signal
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table, self.filters = db, table, {}
+
+    def select(self, *_):
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def limit(self, _):
+        return self
+
+    def order(self, *_, **__):
+        return self
+
+    def insert(self, row):
+        self.db.inserts.append((self.table, row))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=[row]))
+
+    def execute(self):
+        self.db.queries.append((self.table, self.filters))
+        rows = [r for r in self.db.tables.get(self.table, []) if all(r.get(k) == v for k, v in self.filters.items())]
+        return SimpleNamespace(data=rows)
+
+
+class FakeDB:
+    def __init__(self, tables=None, rpc_data=None):
+        self.tables = tables or {}
+        self.rpc_data = rpc_data
+        self.queries = []
+        self.rpcs = []
+        self.inserts = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        self.rpcs.append((name, params))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=self.rpc_data))
+
+
+@pytest.fixture(autouse=True)
+def plain_keys(monkeypatch):
+    aliases = SimpleNamespace(product_key=lambda name, store_id=None: normalize_product_name(name))
+    monkeypatch.setattr(demand_module, "get_alias_normalizer", lambda: aliases)
+    monkeypatch.setattr(demand_module.settings, "DEMAND_SIGNAL_EPSILON", 0.05, raising=False)
+    demand_module._last_scores.clear()
+
+
+def _engine(db):
+    engine = DemandSensingEngine(half_life_days=7)
+    engine._db = db
+    return engine
+
+
+def test_record_lost_sale_is_one_rpc_keyed_by_canonical_name():
+    db = FakeDB(rpc_data=4.5)
+    assert _engine(db).record_lost_sale("store-1", "Amul  Milk", 2) == 4.5
+    assert db.rpcs == [("record_lost_sale", {
+        "p_store_id": "store-1",
+        "p_sku_name": "Amul  Milk",
+        "p_sku_key": "amul milk",
+        "p_qty": 2,
+        "p_half_life_days": 7,
+    })]
+
+
+def test_lost_sales_score_decays_accumulator_to_now():
+    week_ago = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
+    db = FakeDB({
+        "skus": [{"id": "sku-1", "store_id": "store-1", "name": "Amul Milk"}],
+        "lost_sales_accumulators": [
+            {"store_id": "store-1", "sku_key": "amul milk", "decayed_qty": 10.0, "updated_at": week_ago},
+        ],
+    })
+    assert _engine(db)._lost_sales_score("sku-1") == pytest.approx(5.0, rel=1e-3)
+    # looked up by the SKU's store and name, never by comparing a name column to the id
+    assert [q[0] for q in db.queries] == ["skus", "lost_sales_accumulators"]
+    assert db.queries[1][1] == {"store_id": "store-1", "sku_key": "amul milk"}
+
+
+def test_lost_sales_score_without_history_is_zero():
+    db = FakeDB({"skus": [{"id": "sku-1", "store_id": "store-1", "name": "Tata Salt"}]})
+    assert _engine(db)._lost_sales_score("sku-1") == 0.0
+    assert _engine(FakeDB())._lost_sales_score("missing") == 0.0
+
+
+def test_write_policy_epsilon_and_threshold_crossing():
+    assert should_record_signal(math.nan, 0.3, 0.05, 2.5)
+    assert not should_record_signal(0.30, 0.34, 0.05, 2.5)
+    assert should_record_signal(0.30, 0.36, 0.05, 2.5)
+    assert should_record_signal(2.49, 2.51, 0.05, 2.5)
+    mask = should_record_signal(np.array([np.nan, 1.0, 1.0]), np.array([1.0, 1.01, 1.2]), 0.05, 2.5)
+    assert mask.tolist() == [True, False, True]
+
+
+def test_unchanged_score_is_not_written_again(monkeypatch):
+    db = FakeDB({"skus": [{"id": "sku-1", "store_id": "store-1", "name": "Tata Salt"}]})
+    engine = _engine(db)
+    monkeypatch.setattr(engine, "_sales_velocity", lambda sku_id: 0.5)
+
+    assert asyncio.run(engine.calculate_demand_score("sku-1")) == 0.24
+    assert asyncio.run(engine.calculate_demand_score("sku-1")) == 0.24
+    assert len(db.inserts) == 1
+    # the second call compared against the cached score, not a demand_signals query
+    assert [q[0] for q in db.queries].count("demand_signals") == 1
+
+
+def test_compaction_resumes_from_its_watermark(monkeypatch):
+    import backend.app.workers.tasks as tasks
+
+    db = FakeDB(rpc_data=7)
+    monkeypatch.setattr(tasks, "get_supabase_admin_client", lambda: db)
+    assert tasks.compact_demand_signals() == 7
+    # no lookback window: the SQL function scans from the previous run's cutoff
+    assert db.rpcs == [("compact_demand_signals", {"p_older_than_hours": demand_module.settings.DEMAND_SIGNAL_COMPACT_AFTER_HOURS})]
+
+
+def test_cached_last_score_expires_with_the_configured_ttl():
+    assert demand_module._last_scores.ttl == demand_module.settings.DEMAND_SIGNAL_CACHE_TTL_SECONDS
@@ -0,0 +1,76 @@
+"""
+Unit tests for the rule-based Hinglish fast path.
+Run from project root:  pytest tests/test_fast_path.py -v
+"""
+import pytest
+
+from backend.app.inference.fast_path import HinglishFastParser
+from backend.app.inference.text_utils import normalize_message
+from backend.app.models.schemas import IntentEnum, KhataActionEnum
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return HinglishFastParser()
+
+
+def test_normalize_message_strips_emoji_and_digits():
+    assert normalize_message("10 Packet MILK update!! 🥛") == "10 packet milk update"
+    assert normalize_message("दूध १० पैकेट ✅") == "दूध 10 पैकेट"
+
+
+@pytest.mark.parametrize(
+    "text,intent,sku,qty",
+    [
+        ("10 packet milk update", IntentEnum.STOCK_UPDATE, "milk", 10.0),
+        ("50 bread boxes delivered", IntentEnum.DELIVERY_CONFIRMATION, "bread", 50.0),
+        ("10 Bread req", IntentEnum.REORDER, "bread", 10.0),
+        ("sugar paanch kg aaya", IntentEnum.STOCK_UPDATE, "sugar", 5.0),
+    ],
+)
+def test_parse_intent_common_shapes(parser, text, intent, sku, qty):
+    result = parser.parse_intent(text)
+    assert result is not None
+    assert result.intent == intent
+    assert result.sku == sku
+    assert result.quantity == qty
+    assert result.confidence >= 0.85
+
+
+def test_parse_khata_payment(parser):
+    record = parser.parse_khata("Ramesh ne 200 diya")
+    assert record.customer_name == "Ramesh"
+    assert record.amount == 200.0
+    assert record.action == KhataActionEnum.PAYMENT_RECEIVED
+
+
+def test_parse_khata_credit(parser):
+    record = parser.parse_khata("suresh ko ₹150 udhaar likho")
+    assert record.customer_name == "Suresh"
+    assert record.action == KhataActionEnum.CREDIT_GIVEN
+
+
+def test_unrecognised_text_falls_through(parser):
+    assert parser.parse_intent("hello bhai kaise ho") is None
+    assert parser.parse_intent("doodh khatam") is None
+
+
+@pytest.mark.parametrize("text", ["10 packet milk nahi aaya", "doodh mat bhejo", "5 bread not delivered"])
+def test_negated_messages_fall_through(parser, text):
+    assert parser.parse_intent(text) is None
+
+
+def test_pronouns_and_time_words_are_not_items(parser):
+    result = parser.parse_intent("mujhe kal 10 packet milk chahiye")
+    assert result.intent == IntentEnum.REORDER
+    assert result.sku == "milk"
+    assert result.quantity == 10.0
+    assert result.confidence >= 0.85
+
+
+def test_unknown_item_stays_below_threshold(parser):
+    result = parser.parse_intent("5 rs add")
+    assert result is not None and result.sku == "rs"
+    assert result.confidence < 0.85
+    # aliases in either script count as known products
+    assert parser.parse_intent("10 packet doodh aaya").confidence >= 0.85
@@ -0,0 +1,38 @@
+"""
+Unit tests for the pooled HTTP client registry.
+Run from project root:  pytest tests/test_http_clients.py -v
+"""
+import asyncio
+
+from backend.app.core.http_clients import HTTPClientRegistry
+
+
+def test_same_loop_reuses_the_client():
+    registry = HTTPClientRegistry()
+
+    async def run():
+        return registry.get("ollama"), registry.get("ollama")
+
+    first, second = asyncio.run(run())
+    assert first is second
+    asyncio.run(registry.aclose())
+
+
+def test_new_loop_closes_the_previous_loops_clients():
+    registry = HTTPClientRegistry()
+
+    async def first_loop():
+        return registry.get("ollama"), registry.get("whatsapp")
+
+    async def second_loop():
+        client = registry.get("ollama")
+        await asyncio.sleep(0)  # let the stale clients close
+        await asyncio.sleep(0)
+        return client
+
+    stale = asyncio.run(first_loop())
+    fresh = asyncio.run(second_loop())
+    assert all(client.is_closed for client in stale)
+    assert fresh not in stale and not fresh.is_closed
+    assert list(registry._clients) == ["ollama"]
+    asyncio.run(registry.aclose())
@@ -0,0 +1,122 @@
+"""
+Unit tests for SLM call plumbing (micro-batching, endpoint pool and hedging).
+Run from project root:  pytest tests/test_inference.py -v
+"""
+import asyncio
+import json
+
+import httpx
+
+from backend.app.core.concurrency import AdaptiveConcurrencyLimiter
+from backend.app.inference.batching import MicroBatcher
+from backend.app.inference.endpoint_pool import EndpointPool
+from backend.app.inference.slm_service import SLMService
+
+
+def test_microbatcher_groups_concurrent_submissions():
+    batches = []
+
+    async def handler(items: list) -> list:
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    async def run() -> list:
+        batcher = MicroBatcher("test", handler, max_batch=3, max_wait=0.01)
+        return await asyncio.gather(*(batcher.submit(n) for n in range(5)))
+
+    assert asyncio.run(run()) == [0, 10, 20, 30, 40]
+    assert batches == [[0, 1, 2], [3, 4]]
+
+
+def test_failed_slm_batch_falls_back_to_single_calls(monkeypatch):
+    service = SLMService()
+    service._intent_cache.clear()
+    prompts = []
+
+    async def fake_llm(prompt, *args, **kwargs):
+        prompts.append(prompt)
+        if prompt.startswith("Messages:"):
+            raise httpx.ConnectError("batch request dropped")
+        return json.dumps({"intent": "reorder", "sku": "bread", "quantity": 2, "confidence": 0.9})
+
+    monkeypatch.setattr(service, "_call_llm", fake_llm)
+    service._batcher = MicroBatcher("slm-test", service._extract_batch, max_batch=3, max_wait=0.01)
+
+    async def run() -> list:
+        texts = ["2 bread chahiye", "2 bread bhejo", "2 bread mangao"]
+        return await asyncio.gather(*(service.extract_intent_and_entities(t) for t in texts))
+
+    results = asyncio.run(run())
+    assert [r.sku for r in results] == ["bread"] * 3
+    assert sum(p.startswith("Messages:") for p in prompts) == 1
+    assert len(prompts) == 4
+
+
+def test_endpoint_pool_ejects_failing_endpoint_and_hedges():
+    calls = []
+
+    async def fn(url: str) -> str:
+        calls.append(url)
+        if url == "http://a":
+            raise ConnectionError("a is down")
+        return url
+
+    async def run() -> None:
+        pool = EndpointPool(["http://a", "http://b"], failure_types=(ConnectionError,), failure_threshold=1)
+        # ties are broken at random, so send the first call to the failing endpoint explicitly
+        try:
+            await pool._attempt(pool.endpoints[0], fn)
+        except ConnectionError:
+            pass
+        for _ in range(4):
+            try:
+                assert await pool.call(fn) == "http://b"
+            except ConnectionError:
+                pass
+        assert calls.count("http://a") == 1  # ejected after the first failure
+
+        async def slow_first(url: str) -> str:
+            await asyncio.sleep(0.2 if url == "http://a" else 0.0)
+            return url
+
+        hedged = EndpointPool(["http://a", "http://b"], hedging=True, min_hedge_samples=1)
+        hedged.endpoints[0].latencies.append(0.01)
+        hedged.endpoints[1].outstanding = 1  # force the primary pick onto the slow endpoint
+        assert await hedged.call(slow_first) == "http://b"
+
+    asyncio.run(run())
+
+
+def test_hedged_request_takes_its_own_limiter_slot():
+    async def slow_first(url: str) -> str:
+        await asyncio.sleep(0.2 if url == "http://a" else 0.0)
+        return url
+
+    def pool(limiter: AdaptiveConcurrencyLimiter) -> EndpointPool:
+        hedged = EndpointPool(
+            ["http://a", "http://b"], hedging=True, min_hedge_samples=1, can_hedge=lambda: limiter.has_capacity
+        )
+        hedged.endpoints[0].latencies.append(0.01)
+        hedged.endpoints[1].outstanding = 1
+        return hedged
+
+    async def run() -> None:
+        roomy = AdaptiveConcurrencyLimiter("test", initial_limit=2)
+        peak = []
+
+        async def tracked(url: str) -> str:
+            async def send() -> str:
+                peak.append(roomy.in_flight)
+                return await slow_first(url)
+            return await roomy.run(send)
+
+        assert await pool(roomy).call(tracked) == "http://b"
+        assert peak == [1, 2]  # primary and hedge each held a slot
+        await asyncio.sleep(0.25)
+        assert roomy.in_flight == 0
+        assert roomy.limit == 2.5  # the cancelled primary did not shrink the limit
+
+        full = AdaptiveConcurrencyLimiter("test", initial_limit=1)
+        assert await pool(full).call(lambda url: full.run(lambda: slow_first(url))) == "http://a"
+
+    asyncio.run(run())
@@ -0,0 +1,69 @@
+"""
+Unit tests for the in-process char n-gram intent classifier.
+Run from project root:  pytest tests/test_intent_classifier.py -v
+"""
+from types import SimpleNamespace
+
+import backend.app.ml.train_intent_classifier as train_module
+from backend.app.inference.fast_path import HinglishFastParser
+from backend.app.ml.intent_classifier import LOCAL_CLASSIFIER_REASONING, CharNgramIntentClassifier, featurize
+
+EXAMPLES = [
+    ("10 packet milk update", "stock_update"),
+    ("sugar 2 kg aa gaya", "stock_update"),
+    ("milk 5 aaya", "stock_update"),
+    ("atta khatam bhejo", "reorder"),
+    ("10 bread req", "reorder"),
+    ("maggi order karo", "reorder"),
+    ("hello bhai", "unknown"),
+    ("kya haal hai", "unknown"),
+    ("good morning", "unknown"),
+] * 5
+
+
+def test_featurize_is_normalised_and_sparse():
+    indices, values = featurize("10 Packet MILK!!", 1024)
+    assert len(indices) == len(set(indices.tolist()))
+    assert abs(float((values ** 2).sum()) - 1.0) < 1e-5
+    assert featurize("🙏", 1024)[0].size == 0
+
+
+def test_fit_predict_and_roundtrip(tmp_path):
+    classifier = CharNgramIntentClassifier.fit(
+        [t for t, _ in EXAMPLES], [i for _, i in EXAMPLES], n_features=2 ** 12, epochs=30
+    )
+    assert classifier.predict("bread bhejo")[0] == "reorder"
+    assert classifier.predict("rice 3 kg aaya")[0] == "stock_update"
+
+    path = tmp_path / "intent_classifier.npz"
+    classifier.save(str(path))
+    loaded = CharNgramIntentClassifier.load(str(path))
+    label, probability = loaded.predict("bread bhejo")
+    assert label == "reorder"
+    assert abs(probability - classifier.predict("bread bhejo")[1]) < 1e-2
+
+
+class FakeAuditQuery:
+    """Chainable stand-in for the ai_audit_logs query; filters are ignored."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+def test_training_examples_skip_rule_based_decisions(monkeypatch):
+    fast = HinglishFastParser().parse_intent("10 packet milk aaya")
+    rows = [
+        {"input": "atta khatam bhejo", "output": "{'intent': 'reorder'}", "reasoning": "low stock"},
+        {"input": "10 packet milk aaya", "output": "{'intent': 'stock_update'}", "reasoning": fast.reasoning},
+        {"input": "maggi order karo", "output": "{'intent': 'reorder'}", "reasoning": LOCAL_CLASSIFIER_REASONING},
+        {"input": "hello", "output": "{'intent': 'unknown'}", "reasoning": "Error: timeout"},
+    ]
+    db = SimpleNamespace(table=lambda name: FakeAuditQuery(rows))
+    monkeypatch.setattr(train_module, "get_supabase_admin_client", lambda: db)
+    assert train_module.fetch_examples(min_confidence=0.0, limit=10) == [("atta khatam bhejo", "reorder")]
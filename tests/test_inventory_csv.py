@@ -0,0 +1,71 @@
+"""
+Unit tests for bulk inventory input: CSV streaming and delta validation.
+Run from project root:  pytest tests/test_inventory_csv.py -v
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+import backend.app.services.inventory_service as inventory_module
+from backend.app.api.v1.inventory import _read_csv_items, _stream_csv_rows
+from backend.app.models.schemas import InventoryBulkItem, InventoryUpdateRequest
+from backend.app.services.inventory_service import InventoryOrchestrator
+
+
+class FakeRequest:
+    def __init__(self, *chunks: bytes):
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+async def _rows(request):
+    return [row async for row in _stream_csv_rows(request)]
+
+
+def test_stream_rows_across_chunks_with_crlf_and_bom():
+    request = FakeRequest("﻿sku_name,delta\r\nAmul ".encode(), b"Milk,10\r\n\"Tata, Salt\",-", b"2")
+    assert asyncio.run(_rows(request)) == [["sku_name", "delta"], ["Amul Milk", "10"], ["Tata, Salt", "-2"]]
+
+
+def test_stream_rows_decodes_utf8_split_inside_a_character():
+    data = "दूध,5\n".encode()
+    assert asyncio.run(_rows(FakeRequest(data[:2], data[2:]))) == [["दूध", "5"]]
+
+
+def test_read_items_skips_header_and_blank_lines():
+    request = FakeRequest(b"SKU_NAME,delta\n\nmilk,2\n,\nbread\n")
+    assert asyncio.run(_read_csv_items(request, max_rows=10)) == [("milk", "2"), ("bread", None)]
+
+
+def test_header_is_only_skipped_on_the_first_row():
+    request = FakeRequest(b"milk,2\nsku_name,3\n")
+    assert asyncio.run(_read_csv_items(request, max_rows=10)) == [("milk", "2"), ("sku_name", "3")]
+
+
+def test_read_items_rejects_too_many_rows():
+    request = FakeRequest(b"sku_name,delta\n" + b"milk,1\n" * 4)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(_read_csv_items(request, max_rows=3))
+    assert exc.value.status_code == 413
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-Infinity"])
+def test_non_finite_deltas_are_invalid(monkeypatch, value):
+    index = SimpleNamespace(match=lambda *_: pytest.fail("invalid rows are not resolved"))
+    monkeypatch.setattr(inventory_module, "get_sku_index", lambda: index)
+    orchestrator = InventoryOrchestrator()
+    orchestrator._db = SimpleNamespace(rpc=lambda *_: pytest.fail("nothing to apply"))
+    result = orchestrator.bulk_update_stock("store-1", [("milk", value), ("bread", float(value))])
+    assert [r["status"] for r in result["results"]] == ["invalid", "invalid"]
+    assert result["sku_ids"] == []
+
+    with pytest.raises(ValidationError):
+        InventoryBulkItem(sku_name="milk", delta=float(value))
+    with pytest.raises(ValidationError):
+        InventoryUpdateRequest(store_id="store-1", sku_name="milk", quantity_delta=float(value))
@@ -0,0 +1,86 @@
+"""
+Unit tests for inventory writes.
+Run from project root:  pytest tests/test_inventory_service.py -v
+"""
+import asyncio
+from types import SimpleNamespace
+
+import backend.app.services.inventory_service as inventory_module
+from backend.app.models.schemas import AIIntentResponse, IntentEnum
+from backend.app.services.inventory_service import InventoryOrchestrator, increment_stock
+from backend.app.services.sku_index import StoreSKUIndex
+
+
+class FakeDB:
+    def __init__(self, data):
+        self.data = data
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=self.data))
+
+
+def test_increment_stock_by_id():
+    db = FakeDB([{"sku_id": "sku-1", "stock_level": "12"}])
+    assert increment_stock(db, 2, sku_id="sku-1") == {"sku_id": "sku-1", "stock_level": 12.0}
+    assert db.calls == [("increment_stock", {"p_delta": 2, "p_sku_id": "sku-1"})]
+
+
+def test_increment_stock_by_name_not_found():
+    db = FakeDB([])
+    assert increment_stock(db, 1, store_id="store-1", sku_name="Milk") is None
+    assert db.calls[0][1] == {"p_delta": 1, "p_store_id": "store-1", "p_sku_name": "Milk"}
+
+
+class FakeIndex:
+    def __init__(self, rows):
+        self.store = StoreSKUIndex(rows)
+        self.lookups = []
+
+    def match(self, store_id, name):
+        self.lookups.append(name)
+        return self.store.best(name, 0.6)
+
+
+def test_bulk_update_resolves_names_once_and_applies_one_batch(monkeypatch):
+    index = FakeIndex([{"id": "sku-milk", "name": "Amul Milk"}, {"id": "sku-salt", "name": "Tata Salt"}])
+    monkeypatch.setattr(inventory_module, "get_sku_index", lambda: index)
+    db = FakeDB([{"sku_id": "sku-milk", "stock_level": 15}, {"sku_id": "sku-salt", "stock_level": 2}])
+    orchestrator = InventoryOrchestrator()
+    orchestrator._db = db
+
+    result = orchestrator.bulk_update_stock("store-1", [
+        ("amul milk", "10"),
+        ("Tata Salt", -1),
+        ("amul milk", 5),
+        ("unicorn", 1),
+        ("tata salt", "lots"),
+    ])
+
+    assert db.calls == [("increment_stock_bulk", {"p_deltas": [
+        {"sku_id": "sku-milk", "delta": 15.0},
+        {"sku_id": "sku-salt", "delta": -1.0},
+    ]})]
+    assert index.lookups == ["amul milk", "Tata Salt", "unicorn"]
+    assert [r["status"] for r in result["results"]] == ["updated", "updated", "updated", "not_found", "invalid"]
+    assert result["results"][0]["new_stock"] == 15
+    assert result["summary"] == {"rows": 5, "updated": 3, "not_found": 1, "invalid": 1}
+    assert result["sku_ids"] == ["sku-milk", "sku-salt"]
+
+
+def test_update_stock_on_a_deleted_sku_is_not_found(monkeypatch):
+    index = FakeIndex([{"id": "sku-milk", "name": "Amul Milk"}])
+    index.invalidated = []
+    index.invalidate = index.invalidated.append
+    monkeypatch.setattr(inventory_module, "get_sku_index", lambda: index)
+    monkeypatch.setattr(inventory_module.settings, "STOCK_WRITE_BEHIND_ENABLED", False)
+    orchestrator = InventoryOrchestrator()
+    orchestrator._db = FakeDB([])  # the rpc matched no row
+
+    ai_result = AIIntentResponse(intent=IntentEnum.STOCK_UPDATE, sku="amul milk", quantity=2, confidence=0.9)
+    result = asyncio.run(orchestrator.update_stock(ai_result, "store-1"))
+
+    assert result["status"] == "not_found"
+    assert result["sku_id"] == "sku-milk"
+    assert index.invalidated == ["store-1"]
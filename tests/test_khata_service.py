@@ -0,0 +1,54 @@
+"""
+Unit tests for khata customer resolution.
+Run from project root:  pytest tests/test_khata_service.py -v
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.services.khata_service import KhataService
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def select(self, *_):
+        return self
+
+    def eq(self, column, value):
+        self.rows = [r for r in self.rows if r.get(column) == value]
+        return self
+
+    def ilike(self, column, pattern):
+        needle = pattern.strip("%").lower()
+        self.rows = [r for r in self.rows if needle in r[column].lower()]
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+def _service(*names):
+    rows = [{"id": f"c{i}", "store_id": "store-1", "name": n} for i, n in enumerate(names, start=1)]
+    service = KhataService.__new__(KhataService)
+    service._db = SimpleNamespace(table=lambda _: FakeQuery(list(rows)))
+    return service
+
+
+def test_unique_name_resolves():
+    assert _service("Ramesh Kumar", "Suresh")._find_customer_id("ramesh", "store-1") == "c1"
+    assert _service("Ramesh")._find_customer_id("रमेश", "store-1") == "c1"
+
+
+def test_spelling_variant_resolves_through_folding():
+    assert _service("Ramesh", "Suresh")._find_customer_id("Raamesh", "store-1") == "c1"
+
+
+@pytest.mark.parametrize("name", ["Ramesh", "Raamesh"])
+def test_ambiguous_first_name_is_not_resolved(name):
+    assert _service("Ramesh Kumar", "Ramesh Gupta")._find_customer_id(name, "store-1") is None
+
+
+def test_exact_name_wins_over_longer_matches():
+    assert _service("Ramesh", "Ramesh Gupta")._find_customer_id("ramesh", "store-1") == "c1"
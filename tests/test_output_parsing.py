@@ -0,0 +1,66 @@
+"""
+Unit tests for parsing streamed and raw SLM output.
+Run from project root:  pytest tests/test_output_parsing.py -v
+"""
+import asyncio
+
+import pytest
+
+from backend.app.inference.json_stream import JSONObjectScanner
+from backend.app.inference.output_parser import REPAIRED_KEY, ModelOutputError, parse_model_json
+from backend.app.inference.slm_service import REPAIRED_CONFIDENCE_CAP, SLMService
+from backend.app.services.inventory_service import InventoryOrchestrator
+
+
+def test_scanner_stops_at_closing_brace():
+    scanner = JSONObjectScanner()
+    chunks = ['```json\n{"intent": "re', 'order", "sku": "br{ead}"', ', "quantity": 2}', ' trailing tokens']
+    done = [scanner.feed(c) for c in chunks]
+    assert done == [False, False, True, True]
+    assert scanner.text == '{"intent": "reorder", "sku": "br{ead}", "quantity": 2}'
+
+
+def test_scanner_handles_escaped_quotes_and_nesting():
+    scanner = JSONObjectScanner()
+    assert not scanner.feed('{"a": "say \\"}\\"", "b": {"c": [1, ')
+    assert scanner.feed('2]}}')
+    assert scanner.text == '{"a": "say \\"}\\"", "b": {"c": [1, 2]}}'
+
+
+def test_parser_strips_fences_and_chatter():
+    raw = 'Sure! ```json\n{"intent": "reorder", "sku": "json rice", "quantity": 2}\n``` hope this helps'
+    assert parse_model_json(raw) == {"intent": "reorder", "sku": "json rice", "quantity": 2}
+
+
+def test_parser_repairs_truncated_output():
+    repaired = {REPAIRED_KEY: True}
+    assert parse_model_json('{"intent": "reorder", "quantity": 2, "sku": "mil') == {"intent": "reorder", "quantity": 2, **repaired}
+    assert parse_model_json('{"intent": "reorder", "confidence": 0.9,') == {"intent": "reorder", "confidence": 0.9, **repaired}
+    batch = parse_model_json('{"results": [{"index": 1, "intent": "reorder"}, {"index": 2, "int')
+    # only the cut-off item is flagged
+    assert batch == {"results": [{"index": 1, "intent": "reorder"}, {"index": 2, **repaired}], **repaired}
+
+
+def test_parser_drops_truncated_trailing_scalar():
+    raw = '{"intent":"stock_update","sku":"milk","confidence":0.9,"quantity": 1'
+    assert parse_model_json(raw) == {"intent": "stock_update", "sku": "milk", "confidence": 0.9, REPAIRED_KEY: True}
+    assert parse_model_json('{"intent": "reorder", "ok": tr') == {"intent": "reorder", REPAIRED_KEY: True}
+    assert parse_model_json('[1, 2, 3') == [1, 2]
+
+
+def test_repaired_stock_update_is_not_applied(monkeypatch):
+    slm = SLMService()
+    raw = '{"intent":"stock_update","sku":"milk","confidence":0.9,"quantity": 1'
+    response = slm._to_intent_response(parse_model_json(raw), "12 packet milk aaya")
+    assert response.quantity == 1.0  # schema default for the dropped field
+    assert response.confidence <= REPAIRED_CONFIDENCE_CAP
+
+    orchestrator = InventoryOrchestrator()
+    monkeypatch.setattr(orchestrator, "_resolve_sku_id", lambda *_: pytest.fail("must not touch stock"))
+    result = asyncio.run(orchestrator.update_stock(response, "store-1"))
+    assert result == {"status": "needs_confirmation", "sku_name": "milk", "quantity": 1.0}
+
+
+def test_parser_rejects_non_json():
+    with pytest.raises(ModelOutputError):
+        parse_model_json("I could not understand the message")
@@ -0,0 +1,93 @@
+"""
+Unit tests for the TTL cache and the cached sender resolver.
+Run from project root:  pytest tests/test_sender_resolver.py -v
+"""
+import asyncio
+from types import SimpleNamespace
+
+import backend.app.core.cache as cache_module
+from backend.app.core.cache import TTLCache
+from backend.app.services.sender_resolver import SenderResolver
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table, self.filters = db, table, {}
+
+    def select(self, *_):
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def execute(self):
+        self.db.queries.append(self.table)
+        rows = [r for r in self.db.tables.get(self.table, []) if all(r.get(k) == v for k, v in self.filters.items())]
+        return SimpleNamespace(data=rows)
+
+
+class FakeDB:
+    def __init__(self, tables):
+        self.tables = tables
+        self.queries = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+STORE = {"id": "store-1", "name": "Sharma Kirana", "contact_phone": "911"}
+VENDOR = {"id": "vendor-1", "name": "Dairy Co", "phone": "922", "store_id": "store-1"}
+
+
+def _resolver(tables):
+    resolver = SenderResolver(maxsize=10, ttl=600, negative_ttl=60)
+    resolver._db = FakeDB(tables)
+    return resolver
+
+
+def test_ttl_cache_expires_and_evicts_lru(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=1)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert "b" not in cache and cache.get("c") == 3
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 1
+
+
+def test_known_sender_costs_one_lookup():
+    resolver = _resolver({"stores": [STORE], "vendors": [VENDOR]})
+    first = asyncio.run(resolver.resolve("922"))
+    second = asyncio.run(resolver.resolve("922"))
+    assert first is second
+    assert first.role == "supplier" and first.store_id == "store-1" and first.store == STORE
+    assert resolver.db.queries == ["stores", "vendors", "stores"]
+
+
+def test_warm_path_needs_no_queries_and_owner_wins():
+    both = dict(VENDOR, phone="911")
+    resolver = _resolver({"stores": [STORE], "vendors": [both]})
+    assert resolver.warm() == 2
+    resolver.db.queries.clear()
+    identity = asyncio.run(resolver.resolve("911"))
+    assert identity.role == "owner" and identity.store_id == "store-1"
+    assert resolver.db.queries == []
+
+
+def test_invalidate_forces_a_fresh_lookup():
+    tables = {"stores": [], "vendors": []}
+    resolver = _resolver(tables)
+    assert asyncio.run(resolver.resolve("911")).role == "unknown"
+
+    tables["stores"].append(STORE)  # store registered through the admin API
+    assert asyncio.run(resolver.resolve("911")).role == "unknown"  # negative entry still cached
+    resolver.invalidate("911")
+    assert asyncio.run(resolver.resolve("911")).role == "owner"
+
+    resolver.invalidate()
+    assert resolver.stats()["size"] == 0
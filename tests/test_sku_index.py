@@ -0,0 +1,52 @@
+"""
+Unit tests for the per-store SKU matching index.
+Run from project root:  pytest tests/test_sku_index.py -v
+"""
+import pytest
+
+from backend.app.services.sku_index import StoreSKUIndex, edit_distance
+
+SKUS = [
+    "Amul Milk 500ml",
+    "Sugar 1kg",
+    "Toor Dal",
+    "Parle-G Biscuits",
+    "Basmati Rice",
+    "Rice Bran Oil",
+    "Bread",
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return StoreSKUIndex([{"id": f"sku-{i}", "name": name} for i, name in enumerate(SKUS)])
+
+
+def test_edit_distance():
+    assert edit_distance("sugar", "suger") == 1
+    assert edit_distance("", "dal") == 3
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    [
+        ("bread", "Bread"),
+        ("breads", "Bread"),
+        ("parle g biscuit", "Parle-G Biscuits"),
+        ("milk", "Amul Milk 500ml"),
+        ("suger", "Sugar 1kg"),
+        ("toor daal", "Toor Dal"),
+    ],
+)
+def test_best_match(index, query, expected):
+    match = index.best(query, min_score=0.6)
+    assert match is not None
+    assert match.name == expected
+
+
+def test_exact_match_scores_one(index):
+    assert index.search("BREAD")[0].score == 1.0
+
+
+def test_unrelated_name_is_rejected(index):
+    assert index.best("xyz", min_score=0.6) is None
@@ -0,0 +1,146 @@
+"""
+Unit tests for the SLM decision cache (in-process and Redis tiers).
+Run from project root:  pytest tests/test_slm_cache.py -v
+"""
+import asyncio
+import json
+
+import pytest
+
+import backend.app.inference.slm_service as slm_module
+from backend.app.inference.slm_service import SLMService, intent_cache_key
+from backend.app.inference.text_utils import normalize_message
+from backend.app.models.schemas import IntentEnum
+
+
+class FakeRedis:
+    """One client per from_url call, bound to the loop that created it; keys live on the shared server dict."""
+
+    def __init__(self, server):
+        self.data = server
+        self.loop = asyncio.get_running_loop()
+        self.closed = False
+
+    def _check(self):
+        assert not self.closed and asyncio.get_running_loop() is self.loop, "client used outside its event loop"
+
+    async def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self._check()
+        self.data[key] = value
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    server, clients = {}, []
+
+    def from_url(url):
+        clients.append(FakeRedis(server))
+        return clients[-1]
+
+    monkeypatch.setattr("redis.asyncio.from_url", from_url)
+    monkeypatch.setattr(slm_module.settings, "SLM_CACHE_REDIS", True)
+    return server, clients
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(slm_module.settings, "SLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(slm_module.settings, "SLM_CACHE_REDIS", False)
+    svc = SLMService()
+    svc._batcher = None
+    svc.calls = []
+
+    async def fake_llm(prompt, *args, **kwargs):
+        svc.calls.append(prompt)
+        return json.dumps({"intent": "stock_update", "sku": "milk", "quantity": 10, "confidence": 0.9})
+
+    monkeypatch.setattr(svc, "_call_llm", fake_llm)
+    return svc
+
+
+def test_normalize_message_keeps_digit_grouping():
+    assert normalize_message("1,000 packet milk") == "1000 packet milk"
+    assert normalize_message("₹1,00,000 udhaar, bhai") == "₹100000 udhaar bhai"
+
+
+def test_repeat_text_is_a_cache_hit(service):
+    first = asyncio.run(service.extract_intent_and_entities("10 packet milk update"))
+    second = asyncio.run(service.extract_intent_and_entities("10  Packet MILK update!!"))
+    assert len(service.calls) == 1
+    assert second.intent == IntentEnum.STOCK_UPDATE
+    assert second.original_text == "10  Packet MILK update!!"
+    assert first.original_text == "10 packet milk update"
+
+
+def test_miss_returns_a_copy_of_the_cached_decision(service):
+    response = asyncio.run(service.extract_intent_and_entities("10 packet milk update"))
+    response.sku = "mutated"
+    assert asyncio.run(service.extract_intent_and_entities("10 packet milk update")).sku == "milk"
+
+
+def test_cache_key_includes_model_and_prompt_version(monkeypatch):
+    key = intent_cache_key("010.0 packet milk", "m1")
+    assert key == f"m1:{slm_module.INTENT_PROMPT_VERSION}:10 packet milk"
+    assert intent_cache_key("10 packet milk", "m2") != key
+    monkeypatch.setattr(slm_module, "INTENT_PROMPT_VERSION", "v-next")
+    assert intent_cache_key("10 packet milk", "m1") != key
+
+
+def test_redis_tier_serves_other_processes(service, redis_server, monkeypatch):
+    server, _ = redis_server
+    asyncio.run(service.extract_intent_and_entities("10 packet milk update"))
+    assert len(server) == 1
+
+    other = SLMService()
+    other._batcher = None
+
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("served from Redis")
+
+    monkeypatch.setattr(other, "_call_llm", no_llm)
+    result = asyncio.run(other.extract_intent_and_entities("10 packet milk update"))
+    assert result.sku == "milk"
+    # promoted to the in-process tier
+    server.clear()
+    assert asyncio.run(other.extract_intent_and_entities("10 packet milk update")).sku == "milk"
+
+
+def test_redis_client_is_rebound_per_event_loop_and_closed(service, redis_server):
+    server, clients = redis_server
+
+    async def task(text):
+        try:
+            return await service.extract_intent_and_entities(text)
+        finally:
+            await service.aclose()
+
+    # one asyncio.run per Celery task
+    for text in ["10 packet milk update", "2 bread chahiye", "10 packet milk update"]:
+        service._intent_cache.clear()
+        assert asyncio.run(task(text)).sku == "milk"
+    assert len(clients) == 3 and all(c.closed for c in clients)
+    assert len(service.calls) == 2  # the third task was served by Redis
+
+
+@pytest.mark.parametrize("raw", [
+    '{"intent": "stock_update", "sku": "milk", "confidence": 0.9, "quantity": 1',  # truncated, repaired
+    json.dumps({"intent": "stock_update", "sku": "milk", "quantity": 10, "confidence": 0.2}),
+])
+def test_repaired_or_unsure_decisions_are_not_cached(service, monkeypatch, raw):
+    async def fake_llm(prompt, *args, **kwargs):
+        service.calls.append(prompt)
+        return raw
+
+    monkeypatch.setattr(service, "_call_llm", fake_llm)
+    for _ in range(2):
+        asyncio.run(service.extract_intent_and_entities("10 packet milk update"))
+        asyncio.run(service.classify_intent("10 packet milk update"))
+    assert len(service.calls) == 4
+    assert service.cache_stats()["size"] == 0
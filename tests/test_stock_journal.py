@@ -0,0 +1,191 @@
+"""
+Unit tests for the stock write-behind buffer (in-memory and Redis-journaled).
+Run from project root:  pytest tests/test_stock_journal.py -v
+"""
+import asyncio
+import fnmatch
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import backend.app.services.stock_buffer as stock_buffer_module
+from backend.app.services.stock_buffer import StockDeltaBuffer
+
+
+class FakeRedis:
+    """The hash/key commands StockDeltaBuffer uses, shared across buffers like one server."""
+
+    def __init__(self):
+        self.hashes: dict[str, dict[str, float]] = {}
+
+    async def hincrbyfloat(self, key, field, value):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = fields.get(field, 0.0) + float(value)
+        return fields[field]
+
+    async def rename(self, src, dst):
+        if src not in self.hashes:
+            raise Exception("ERR no such key")
+        self.hashes[dst] = self.hashes.pop(src)
+
+    async def hgetall(self, key):
+        return {k.encode(): str(v).encode() for k, v in self.hashes.get(key, {}).items()}
+
+    async def delete(self, key):
+        self.hashes.pop(key, None)
+
+    async def scan_iter(self, match):
+        for key in list(self.hashes):
+            if fnmatch.fnmatch(key, match):
+                yield key.encode()
+
+
+class Recorder:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches: list[tuple[dict, str]] = []
+
+    def __call__(self, deltas, batch_id):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.batches.append((dict(deltas), batch_id))
+        return {}
+
+
+def _buffer(redis, apply):
+    buffer = StockDeltaBuffer(apply, flush_interval=3600, redis_url="redis://fake")
+    buffer._get_redis = lambda: redis
+    return buffer
+
+
+def test_journal_flush_renames_and_applies_once():
+    redis, apply = FakeRedis(), Recorder()
+    buffer = _buffer(redis, apply)
+
+    async def run():
+        await buffer.add("sku-1", 2)
+        await buffer.add("sku-1", 3)
+        await buffer.add("sku-2", -1)
+        assert redis.hashes[StockDeltaBuffer.JOURNAL_KEY] == {"sku-1": 5.0, "sku-2": -1.0}
+        flushed = await buffer.flush()
+        assert await buffer.flush() == []  # nothing journaled since
+        await buffer.stop()
+        return flushed
+
+    assert sorted(asyncio.run(run())) == ["sku-1", "sku-2"]
+    assert len(apply.batches) == 1
+    assert apply.batches[0][0] == {"sku-1": 5.0, "sku-2": -1.0}
+    assert redis.hashes == {}
+
+
+def test_failed_apply_keeps_the_batch_and_retries_it_under_the_same_id():
+    redis, apply = FakeRedis(), Recorder(failures=1)
+    buffer = _buffer(redis, apply)
+
+    async def run():
+        await buffer.add("sku-1", 2)
+        with pytest.raises(ConnectionError):
+            await buffer.flush()
+        # the renamed batch survives the failure; new deltas go to a fresh journal
+        (batch_key,) = [k for k in redis.hashes if k.startswith(StockDeltaBuffer.BATCH_PREFIX)]
+        await buffer.add("sku-1", 1)
+        assert redis.hashes[StockDeltaBuffer.JOURNAL_KEY] == {"sku-1": 1.0}
+        await buffer.flush()
+        await buffer.stop()
+        return batch_key
+
+    batch_key = asyncio.run(run())
+    assert [deltas for deltas, _ in apply.batches] == [{"sku-1": 2.0}, {"sku-1": 1.0}]
+    assert apply.batches[0][1] == batch_key[len(StockDeltaBuffer.BATCH_PREFIX):]
+    assert apply.batches[0][1] != apply.batches[1][1]
+    assert redis.hashes == {}
+
+
+def test_stale_batch_of_a_dead_worker_is_replayed_but_a_live_one_is_not():
+    redis, apply = FakeRedis(), Recorder()
+    now_ms = int(time.time() * 1000)
+    stale = f"{StockDeltaBuffer.BATCH_PREFIX}{now_ms - 120_000}:dead"
+    live = f"{StockDeltaBuffer.BATCH_PREFIX}{now_ms}:busy"
+    redis.hashes[stale] = {"sku-9": 4.0}
+    redis.hashes[live] = {"sku-8": 1.0}
+    buffer = _buffer(redis, apply)
+
+    async def run():
+        flushed = await buffer.flush()
+        await buffer.stop()
+        return flushed
+
+    assert asyncio.run(run()) == ["sku-9"]
+    assert apply.batches == [({"sku-9": 4.0}, f"{now_ms - 120_000}:dead")]
+    assert stale not in redis.hashes
+    assert live in redis.hashes  # still being applied by its own worker
+
+
+def test_young_orphaned_batch_is_replayed_by_a_later_flush(monkeypatch):
+    clock = SimpleNamespace(now=1_000_000.0)
+    fake_time = SimpleNamespace(
+        time=lambda: clock.now, monotonic=lambda: clock.now, perf_counter=lambda: clock.now
+    )
+    monkeypatch.setattr(stock_buffer_module, "time", fake_time)
+    redis, apply = FakeRedis(), Recorder()
+    # a worker died 10s ago, right after renaming its journal
+    orphan = f"{StockDeltaBuffer.BATCH_PREFIX}{int((clock.now - 10) * 1000)}:dead"
+    redis.hashes[orphan] = {"sku-9": 4.0}
+    buffer = _buffer(redis, apply)
+
+    async def run():
+        assert await buffer.flush() == []  # too young to tell from a live flush
+        clock.now += 30
+        assert await buffer.flush() == []  # not rescanned yet
+        clock.now += 31
+        flushed = await buffer.flush()
+        await buffer.stop()
+        return flushed
+
+    assert asyncio.run(run()) == ["sku-9"]
+    assert [deltas for deltas, _ in apply.batches] == [{"sku-9": 4.0}]
+    assert redis.hashes == {}
+
+
+def test_stock_buffer_coalesces_and_rescores_once():
+    applied, rescored = [], []
+
+    async def on_flush(sku_ids):
+        rescored.append(sorted(sku_ids))
+
+    async def run():
+        buffer = StockDeltaBuffer(
+            apply=lambda deltas, batch_id: applied.append(dict(deltas)) or {},
+            on_flush=on_flush,
+            flush_interval=60,
+        )
+        for sku, delta in [("a", 1), ("b", 2), ("a", 3), ("a", -1)]:
+            await buffer.add(sku, delta)
+        await buffer.stop()
+
+    asyncio.run(run())
+    assert applied == [{"a": 3, "b": 2}]
+    assert rescored == [["a", "b"]]
+
+
+def test_stock_buffer_keeps_deltas_when_apply_fails():
+    calls = []
+
+    def apply(deltas, batch_id):
+        calls.append(dict(deltas))
+        if len(calls) == 1:
+            raise RuntimeError("db down")
+        return {}
+
+    async def run():
+        buffer = StockDeltaBuffer(apply=apply, flush_interval=60)
+        await buffer.add("a", 1)
+        with pytest.raises(RuntimeError):
+            await buffer.flush()
+        await buffer.add("a", 2)
+        await buffer.stop()
+
+    asyncio.run(run())
+    assert calls == [{"a": 1}, {"a": 3}]
@@ -0,0 +1,69 @@
+"""
+Unit tests for the rolling per-SKU sales velocity counters.
+Run from project root:  pytest tests/test_velocity_counters.py -v
+"""
+from datetime import date, timedelta
+
+from backend.app.services.velocity_counters import SalesVelocityCounters
+
+DAY = 86400.0
+NOW = 20000 * DAY + 3600  # 1 a.m. UTC on epoch day 20000
+TODAY = date(1970, 1, 1) + timedelta(days=20000)
+
+
+class FakeLoader:
+    def __init__(self, daily):
+        self.daily = daily
+        self.calls = []
+
+    def __call__(self, sku_id, since):
+        self.calls.append((sku_id, since))
+        return self.daily.get(sku_id, {})
+
+
+def test_count_sums_only_the_window_and_loads_once():
+    loader = FakeLoader({"sku-1": {TODAY: 3, TODAY - timedelta(days=6): 2, TODAY - timedelta(days=7): 50}})
+    counters = SalesVelocityCounters(loader, window_days=7, resync_seconds=300)
+
+    assert counters.count("sku-1", now=NOW) == 5
+    assert counters.count("sku-1", now=NOW + 60) == 5
+    assert loader.calls == [("sku-1", TODAY - timedelta(days=6))]
+
+
+def test_buckets_age_out_without_reloading():
+    loader = FakeLoader({"sku-1": {TODAY: 3, TODAY - timedelta(days=6): 2}})
+    counters = SalesVelocityCounters(loader, window_days=7, resync_seconds=10 * DAY)
+    counters.count("sku-1", now=NOW)
+
+    assert counters.count("sku-1", now=NOW + DAY) == 3
+    assert counters.count("sku-1", now=NOW + 7 * DAY) == 0
+    assert len(loader.calls) == 1
+
+
+def test_resync_replaces_buckets_and_storage_grows():
+    loader = FakeLoader({"sku-1": {TODAY: 1}})
+    counters = SalesVelocityCounters(loader, window_days=7, resync_seconds=300, capacity=2)
+    assert counters.count("sku-1", now=NOW) == 1
+
+    loader.daily["sku-1"] = {TODAY: 4}
+    assert counters.count("sku-1", now=NOW + 301) == 4
+
+    for i in range(5):
+        counters.load(f"sku-{i + 2}", {TODAY: i}, now=NOW)
+    assert len(counters) == 6
+    assert counters.count("sku-6", now=NOW) == 4
+
+
+def test_least_recently_counted_sku_is_evicted_and_reloaded():
+    loader = FakeLoader({f"sku-{i}": {TODAY: i} for i in range(4)})
+    counters = SalesVelocityCounters(loader, window_days=7, resync_seconds=DAY, capacity=1, max_skus=2)
+    assert counters.count("sku-1", now=NOW) == 1
+    assert counters.count("sku-2", now=NOW) == 2
+    assert counters.count("sku-1", now=NOW) == 1  # sku-2 is now the least recent
+    assert counters.count("sku-3", now=NOW) == 3
+
+    assert len(counters) == 2
+    assert counters._counts.shape[0] == 2
+    assert counters.count("sku-1", now=NOW) == 1
+    assert counters.count("sku-2", now=NOW) == 2  # evicted, so loaded again
+    assert [sku for sku, _ in loader.calls] == ["sku-1", "sku-2", "sku-3", "sku-2"]
@@ -0,0 +1,163 @@
+"""
+Unit tests for webhook delivery handling (message flattening, per-sender ordering, retries, mode).
+Run from project root:  pytest tests/test_webhook.py -v
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+import backend.app.api.v1.whatsapp as whatsapp_module
+from backend.app.api.v1.whatsapp import _iter_messages, failed_messages, process_webhook_payload
+from backend.app.models.schemas import AIIntentResponse, IntentEnum
+from backend.app.workers.lanes import LaneScheduler
+from configs.config import Settings
+
+
+def _delivery(*messages):
+    return {"entry": [{"changes": [{"value": {"messages": list(messages)}}]}]}
+
+
+def test_iter_messages_flattens_entries_and_changes():
+    body = {
+        "entry": [
+            {"changes": [{"value": {"messages": [{"id": "m1"}, "junk"]}}, {"value": {"statuses": [{}]}}]},
+            None,
+            {"changes": [{"value": {"messages": [{"id": "m2"}, {"id": "m3"}]}}, None]},
+        ]
+    }
+    assert [m["id"] for m in _iter_messages(body)] == ["m1", "m2", "m3"]
+    assert _iter_messages({}) == []
+
+
+def test_every_message_is_processed_in_order_per_sender(monkeypatch):
+    seen = []
+
+    async def fake_process(message):
+        # the first message of sender 91 is the slowest; its later message must still wait
+        await asyncio.sleep(0.02 if message["id"] == "a1" else 0.0)
+        seen.append(message["id"])
+        return {"status": "success", "id": message["id"]}
+
+    async def run():
+        lanes = LaneScheduler(num_lanes=4, idle_timeout=0.05)
+        monkeypatch.setattr(whatsapp_module, "process_message", fake_process)
+        monkeypatch.setattr(whatsapp_module, "get_sender_lanes", lambda: lanes)
+        body = {"entry": [
+            {"changes": [{"value": {"messages": [{"id": "a1", "from": "91"}, {"id": "b1", "from": "92"}]}}]},
+            {"changes": [{"value": {"messages": [{"id": "a2", "from": "91"}]}}]},
+        ]}
+        result = await process_webhook_payload(body)
+        await lanes.stop()
+        return result
+
+    result = asyncio.run(run())
+    assert result["status"] == "batch_processed"
+    assert [r["id"] for r in result["results"]] == ["a1", "b1", "a2"]
+    assert seen.index("a1") < seen.index("a2")
+    assert sorted(seen) == ["a1", "a2", "b1"]
+
+
+def test_delivery_without_messages_is_acknowledged():
+    assert asyncio.run(process_webhook_payload({"entry": [{"changes": [{"value": {}}]}]})) == {"status": "event_received"}
+    assert asyncio.run(process_webhook_payload({"entry": "oops"})) == {"status": "invalid_payload"}
+
+
+def test_failed_messages_picks_only_errored_messages_of_a_batch():
+    body = _delivery({"id": "m1", "from": "91"}, {"id": "m2", "from": "92"}, {"id": "m3", "from": "91"})
+    result = {
+        "status": "batch_processed",
+        "results": [{"status": "success"}, {"status": "error", "detail": "boom"}, {"status": "duplicate"}],
+    }
+    assert failed_messages(body, result) == [{"id": "m2", "from": "92"}]
+
+
+def test_failed_messages_single_message():
+    body = _delivery({"id": "m1", "from": "91"})
+    assert failed_messages(body, {"status": "error"}) == [{"id": "m1", "from": "91"}]
+    assert failed_messages(body, {"status": "success"}) == []
+
+
+def test_unknown_processing_mode_is_rejected():
+    assert Settings(WEBHOOK_PROCESSING_MODE="celery").WEBHOOK_PROCESSING_MODE == "celery"
+    with pytest.raises(ValidationError):
+        Settings(WEBHOOK_PROCESSING_MODE="qeueu")
+
+
+class FakeDedupe:
+    def __init__(self):
+        self.seen, self.forgotten = set(), []
+
+    async def is_duplicate(self, message_id):
+        if message_id in self.seen:
+            return True
+        self.seen.add(message_id)
+        return False
+
+    async def forget(self, message_id):
+        self.forgotten.append(message_id)
+        self.seen.discard(message_id)
+
+
+def _pipeline(monkeypatch, resolve, send, intent=IntentEnum.UNKNOWN, inventory=None):
+    dedupe = FakeDedupe()
+
+    async def classify(text):
+        return AIIntentResponse(intent=intent, confidence=0.9, original_text=text)
+
+    monkeypatch.setattr(whatsapp_module, "get_message_deduplicator", lambda: dedupe)
+    monkeypatch.setattr(whatsapp_module, "get_supabase_client", lambda: None)
+    monkeypatch.setattr(whatsapp_module, "get_sender_resolver", lambda: SimpleNamespace(resolve=resolve))
+    monkeypatch.setattr(whatsapp_module, "_get_ai_service", lambda: SimpleNamespace(process_text_message=classify))
+    monkeypatch.setattr(whatsapp_module, "_get_whatsapp_service", lambda: SimpleNamespace(send_text_message=send))
+    monkeypatch.setattr(whatsapp_module, "_get_inventory_service", lambda: inventory)
+    return dedupe
+
+
+MESSAGE = {"id": "m1", "from": "91", "type": "text", "text": {"body": "hello"}}
+
+
+def test_failure_before_any_side_effect_is_retryable(monkeypatch):
+    async def resolve(phone):
+        raise ConnectionError("sender lookup failed")
+
+    dedupe = _pipeline(monkeypatch, resolve, send=None)
+    result = asyncio.run(whatsapp_module.process_message(dict(MESSAGE)))
+    assert result["status"] == "error"
+    assert dedupe.forgotten == ["m1"]
+    assert failed_messages(_delivery(MESSAGE), result) == [MESSAGE]
+
+
+def test_failure_after_routing_started_is_not_replayed(monkeypatch):
+    async def resolve(phone):
+        return SimpleNamespace(role="owner", store_id="store-1", store={}, vendor=None)
+
+    async def send(phone, text):
+        raise ConnectionError("send failed")
+
+    dedupe = _pipeline(monkeypatch, resolve, send)
+    result = asyncio.run(whatsapp_module.process_message(dict(MESSAGE)))
+    assert result["status"] == "partial_failure"
+    assert dedupe.forgotten == []
+    assert failed_messages(_delivery(MESSAGE), result) == []
+    # Meta's redelivery is still recognised
+    assert asyncio.run(whatsapp_module.process_message(dict(MESSAGE))) == {"status": "duplicate"}
+
+
+def test_unconfirmed_stock_update_asks_the_owner(monkeypatch):
+    sent = []
+
+    async def resolve(phone):
+        return SimpleNamespace(role="owner", store_id="store-1", store={}, vendor=None)
+
+    async def send(phone, text):
+        sent.append(text)
+
+    async def update_stock(ai_result, store_id):
+        return {"status": "needs_confirmation", "sku_name": "milk", "quantity": 1.0}
+
+    inventory = SimpleNamespace(update_stock=update_stock)
+    _pipeline(monkeypatch, resolve, send, intent=IntentEnum.STOCK_UPDATE, inventory=inventory)
+    assert asyncio.run(whatsapp_module.process_message(dict(MESSAGE))) == {"status": "success"}
+    assert len(sent) == 1 and "Please confirm: 1 x milk?" in sent[0]
@@ -0,0 +1,84 @@
+"""
+Unit tests for the webhook work queue and per-sender lanes.
+Run from project root:  pytest tests/test_workers.py -v
+"""
+import asyncio
+
+from backend.app.workers.lanes import LaneScheduler
+from backend.app.workers.webhook_queue import WebhookWorkQueue
+
+
+def test_webhook_queue_processes_payloads():
+    seen = []
+
+    async def handler(body: dict) -> None:
+        seen.append(body["n"])
+
+    async def run() -> None:
+        queue = WebhookWorkQueue(handler, maxsize=10, concurrency=2)
+        for n in range(5):
+            assert await queue.submit({"n": n})
+        await queue.stop()
+
+    asyncio.run(run())
+    assert sorted(seen) == [0, 1, 2, 3, 4]
+
+
+def test_webhook_queue_rejects_when_full():
+    async def run() -> list:
+        gate = asyncio.Event()
+
+        async def handler(body: dict) -> None:
+            await gate.wait()
+
+        queue = WebhookWorkQueue(handler, maxsize=1, concurrency=1, put_timeout=0.01)
+        results = [await queue.submit({"n": n}) for n in range(4)]
+        gate.set()
+        await queue.stop()
+        return results
+
+    results = asyncio.run(run())
+    assert results[0] is True
+    assert False in results
+
+
+def test_lanes_keep_per_sender_order():
+    events = []
+
+    async def job(sender: str, n: int, delay: float) -> int:
+        events.append(("start", sender, n))
+        await asyncio.sleep(delay)
+        events.append(("end", sender, n))
+        return n
+
+    async def run() -> list:
+        lanes = LaneScheduler(num_lanes=8, idle_timeout=0.05)
+        futures = [
+            lanes.submit("919800000001", lambda: job("a", 1, 0.02)),
+            lanes.submit("919800000001", lambda: job("a", 2, 0.0)),
+        ]
+        results = await asyncio.gather(*futures)
+        await asyncio.sleep(0.1)
+        assert lanes.active_lanes == 0  # idle lane reclaimed
+        return results
+
+    assert asyncio.run(run()) == [1, 2]
+    assert events == [("start", "a", 1), ("end", "a", 1), ("start", "a", 2), ("end", "a", 2)]
+
+
+def test_lanes_propagate_errors():
+    async def boom() -> None:
+        raise RuntimeError("boom")
+
+    async def run() -> None:
+        lanes = LaneScheduler(num_lanes=2, idle_timeout=0.05)
+        try:
+            await lanes.run("x", boom)
+        except RuntimeError as exc:
+            assert str(exc) == "boom"
+        else:
+            raise AssertionError("expected RuntimeError")
+        assert await lanes.run("x", lambda: asyncio.sleep(0, result=7)) == 7
+        await lanes.stop()
+
+    asyncio.run(run())